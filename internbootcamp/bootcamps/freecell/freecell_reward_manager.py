@@ -1,6 +1,9 @@
 from internbootcamp.src.base_reward_calculator import BaseRewardCalculator
 import re
 
+# "The answer is N" followed by a non-digit, i.e. N has been fully emitted
+_COMPLETE_ANSWER = re.compile(r"answer is \d+\D", re.IGNORECASE)
+
 class FreecellRewardManager(BaseRewardCalculator):
 
     @staticmethod
@@ -44,6 +47,23 @@ class FreecellRewardManager(BaseRewardCalculator):
         # Matching any last digit would reward malformed outputs or loops.
         return None
 
+    @classmethod
+    def should_stop_early(cls, partial_output: str) -> bool:
+        """
+        Stop streaming once "The answer is N" has been emitted in the answer section.
+        The answer section is the text after </think>; until the think section has
+        closed (or if the model does not emit think tags at all) an "answer is N"
+        may still be reasoning, so streaming continues to the end. The number must be
+        followed by a non-digit so that a partially streamed "1" of "12" is not taken
+        as the answer.
+        """
+        if "</think>" not in partial_output:
+            return False
+        text = partial_output.rsplit("</think>", 1)[1]
+        if not _COMPLETE_ANSWER.search(text):
+            return False
+        return cls.extract_output(text) is not None
+
     @classmethod
     def _verify_correction(cls, extract_solution, identity: dict, **kwargs) -> float:
         """
@@ -7,11 +7,14 @@ import json
 import asyncio
 import httpx
 import csv
+import copy
+import math
+import time
 
 from transformers import AutoTokenizer
 import pandas as pd
 from tqdm import tqdm
-from typing import Any, Dict, List, Optional, Callable, Tuple
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Callable, Tuple, Union
 from tenacity import retry, stop_after_attempt, wait_exponential
 from internbootcamp.utils.format_time_now import format_time_now
 from internbootcamp.utils.load_tool_from_config import load_tool_from_config
@@ -22,7 +25,28 @@ from internbootcamp.src.base_interaction import BaseInteraction
 from internbootcamp.src.base_reward_calculator import BaseRewardCalculator
 import jsonlines
 from PIL import Image
-from internbootcamp.src.img2base64 import encode_image_file_to_base64
+from internbootcamp.utils.image_cache import ImageEncodingCache
+from internbootcamp.utils.image_refs import ImageBlobStore, ImageExternalizer
+from internbootcamp.utils.tool_stats import ToolLifecycleStats
+from internbootcamp.utils.spans import current_sample_spans, sample_spans, span
+from internbootcamp.utils.trace_export import ChromeTraceWriter
+from internbootcamp.utils.streaming import StreamAccumulator, StreamingStats
+from internbootcamp.utils.sampling import current_sample_index, run_as_sample, summarize_samples
+from internbootcamp.utils.request_dedup import RequestDeduplicator, is_deterministic_payload
+from internbootcamp.utils.hedging import HedgePolicy
+from internbootcamp.utils.circuit_breaker import CircuitBreaker, CircuitOpenError, RetryBudget
+from internbootcamp.utils.batch_io import BatchRequestWriter, BatchResponseIndex
+from internbootcamp.utils.model_comparison import print_comparison, save_comparison_csv
+from internbootcamp.utils.completion_batcher import CompletionBatcher, chat_payload_to_completion, completion_to_chat_response
+from internbootcamp.utils.result_io import ZSTD_SUFFIX, compact_result, iter_results, make_result_header, read_result_header, strip_result_suffix
+from internbootcamp.utils.response_cache import ResponseCache, ResponseCacheMiss, payload_hash
+from internbootcamp.utils.result_writer import AsyncResultWriter
+from internbootcamp.utils.concurrency import AdaptiveConcurrencyLimiter
+from internbootcamp.utils.rate_limiter import RateLimiter, estimate_payload_tokens
+from internbootcamp.utils.evaluation_aggregator import EvaluationAggregator, calculate_tool_statistics
+from internbootcamp.utils.resume_index import load_resume_index, resume_index_path, sample_fingerprint, write_index_header
+from internbootcamp.utils.endpoint_pool import Endpoint, EndpointPool, parse_api_urls
+from internbootcamp.utils.http_client import DEFAULT_KEEPALIVE_EXPIRY, HttpConnectionStats, build_http_client
 
 def load_dataset(dataset_path, dataset=None):
     """
@@ -61,28 +85,99 @@ def load_dataset(dataset_path, dataset=None):
             
             # 处理 parquet 加载后的数据类型问题
             for item in dataset:
-                # 确保 messages 和 prompt 字段是 Python 列表而不是 numpy 数组
-                if 'messages' in item and hasattr(item['messages'], 'tolist'):
-                    item['messages'] = item['messages'].tolist()
-                elif 'messages' in item and not isinstance(item['messages'], list):
-                    item['messages'] = list(item['messages'])
-                
-                if 'prompt' in item and hasattr(item['prompt'], 'tolist'):
-                    item['prompt'] = item['prompt'].tolist()
-                elif 'prompt' in item and not isinstance(item['prompt'], list):
-                    item['prompt'] = list(item['prompt'])
+                _normalize_parquet_record(item)
         
         else:
             raise ValueError(f"不支持的文件格式: {ext}")
     
     return dataset
 
+def _normalize_parquet_record(item: dict) -> dict:
+    # 确保 messages 和 prompt 字段是 Python 列表而不是 numpy 数组
+    if 'messages' in item and hasattr(item['messages'], 'tolist'):
+        item['messages'] = item['messages'].tolist()
+    elif 'messages' in item and not isinstance(item['messages'], list):
+        item['messages'] = list(item['messages'])
+    
+    if 'prompt' in item and hasattr(item['prompt'], 'tolist'):
+        item['prompt'] = item['prompt'].tolist()
+    elif 'prompt' in item and not isinstance(item['prompt'], list):
+        item['prompt'] = list(item['prompt'])
+    return item
+
+def iter_dataset(dataset_path: str, parquet_batch_size: int = 1024) -> Iterator[dict]:
+    """
+    惰性迭代数据集（流式模式），逐条产出样本而不把整个文件读入内存。
+
+    JSONL 逐行读取，Parquet 按 record batch 读取；JSON 无法流式解析，整体加载后逐条产出。
+    """
+    _, ext = os.path.splitext(dataset_path)
+    ext = ext.lower()
+    if ext == ".jsonl":
+        with jsonlines.open(dataset_path) as reader:
+            for line in reader:
+                yield line
+    elif ext == ".parquet":
+        import pyarrow.parquet as pq
+        parquet_file = pq.ParquetFile(dataset_path)
+        for batch in parquet_file.iter_batches(batch_size=parquet_batch_size):
+            for item in batch.to_pylist():
+                yield _normalize_parquet_record(item)
+    elif ext == ".json":
+        yield from load_dataset(dataset_path)
+    else:
+        raise ValueError(f"不支持的文件格式: {ext}")
+
+def count_dataset_rows(dataset_path: str) -> Optional[int]:
+    """
+    在不解析内容的情况下估计数据集行数（用于进度条），无法快速统计时返回 None
+    """
+    _, ext = os.path.splitext(dataset_path)
+    ext = ext.lower()
+    if ext == ".parquet":
+        import pyarrow.parquet as pq
+        return pq.ParquetFile(dataset_path).metadata.num_rows
+    if ext == ".jsonl":
+        count = 0
+        with open(dataset_path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                count += chunk.count(b"\n")
+        return count
+    return None
+
+# 单次接口调用的最大尝试次数（含首次请求）
+MAX_API_ATTEMPTS = 5
+
+
+def _should_retry(retry_state) -> bool:
+    """失败后是否重试：熔断器拒绝的请求不重试；其余重试需先申请全局重试预算"""
+    exception = retry_state.outcome.exception()
+    if exception is None or isinstance(exception, CircuitOpenError):
+        return False
+    if retry_state.attempt_number >= MAX_API_ATTEMPTS:
+        return False
+    retry_budget = getattr(retry_state.args[0], "retry_budget", None) if retry_state.args else None
+    if retry_budget is not None and not retry_budget.try_acquire():
+        print(f"⚠️ 全局重试预算已用尽（{retry_budget.retries} 次重试 / {retry_budget.successes} 次成功），不再重试: {exception}")
+        return False
+    return True
+
+
+def _before_retry_sleep(retry_state) -> None:
+    print(f"重试中... 第{retry_state.attempt_number}次尝试失败: \n{retry_state.outcome.exception()}")
+    # 重试前的退避等待也记为一个阶段，便于在时间线中区分退避与请求本身
+    spans = current_sample_spans()
+    if spans is not None and retry_state.next_action is not None:
+        now = time.monotonic()
+        spans.add("retry_backoff", now, now + retry_state.next_action.sleep, attempt=retry_state.attempt_number)
+
+
 class BaseEvaluator:
     def __init__(
         self,
         api_key: str,
         reward_calculator: BaseRewardCalculator,
-        api_url: str = None,
+        api_url: Union[str, List[str]] = None,
         api_model: str = None,
         api_extra_headers: dict = None,
         api_extra_params: dict = None,
@@ -90,6 +185,50 @@ class BaseEvaluator:
         max_assistant_turns: int = None,
         max_user_turns: int = None,
         tokenizer_path = None,
+        response_cache_path: str = None,
+        response_cache_mode: str = "readwrite",
+        response_cache_max_mb: float = None,
+        result_flush_interval: float = 1.0,
+        result_flush_size: int = 64,
+        resume_key_field: str = None,
+        report_interval: float = None,
+        adaptive_concurrency: bool = False,
+        min_concurrent: int = 1,
+        requests_per_minute: float = None,
+        tokens_per_minute: float = None,
+        endpoint_eject_after: int = 3,
+        endpoint_eject_seconds: float = 30.0,
+        http_max_connections: int = None,
+        http_keepalive_expiry: float = DEFAULT_KEEPALIVE_EXPIRY,
+        http2: bool = False,
+        image_cache_mb: float = 256,
+        image_cache_dir: str = None,
+        image_encode_workers: int = None,
+        externalize_images: bool = False,
+        image_blob_dir: str = None,
+        compact_results: bool = False,
+        compress_results: bool = False,
+        parallel_tool_calls: bool = True,
+        trace: bool = False,
+        stream: bool = False,
+        stream_early_stop: bool = True,
+        stop_sequences: List[str] = None,
+        num_samples: int = 1,
+        sample_pass_threshold: float = 1.0,
+        dedup_requests: bool = False,
+        hedge_percentile: float = None,
+        hedge_min_delay: float = 1.0,
+        hedge_max_ratio: float = 0.1,
+        sample_timeout: float = None,
+        circuit_breaker: bool = False,
+        breaker_failure_threshold: int = 10,
+        breaker_reset_timeout: float = 10.0,
+        breaker_max_open_seconds: float = 600.0,
+        retry_budget_ratio: float = None,
+        batch_output_path: Union[str, List[str]] = None,
+        batch_completions: bool = False,
+        completion_batch_size: int = 32,
+        completion_batch_timeout: float = 0.05,
         **kwargs,
         ):
         self.api_model = api_model
@@ -98,12 +237,205 @@ class BaseEvaluator:
         self.verify_correction_kwargs = verify_correction_kwargs or {}
         self.max_assistant_turns = max_assistant_turns
         self.max_user_turns = max_user_turns
-        self.client = openai.AsyncOpenAI(base_url=api_url, api_key=api_key, default_headers=api_extra_headers, http_client=httpx.AsyncClient(verify=False))
+        # 所有端点共用的 HTTP 连接池配置：未指定连接数时在评测开始时按并发数设置，空闲连接保活复用
+        self.http_max_connections = http_max_connections
+        self.http_keepalive_expiry = http_keepalive_expiry
+        self.http2 = http2
+        self.api_key = api_key
+        self.endpoint_eject_after = endpoint_eject_after
+        self.endpoint_eject_seconds = endpoint_eject_seconds
         self.bootcamp_registry: Dict[str, dict] = {}
         self.reward_calculator = reward_calculator
         self.tokenizer_path = tokenizer_path
         self.tokenizer = self._get_tokenizer()
+        # 结果文件后台批量写入参数
+        self.result_flush_interval = result_flush_interval
+        self.result_flush_size = result_flush_size
+        # 自适应并发（AIMD）：max_concurrent 作为上限，控制器在 [min_concurrent, max_concurrent] 间调整
+        self.adaptive_concurrency = adaptive_concurrency
+        self.min_concurrent = min_concurrent
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        # 评测过程中定期刷新 CSV 报告的间隔（秒），为空则只在结束时生成
+        self.report_interval = report_interval
+        # 断点索引的样本指纹字段（如 "extra_info.index"），为空时对整个输入取哈希
+        self.resume_key_field = resume_key_field
+        # 图片 base64 编码缓存（内存 LRU + 可选磁盘），编码在线程池中执行
+        self.image_cache = ImageEncodingCache(
+            max_bytes=image_cache_mb * 1024 * 1024 if image_cache_mb is not None else None,
+            disk_dir=image_cache_dir,
+            max_workers=image_encode_workers,
+        )
+        # 结果记录中的内联图片替换为内容哈希引用（可选保存到 image_blob_dir）
+        self.image_externalizer = ImageExternalizer(
+            ImageBlobStore(image_blob_dir) if image_blob_dir else None
+        ) if externalize_images or image_blob_dir else None
+        # 同一轮的多个工具调用并发执行
+        self.parallel_tool_calls = parallel_tool_calls
+        # 紧凑结果格式（去掉可重算字段、配置提升到文件头部）与 zstd 压缩输出
+        self.compact_results = compact_results
+        self.compress_results = compress_results
+        self.result_header: Optional[Dict[str, Any]] = None
+        # 导出 Chrome trace 时间线（与结果文件同名的 .trace.json），用于分析并发行为和瓶颈
+        self.trace = trace
+        # 流式请求：奖励计算器的 should_stop_early 判定答案已完整时提前结束生成，节省 token 与延迟
+        # （离线批量模式下不生效）
+        self.stream = stream and not batch_output_path
+        self.stream_early_stop = stream_early_stop
+        # 请求中附加的 stop 序列（对应 API 的 stop 参数）
+        self.stop_sequences = list(stop_sequences) if stop_sequences else None
+        # 每个问题采样 num_samples 次（pass@k / 多数投票）；分数不低于 sample_pass_threshold 视为正确
+        self.num_samples = max(1, int(num_samples))
+        self.sample_pass_threshold = sample_pass_threshold
+        # 相同请求去重（可选）：temperature=0 的相同 payload 只请求一次，所有相同样本共用同一个响应。
+        # 只在服务端贪心解码结果稳定时使用；数据集中的重复样本不再各自独立采样，重复评测的方差会被抹平
+        self.dedup_requests = dedup_requests
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_delay = hedge_min_delay
+        self.hedge_max_ratio = hedge_max_ratio
+        # 单个样本的总耗时上限（秒），超时记为失败结果，不再阻塞整个评测
+        self.sample_timeout = sample_timeout
+        self.use_circuit_breaker = circuit_breaker
+        self.breaker_failure_threshold = breaker_failure_threshold
+        self.breaker_reset_timeout = breaker_reset_timeout
+        self.breaker_max_open_seconds = breaker_max_open_seconds
+        self.retry_budget_ratio = retry_budget_ratio
+        # 持久化响应缓存（可选），键为最终 payload 的内容哈希
+        self.response_cache = ResponseCache(
+            response_cache_path,
+            mode=response_cache_mode,
+            max_bytes=response_cache_max_mb * 1024 * 1024 if response_cache_max_mb else None,
+        ) if response_cache_path else None
+        # 离线批量模式第二阶段：响应从批量输出 JSONL（OpenAI Batch API / vLLM run_batch）中读取，不访问接口
+        self.batch_responses = BatchResponseIndex(batch_output_path) if batch_output_path else None
+        # 纯文本单轮请求在本地用 chat template 渲染，合并为批量 /v1/completions 调用（流式模式下不生效）
+        if batch_completions and self.tokenizer is None:
+            raise ValueError("batch_completions 需要通过 tokenizer_path 加载 tokenizer 以在本地渲染 chat template")
+        self.batch_completions = batch_completions
+        self.completion_batch_size = completion_batch_size
+        self.completion_batch_timeout = completion_batch_timeout
+        # 多模型评测时进度条的行号（见 run_multi_model_evaluation）
+        self.progress_position: Optional[int] = None
+        self._init_target_state(api_url, api_key)
+
+    def _init_target_state(self, api_url: Union[str, List[str], None], api_key: str) -> None:
+        """
+        与被评测服务相关的状态（端点连接池、限流、熔断、对冲及其统计）。
+        多模型评测时每个模型各自一份，其余资源在模型间共享（见 for_target）
+        """
+        self.http_connection_stats = HttpConnectionStats()
+        # 多端点负载均衡：api_url 可为列表或逗号分隔的多个 URL，每个端点独立的客户端与连接池
+        self.endpoint_pool = EndpointPool(
+            [Endpoint(url, self._build_client(url, api_key)) for url in parse_api_urls(api_url)],
+            eject_after=self.endpoint_eject_after,
+            eject_seconds=self.endpoint_eject_seconds,
+        )
+        self.client = self.endpoint_pool.endpoints[0].client
+        self.concurrency_limiter: Optional[AdaptiveConcurrencyLimiter] = None
+        # 客户端 RPM/TPM 限流（所有 worker 共享），token 数优先用 tokenizer 估算
+        self.rate_limiter = RateLimiter(
+            requests_per_minute=self.requests_per_minute,
+            tokens_per_minute=self.tokens_per_minute,
+        ) if self.requests_per_minute or self.tokens_per_minute else None
+        # 工具实例生命周期（create/execute/calc_reward/release）的次数与耗时统计
+        self.tool_stats = ToolLifecycleStats()
+        self.streaming_stats = StreamingStats()
+        # 端点是否支持 n 参数一次返回多个 completion（None 表示尚未探测）
+        self._n_supported: Optional[bool] = None
+        # 单次评测内相同确定性请求的去重（在 _evaluate_batch 中创建，只在该批次内有效）
+        self.request_dedup: Optional[RequestDeduplicator] = None
+        # 对冲请求：单次请求超过近期延迟的 hedge_percentile 分位数时向另一个端点重发，取先返回者
+        self.hedge_policy = HedgePolicy(
+            percentile=self.hedge_percentile,
+            min_delay=self.hedge_min_delay,
+            max_ratio=self.hedge_max_ratio,
+        ) if self.hedge_percentile else None
+        self.timed_out_samples = 0
+        # 进程级熔断器（可选）：服务整体故障时所有 worker 暂停请求，冷却后只放行探测请求
+        self.circuit_breaker = CircuitBreaker(
+            failure_threshold=self.breaker_failure_threshold,
+            reset_timeout=self.breaker_reset_timeout,
+            max_open_seconds=self.breaker_max_open_seconds,
+        ) if self.use_circuit_breaker else None
+        # 全局重试预算：重试次数不超过成功请求数的 retry_budget_ratio 倍（另有少量初始额度），为空时不限制
+        self.retry_budget = RetryBudget(ratio=self.retry_budget_ratio) if self.retry_budget_ratio is not None else None
+        self.completion_batcher = CompletionBatcher(
+            self._send_completion_batch,
+            max_batch_size=self.completion_batch_size,
+            flush_timeout=self.completion_batch_timeout,
+        ) if self.batch_completions else None
+
+    def for_target(self, api_model: str, api_url: Union[str, List[str], None] = None, api_key: Optional[str] = None) -> "BaseEvaluator":
+        """
+        多模型评测：返回评测另一个模型（服务）的评测器。tokenizer、图片编码缓存、工具与奖励计算器、
+        响应缓存等与当前评测器共享，端点连接池、限流、熔断、对冲等按目标服务重新创建
+        """
+        target = copy.copy(self)
+        target.api_model = api_model
+        target._init_target_state(api_url, api_key or self.api_key)
+        return target
         
+    def _http_timeout(self) -> Optional[httpx.Timeout]:
+        """
+        请求超时配置，子类可重写；为空时使用 openai 客户端默认值
+        """
+        return None
+
+    def _build_client(self, api_url: Optional[str], api_key: str, max_connections: Optional[int] = None) -> openai.AsyncOpenAI:
+        """
+        为单个端点创建 API 客户端，底层 httpx 客户端由 build_http_client 统一配置
+        """
+        timeout = self._http_timeout()
+        http_client = build_http_client(
+            max_connections=max_connections or self.http_max_connections,
+            keepalive_expiry=self.http_keepalive_expiry,
+            http2=self.http2,
+            timeout=timeout,
+            connection_stats=self.http_connection_stats,
+        )
+        client_kwargs = {"timeout": timeout} if timeout is not None else {}
+        return openai.AsyncOpenAI(base_url=api_url, api_key=api_key, default_headers=self.api_extra_headers, http_client=http_client, **client_kwargs)
+
+    async def _fit_connection_pool(self, max_concurrent: int) -> None:
+        """
+        未指定 http_max_connections 时，按本次评测的最大在途请求数（worker 数 × 采样数，加上对冲请求）
+        重建各端点的连接池，避免请求在连接池中排队等待直至超时
+        """
+        if self.http_max_connections:
+            return
+        needed = max_concurrent * self.num_samples
+        if self.hedge_policy is not None:
+            needed += math.ceil(needed * self.hedge_max_ratio)
+        if needed <= (self.http_connection_stats.max_connections or 0):
+            return
+        for endpoint in self.endpoint_pool.endpoints:
+            old_client = endpoint.client
+            endpoint.client = self._build_client(endpoint.url, old_client.api_key, max_connections=needed)
+            await old_client.close()
+        self.client = self.endpoint_pool.endpoints[0].client
+
+    async def aclose(self) -> None:
+        """
+        关闭所有端点的 HTTP 连接池和响应缓存；评测器不再使用时调用
+        """
+        await self._close_endpoints()
+        if self.response_cache is not None:
+            self.response_cache.close()
+        if self.batch_responses is not None:
+            self.batch_responses.close()
+        self.image_cache.close()
+
+    async def _close_endpoints(self) -> None:
+        for endpoint in self.endpoint_pool.endpoints:
+            await endpoint.client.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
+        return False
+
     def _get_tokenizer(self):
         if not self.tokenizer_path:
             return None
@@ -130,31 +462,173 @@ class BaseEvaluator:
         if tools:
             payload["tools"] = tools
             payload["tool_choice"] = tool_choice
+        if self.stop_sequences:
+            payload["stop"] = self.stop_sequences
 
         # 添加额外的模型参数
         if self.api_extra_params:
             payload.update(self.api_extra_params)
 
         return payload
+
+    async def _call_api(self, payload: dict, early_stop: Optional[Callable[[str], bool]] = None) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        调用模型接口，启用响应缓存时优先读取缓存。
+
+        replay 模式下未命中缓存直接抛出 ResponseCacheMiss，不会访问接口。
+        early_stop 仅在流式模式下生效，提前结束的响应与完整响应分开缓存。
+        采样确定（temperature 为 0）时，本次评测内相同的请求只发出一次，结果分发给所有相同的样本。
+        离线批量模式下响应按 payload 从批量输出中读取，缺失时抛出 BatchResponseMissing。
+        """
+        if self.batch_responses is not None:
+            return self.batch_responses.lookup(payload)
+        if not self.stream:
+            early_stop = None
+        request_key = None
+        if self.response_cache is not None or self.request_dedup is not None:
+            key_extra = {}
+            if early_stop:
+                key_extra["__early_stop__"] = True
+            if current_sample_index.get():
+                # 同一问题的多次采样分别缓存
+                key_extra["__sample__"] = current_sample_index.get()
+            request_key = payload_hash({**payload, **key_extra})
+        if self.request_dedup is not None and is_deterministic_payload(payload):
+            return await self.request_dedup.run(request_key, lambda: self._call_api_cached(payload, early_stop, request_key))
+        return await self._call_api_cached(payload, early_stop, request_key)
+
+    async def _call_api_cached(self, payload: dict, early_stop: Optional[Callable[[str], bool]], cache_key: Optional[str]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        # sqlite 读写（每次 put 都会提交）放到线程中执行，避免阻塞事件循环
+        if self.response_cache is not None:
+            cached = await asyncio.to_thread(self.response_cache.get, cache_key)
+            if cached is not None:
+                return cached["response"], cached["usage"]
+            if self.response_cache.replay:
+                raise ResponseCacheMiss(f"replay 模式下缓存未命中: {cache_key}")
+        response_dict, usage = await self._request_completion(payload, early_stop)
+        if self.response_cache is not None:
+            await asyncio.to_thread(self.response_cache.put, cache_key, {"response": response_dict, "usage": usage})
+        return response_dict, usage
     
     @retry(
-        stop=stop_after_attempt(5),
+        stop=stop_after_attempt(MAX_API_ATTEMPTS),
         wait=wait_exponential(multiplier=1, max=60),
+        retry=_should_retry,
         reraise=True,
-        before_sleep=lambda retry_state: print(f"重试中... 第{retry_state.attempt_number}次尝试失败: \n{retry_state.outcome.exception()}")
+        before_sleep=lambda retry_state: _before_retry_sleep(retry_state),
         )
-    async def _call_api(self, payload: dict) -> Dict[str, Any]:
-        try:
-            response = await self.client.chat.completions.create(**payload)
-        except Exception as e:
-            # print("Error happened when processing playload:")
-            # print(payload)
-            raise e
-        # print("DEBUG response", response)
-        response_dict = response.model_dump()
+    async def _request_completion(self, payload: dict, early_stop: Optional[Callable[[str], bool]] = None) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        # 熔断器打开时在此等待，不再访问服务端
+        if self.circuit_breaker is None:
+            response_dict, usage = await self._attempt_completion(payload, early_stop)
+        else:
+            async with self.circuit_breaker.guard():
+                response_dict, usage = await self._attempt_completion(payload, early_stop)
+        if self.retry_budget is not None:
+            self.retry_budget.record_success()
+        return response_dict, usage
+
+    async def _attempt_completion(self, payload: dict, early_stop: Optional[Callable[[str], bool]] = None) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        # 可合并为批量 /v1/completions 的请求在本地渲染 prompt，不做对冲
+        completion_request = chat_payload_to_completion(payload, self.tokenizer) if self.completion_batcher is not None and not self.stream else None
+        if self.hedge_policy is None or completion_request is not None:
+            return await self._metered_request(payload, early_stop, completion_request=completion_request)
+        # 对冲：超过延迟分位数仍未返回时向另一个端点（只有一个端点时为同一端点）发出相同请求。
+        # 对冲请求与原请求一样预留 RPM/TPM 配额并占用并发槽位，不会绕过限流给服务端增加额外负载
+        primary_endpoints = []
+        return await self.hedge_policy.run(
+            lambda: self._metered_request(payload, early_stop, picked=primary_endpoints),
+            lambda: self._metered_request(payload, early_stop, exclude=primary_endpoints, hedge=True),
+        )
+
+    async def _metered_request(
+        self,
+        payload: dict,
+        early_stop: Optional[Callable[[str], bool]] = None,
+        completion_request: Optional[Tuple[str, Dict[str, Any]]] = None,
+        exclude: Iterable[Endpoint] = (),
+        picked: Optional[List[Endpoint]] = None,
+        hedge: bool = False,
+        ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        # 每次发出请求（包括重试与对冲）都先按 RPM/TPM 预留配额，再获取自适应并发槽位
+        estimated_tokens = None
+        if self.rate_limiter is not None:
+            estimated_tokens = estimate_payload_tokens(payload, self.tokenizer)
+            with span("rate_limit_wait"):
+                await self.rate_limiter.acquire(estimated_tokens)
+        limiter = self.concurrency_limiter
+        if limiter is None:
+            response_dict, usage = await self._send_request(payload, early_stop, completion_request, exclude, picked, hedge)
+        else:
+            async with limiter.slot() as slot:
+                response_dict, usage = await self._send_request(payload, early_stop, completion_request, exclude, picked, hedge)
+                slot.tokens = (usage or {}).get("completion_tokens")
+        if self.rate_limiter is not None:
+            self.rate_limiter.settle(estimated_tokens, (usage or {}).get("total_tokens"))
+        return response_dict, usage
+
+    async def _send_request(
+        self,
+        payload: dict,
+        early_stop: Optional[Callable[[str], bool]] = None,
+        completion_request: Optional[Tuple[str, Dict[str, Any]]] = None,
+        exclude: Iterable[Endpoint] = (),
+        picked: Optional[List[Endpoint]] = None,
+        hedge: bool = False,
+        ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        if completion_request is not None:
+            prompt, params = completion_request
+            with span("api_attempt", batched=True):
+                response, choices = await self.completion_batcher.submit(prompt, params)
+            return completion_to_chat_response(response, choices, prompt, self.tokenizer)
+        # 选择在途请求最少的健康端点；每次重试重新选择，失败的端点会被逐步摘除
+        endpoint = self.endpoint_pool.pick(exclude=exclude)
+        if picked is not None:
+            picked.append(endpoint)
+        return await self._send_to_endpoint(endpoint, payload, early_stop, hedge=hedge)
+
+    async def _send_to_endpoint(self, endpoint: Endpoint, payload: dict, early_stop: Optional[Callable[[str], bool]] = None, hedge: bool = False) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        started = time.monotonic()
+        with span("api_attempt", endpoint=endpoint.name, **({"hedge": True} if hedge else {})):
+            async with self.endpoint_pool.call(endpoint) as call:
+                if self.stream:
+                    response_dict = await self._stream_completion(endpoint, payload, early_stop)
+                    call.completion_tokens = response_dict["usage"].get("completion_tokens")
+                else:
+                    response = await endpoint.client.chat.completions.create(**payload)
+                    call.completion_tokens = response.usage.completion_tokens if response.usage else None
+                    response_dict = response.model_dump()
+        if self.hedge_policy is not None:
+            self.hedge_policy.observe(time.monotonic() - started)
         # 提取 token usage 信息
         usage = response_dict.get("usage", {})
         return response_dict, usage
+
+    async def _send_completion_batch(self, prompts: List[str], params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        一次 /v1/completions 调用发送整批 prompt（由 CompletionBatcher 调用）
+        """
+        endpoint = self.endpoint_pool.pick()
+        async with self.endpoint_pool.call(endpoint) as call:
+            response = await endpoint.client.completions.create(prompt=prompts, **params)
+            call.completion_tokens = response.usage.completion_tokens if response.usage else None
+        return response.model_dump()
+
+    async def _stream_completion(self, endpoint: Endpoint, payload: dict, early_stop: Optional[Callable[[str], bool]] = None) -> Dict[str, Any]:
+        """
+        流式请求并拼接为完整响应；early_stop 判定答案已完整时关闭流，服务端随之停止生成
+        """
+        accumulator = StreamAccumulator(early_stop)
+        stream = await endpoint.client.chat.completions.create(**payload, stream=True, stream_options={"include_usage": True})
+        try:
+            async for chunk in stream:
+                if accumulator.add(chunk):
+                    break
+        finally:
+            await stream.close()
+        response_dict = accumulator.response(payload, self.tokenizer)
+        self.streaming_stats.record(accumulator, response_dict["usage"].get("completion_tokens"))
+        return response_dict
     
     def _load_tools_from_yaml(self, yaml_path: str) -> Tuple[List[Dict], Dict[str, Dict[str, Any]]]:
         """
@@ -169,7 +643,9 @@ class BaseEvaluator:
             try:
                 func_name, schema, tool_instance = load_tool_from_config(tool_cfg)
                 tool_instances[func_name] = {
-                    "instance": tool_instance
+                    "instance": tool_instance,
+                    # 有状态工具可在 config 中设置 sequential: true，同一轮内对它的多次调用按顺序执行
+                    "sequential": bool((tool_cfg.get("config") or {}).get("sequential", False)),
                 }
                 tool_schemas.append(schema)
                 # print(f"✅ 已加载工具: {func_name}", end=';')
@@ -276,53 +752,51 @@ class BaseEvaluator:
         ) -> Tuple[str,List[Dict[str, Any]],float,dict,float]:
         """
         执行工具调用，并支持动态传入额外参数。
+
+        同一条 assistant 消息中的多个工具调用并发执行（parallel_tool_calls 为 False 时按顺序执行）；
+        配置了 sequential 的工具，其多次调用按出现顺序依次执行。返回的工具消息顺序与 tool_calls 一致。
         Args:
             tool_calls (List[Dict]): 工具调用列表。
             sample_extra_info (Dict[str, Any]): 样本中的额外信息（如 create_kwargs 等）。
         Returns:
             List[Dict[str, Any]]: 工具调用结果。
         """
-        tool_messages = []
         sample_extra_info = sample_extra_info or {}
         tool_instances = tool_instances or getattr(self, 'tool_instances', {})
         tool_reward = 0.0
         tool_metrics = {}
         tool_cumulative_reward = 0.0
-        for tool_call in tool_calls:
-            tool_name = tool_call["function"]["name"]
-            arguments = tool_call["function"]["arguments"]
-            if tool_name not in tool_instances:
-                content = f"Error: 工具 '{tool_name}' 未注册。"
-            else:
-                try:
-                    args = json.loads(arguments)
-                    # 获取工具实例及其额外参数
-                    tool_instance = tool_instances[tool_name]["instance"]
+        # 同一工具的实例创建串行化，避免并发调用重复创建实例
+        create_locks = {tool_name: asyncio.Lock() for tool_name in tool_instances}
+        outcomes = [None] * len(tool_calls)
 
-                    # 动态更新 create_kwargs
-                    if "tools_kwargs" in sample_extra_info and tool_name in sample_extra_info["tools_kwargs"]:
-                        create_kwargs = sample_extra_info["tools_kwargs"][tool_name].get("create_kwargs", {})
-                    else:
-                        create_kwargs = {}
+        async def run_group(indexed_calls):
+            for index, tool_call in indexed_calls:
+                outcomes[index] = await self._execute_tool_call(
+                    tool_call, context_instance_id_dict, sample_extra_info, tool_instances, create_locks
+                )
 
-                    # 调用工具的 create 和 execute 方法
-                    create_result = await tool_instance.create(context_instance_id_dict[tool_name], **create_kwargs)
-                    # 兼容返回一个值或两个值的情况
-                    if isinstance(create_result, tuple):
-                        current_instance_id, current_tool_create_response = create_result
-                    else:
-                        current_instance_id = create_result
-                        current_tool_create_response = None
-                    context_instance_id_dict[tool_name] = current_instance_id
-                    tool_result = await tool_instance.execute(current_instance_id, args)
-                    # 计算工具累计奖励
-                    tool_cumulative_reward = await tool_instance.calc_reward(current_instance_id)
-                    tool_response, tool_reward, tool_metrics = tool_result
-                    content = str(tool_response)
-                except Exception as e:
-                    # import traceback
-                    # traceback.print_exc()
-                    content = f"Error calling {tool_name}: {str(e)}"
+        if self.parallel_tool_calls:
+            groups = []
+            sequential_groups = {}
+            for index, tool_call in enumerate(tool_calls):
+                tool_name = tool_call["function"]["name"]
+                if tool_instances.get(tool_name, {}).get("sequential"):
+                    if tool_name not in sequential_groups:
+                        sequential_groups[tool_name] = []
+                        groups.append(sequential_groups[tool_name])
+                    sequential_groups[tool_name].append((index, tool_call))
+                else:
+                    groups.append([(index, tool_call)])
+        else:
+            groups = [list(enumerate(tool_calls))]
+        await asyncio.gather(*[run_group(group) for group in groups])
+
+        tool_messages = []
+        for tool_call, (content, tool_result) in zip(tool_calls, outcomes):
+            if tool_result is not None:
+                # 与顺序执行一致：奖励和指标取最后一个成功的工具调用
+                tool_reward, tool_metrics, tool_cumulative_reward = tool_result
             tool_messages.append({
                 "role": "tool",
                 "content": content,
@@ -330,33 +804,114 @@ class BaseEvaluator:
             })
         return context_instance_id_dict,tool_messages,tool_reward,tool_metrics,tool_cumulative_reward
 
-    async def _evaluate_one(
+    async def _release_tools(self, context_instance_id_dict: Dict[str, str], tool_instances: Dict[str, Dict[str, Any]]) -> None:
+        """
+        释放本条轨迹创建的工具实例（并发执行），释放失败只打印警告
+        """
+        async def release(tool_name, instance_id):
+            try:
+                async with self.tool_stats.timed(tool_name, "release"):
+                    await tool_instances[tool_name]["instance"].release(instance_id)
+            except Exception as e:
+                print(f"⚠️ 释放工具 {tool_name} 实例 {instance_id} 失败: {e}")
+
+        pending = [(tool_name, instance_id) for tool_name, instance_id in context_instance_id_dict.items() if instance_id]
+        for tool_name, _ in pending:
+            context_instance_id_dict[tool_name] = None
+        await asyncio.gather(*[release(tool_name, instance_id) for tool_name, instance_id in pending])
+
+    async def _execute_tool_call(
         self,
-        input_data: dict,
-        ) -> dict:
-        
-        data_source = input_data.get("data_source", None)
-        
-        
+        tool_call: Dict,
+        context_instance_id_dict: Dict[str, str],
+        sample_extra_info: Dict[str, Any],
+        tool_instances: Dict[str, Dict[str, Any]],
+        create_locks: Dict[str, asyncio.Lock],
+        ) -> Tuple[str, Optional[Tuple[float, dict, float]]]:
+        """
+        执行单个工具调用，返回 (工具消息内容, (奖励, 指标, 累计奖励))；调用失败时后者为 None
+        """
+        tool_name = tool_call["function"]["name"]
+        with span("tool_call", tool=tool_name):
+            return await self._run_tool_call(tool_name, tool_call["function"]["arguments"], context_instance_id_dict, sample_extra_info, tool_instances, create_locks)
+
+    async def _run_tool_call(
+        self,
+        tool_name: str,
+        arguments: str,
+        context_instance_id_dict: Dict[str, str],
+        sample_extra_info: Dict[str, Any],
+        tool_instances: Dict[str, Dict[str, Any]],
+        create_locks: Dict[str, asyncio.Lock],
+        ) -> Tuple[str, Optional[Tuple[float, dict, float]]]:
+        if tool_name not in tool_instances:
+            return f"Error: 工具 '{tool_name}' 未注册。", None
+        try:
+            args = json.loads(arguments)
+            # 获取工具实例及其额外参数
+            tool_instance = tool_instances[tool_name]["instance"]
+
+            # 动态更新 create_kwargs
+            if "tools_kwargs" in sample_extra_info and tool_name in sample_extra_info["tools_kwargs"]:
+                create_kwargs = sample_extra_info["tools_kwargs"][tool_name].get("create_kwargs", {})
+            else:
+                create_kwargs = {}
+
+            # 每条轨迹中每个工具只在首次调用时创建一次实例，之后的调用（包括后续轮次）复用该实例
+            async with create_locks[tool_name]:
+                current_instance_id = context_instance_id_dict.get(tool_name)
+                if current_instance_id is None:
+                    async with self.tool_stats.timed(tool_name, "create"):
+                        create_result = await tool_instance.create(None, **create_kwargs)
+                    # 兼容返回一个值或两个值的情况
+                    if isinstance(create_result, tuple):
+                        current_instance_id, current_tool_create_response = create_result
+                    else:
+                        current_instance_id = create_result
+                        current_tool_create_response = None
+                    context_instance_id_dict[tool_name] = current_instance_id
+            async with self.tool_stats.timed(tool_name, "execute"):
+                tool_result = await tool_instance.execute(current_instance_id, args)
+            # 计算工具累计奖励
+            async with self.tool_stats.timed(tool_name, "calc_reward"):
+                tool_cumulative_reward = await tool_instance.calc_reward(current_instance_id)
+            tool_response, tool_reward, tool_metrics = tool_result
+            return str(tool_response), (tool_reward, tool_metrics, tool_cumulative_reward)
+        except Exception as e:
+            # import traceback
+            # traceback.print_exc()
+            return f"Error calling {tool_name}: {str(e)}", None
+
+    def _resolve_components(self, data_source: Optional[str]) -> Optional[Tuple[Any, Any, Optional[BaseInteraction], Any]]:
+        """
+        样本对应的 (tool_schemas, tool_instances, interaction_instance, reward_calculator)；
+        使用 bootcamp_registry 时按 data_source 查找，未找到返回 None
+        """
         if self.bootcamp_registry:
             # 根据 data_source 获取对应的组件配置
             if data_source and data_source in self.bootcamp_registry:
                 config = self.bootcamp_registry[data_source]
-                tool_schemas = config["tool_schemas"]
-                tool_instances = config["tool_instances"]
-                interaction_instance = config["interaction_instance"]
-                reward_calculator = config["reward_calculator_class"]
-            else:
-                print(f"❌ 未找到数据源: {data_source}")
-                return None
-        else:
-            if not self.reward_calculator:
-                raise ValueError("必须提供 bootcamp_registry 或 reward_calculator")
-            tool_schemas = self.tool_schemas
-            tool_instances = self.tool_instances
-            interaction_instance = self.interaction
-            reward_calculator = self.reward_calculator
-        
+                return config["tool_schemas"], config["tool_instances"], config["interaction_instance"], config["reward_calculator_class"]
+            print(f"❌ 未找到数据源: {data_source}")
+            return None
+        if not self.reward_calculator:
+            raise ValueError("必须提供 bootcamp_registry 或 reward_calculator")
+        return self.tool_schemas, self.tool_instances, self.interaction, self.reward_calculator
+
+    def _select_tools(self, input_data: dict, tool_schemas: Optional[List[Dict]]) -> List[Dict]:
+        """样本 extra_info.tools_kwargs 中声明需要的工具"""
+        needed_tools = []
+        extra_info = input_data.get("extra_info", {})
+        if extra_info.get("need_tools_kwargs") and "tools_kwargs" in extra_info and tool_schemas:
+            # 只选择需要的工具
+            needed_tool_names = set(extra_info["tools_kwargs"].keys())
+            needed_tools = [tool for tool in tool_schemas if tool["function"]["name"] in needed_tool_names]
+        return needed_tools
+
+    async def _build_initial_request(self, input_data: dict, needed_tools: List[Dict]) -> Tuple[List[Dict[str, Any]], dict]:
+        """
+        构造样本的初始消息与第一轮请求 payload（图片编码为 base64 内联），返回 (messages, payload)
+        """
         # 兼容 prompt/messages 字段
         if "messages" in input_data:
             messages = input_data["messages"].copy()
@@ -365,20 +920,15 @@ class BaseEvaluator:
         else:
             raise ValueError("输入数据必须包含 'messages' 或 'prompt' 字段")
 
-        needed_tools = []
-        extra_info = input_data.get("extra_info", {})
-        if extra_info.get("need_tools_kwargs") and "tools_kwargs" in extra_info and tool_schemas:
-            # 只选择需要的工具
-            needed_tool_names = set(extra_info["tools_kwargs"].keys())
-            needed_tools = [tool for tool in tool_schemas if tool["function"]["name"] in needed_tool_names]
         if 'image' in input_data and input_data['image']:
             prompt = messages[0]["content"]
             image_path_list = input_data["image"]
             
             content_list = [{"type": "text", "text": prompt}]
             
-            for image_item in image_path_list:
-                image_base64 = encode_image_file_to_base64(image_item)
+            with span("image_encode"):
+                image_base64_list = await asyncio.gather(*[self.image_cache.encode(image_item) for image_item in image_path_list])
+            for image_base64 in image_base64_list:
                 content_list.append(
                     {
                         "type": "image_url",
@@ -394,13 +944,40 @@ class BaseEvaluator:
                     "content": content_list
                 }
             ]
-        payload = self._build_payload({
-            "messages": messages,
-            "tools": needed_tools,
-            "tool_choice": "auto"
-        })
+        with span("payload_build"):
+            payload = self._build_payload({
+                "messages": messages,
+                "tools": needed_tools,
+                "tool_choice": "auto"
+            })
+        return messages, payload
+
+    async def _evaluate_one(
+        self,
+        input_data: dict,
+        num_samples: int = 1,
+        ) -> dict:
+        """
+        评测单个样本。num_samples > 1 时对同一问题采样多次：单轮评测一次请求 n 个 completion
+        （端点不支持时改为并发请求），需要工具或交互的多轮评测则并发运行多条独立轨迹。
+        """
+        components = self._resolve_components(input_data.get("data_source", None))
+        if components is None:
+            return None
+        tool_schemas, tool_instances, interaction_instance, reward_calculator = components
+        if num_samples > 1 and interaction_instance is not None:
+            return await self._evaluate_independent_samples(input_data, num_samples)
+        # 流式模式下由奖励计算器判断答案是否已完整输出
+        early_stop = getattr(reward_calculator, "should_stop_early", None) if self.stream and self.stream_early_stop else None
+
+        needed_tools = self._select_tools(input_data, tool_schemas)
+        if num_samples > 1 and needed_tools:
+            return await self._evaluate_independent_samples(input_data, num_samples)
+        messages, payload = await self._build_initial_request(input_data, needed_tools)
         # print("DEBUG payload", payload)
         all_payloads = [payload]
+        # 多次采样时除第一个 completion 外的其余 assistant 消息
+        extra_messages = None
         try:
             turn_record = {}
             context_instance_id_dict = {}
@@ -412,10 +989,11 @@ class BaseEvaluator:
                 for tool_name in tool_instances:
                     context_instance_id_dict[tool_name] = None
             if interaction_instance:
-                if "interaction_kwargs" in input_data["extra_info"]:
-                    interaction_instance_id = await interaction_instance.start_interaction(identity=input_data["extra_info"]["interaction_kwargs"]["identity"])
-                else:
-                     interaction_instance_id = await interaction_instance.start_interaction()
+                with span("interaction"):
+                    if "interaction_kwargs" in input_data["extra_info"]:
+                        interaction_instance_id = await interaction_instance.start_interaction(identity=input_data["extra_info"]["interaction_kwargs"]["identity"])
+                    else:
+                        interaction_instance_id = await interaction_instance.start_interaction()
             else:
                 interaction_instance_id = None
             # 循环控制逻辑：基于assistant和user轮次
@@ -429,7 +1007,11 @@ class BaseEvaluator:
                 current_tool_calls_executed = 0
                 while self.max_user_turns is None or user_turn_count < self.max_user_turns:
                     # print("DEBUG payload", payload)
-                    raw_response, usage = await self._call_api(payload)
+                    with span("api_call"):
+                        if num_samples > 1 and extra_messages is None:
+                            raw_response, usage, extra_messages = await self._call_api_samples(payload, num_samples, early_stop)
+                        else:
+                            raw_response, usage = await self._call_api(payload, early_stop)
                     if prompt_tokens == None:
                         prompt_tokens = usage.get("prompt_tokens", 0)
 
@@ -481,11 +1063,12 @@ class BaseEvaluator:
                     
                     messages.extend(tool_messages)
                     user_turn_count += len(tool_messages)
-                    payload = self._build_payload({
-                        "messages": messages,
-                        "tools": needed_tools,
-                        "tool_choice": "auto",
-                    })
+                    with span("payload_build"):
+                        payload = self._build_payload({
+                            "messages": messages,
+                            "tools": needed_tools,
+                            "tool_choice": "auto",
+                        })
                     all_payloads.append(payload)
                 
                 # 记录当前轮次的统计信息
@@ -495,7 +1078,8 @@ class BaseEvaluator:
 
                 # User响应轮次（通过interaction_instance）
                 if interaction_instance:
-                    should_terminate_sequence, response_content, current_turn_score, additional_data = await interaction_instance.generate_response(interaction_instance_id, messages)
+                    with span("interaction"):
+                        should_terminate_sequence, response_content, current_turn_score, additional_data = await interaction_instance.generate_response(interaction_instance_id, messages)
                     if should_terminate_sequence:
                         break
                     else:
@@ -511,28 +1095,39 @@ class BaseEvaluator:
 
             # 释放工具
             # print("DEBUG context_instance_id_dict", context_instance_id_dict)
-            for tool_name,instance_id in context_instance_id_dict.items():
-                if instance_id:
-                    tool_instance = tool_instances[tool_name]["instance"]
-                    await tool_instance.release(instance_id)
+            await self._release_tools(context_instance_id_dict, tool_instances)
 
             
             # 将整个消息上下文转换为字符串用于extract_output
-            full_context = self._messages_to_context(messages,tools=needed_tools)
-            if "prompt" in input_data:
-                response_context = self._messages_to_context(messages[len(input_data["prompt"]):])
-            elif "messages" in input_data:
-                response_context = self._messages_to_context(messages[len(input_data["messages"]):])
+            messages = await self._record_messages(messages)
+            with span("messages_to_context"):
+                full_context = self._messages_to_context(messages,tools=needed_tools)
+                if "prompt" in input_data:
+                    response_context = self._messages_to_context(messages[len(input_data["prompt"]):])
+                elif "messages" in input_data:
+                    response_context = self._messages_to_context(messages[len(input_data["messages"]):])
             # print("DEBUG full_context", full_context)
-            score = reward_calculator.verify_score(model_output=response_context, identity=input_data["reward_model"]["ground_truth"], **self.verify_correction_kwargs) if reward_calculator else None
-            extracted_output = reward_calculator.extract_output(response_context)
+            with span("verify_score"):
+                score = reward_calculator.verify_score(model_output=response_context, identity=input_data["reward_model"]["ground_truth"], **self.verify_correction_kwargs) if reward_calculator else None
+                extracted_output = reward_calculator.extract_output(response_context)
+                samples = None
+                if extra_messages is not None:
+                    samples = [{"score": score, "extracted_output": extracted_output, "success": True}]
+                    for extra_message in await self._record_messages(extra_messages):
+                        extra_context = self._messages_to_context([extra_message])
+                        samples.append({
+                            "score": reward_calculator.verify_score(model_output=extra_context, identity=input_data["reward_model"]["ground_truth"], **self.verify_correction_kwargs) if reward_calculator else None,
+                            "extracted_output": reward_calculator.extract_output(extra_context) if reward_calculator else None,
+                            "success": True,
+                            "message": extra_message,
+                        })
             # has reached_max_turns?
             reached_max_turns = (
                 (self.max_assistant_turns is not None and assistant_turn_count >= self.max_assistant_turns) or
                 (self.max_user_turns is not None and user_turn_count >= self.max_user_turns)
             )
             
-            return {
+            result = {
                 "input": input_data,
                 "tools": needed_tools,
                 "messages": messages,
@@ -551,21 +1146,26 @@ class BaseEvaluator:
                     "completion_tokens": total_completion_tokens,
                     "total_tokens": total_tokens,
                 },
-                "evaluation_config": {
-                    "model": self.api_model,
-                    "api_extra_params": self.api_extra_params,
-                    "api_extra_headers": self.api_extra_headers,
-                    "max_assistant_turns": self.max_assistant_turns,
-                    "max_user_turns": self.max_user_turns,
-                }
+                "evaluation_config": self._evaluation_config(),
             }
+            if samples is not None:
+                result.update(self._sample_group_fields(samples))
+            return result
+        except asyncio.CancelledError:
+            # 样本超时被取消时同样释放已创建的工具实例
+            if tool_instances and 'context_instance_id_dict' in locals():
+                await self._release_tools(context_instance_id_dict, tool_instances)
+            raise
         except Exception as e:
             import traceback
             traceback.print_exc()
+            # 评测中途失败时同样释放已创建的工具实例
+            if tool_instances and 'context_instance_id_dict' in locals():
+                await self._release_tools(context_instance_id_dict, tool_instances)
             return {
                 "input": input_data,
                 "tools": needed_tools if 'tools' in locals() else [],
-                "messages": messages,
+                "messages": await self._record_messages(messages),
                 "output": None,
                 "score": 0,
                 "error": str(e),
@@ -579,66 +1179,254 @@ class BaseEvaluator:
                     "completion_tokens": total_completion_tokens if 'total_completion_tokens' in locals() else 0,
                     "total_tokens": total_tokens if 'total_tokens' in locals() else 0
                 },
-                "evaluation_config": {
-                    "model": self.api_model,
-                    "api_extra_params": self.api_extra_params,
-                    "api_extra_headers": self.api_extra_headers,
-                    "max_assistant_turns": self.max_assistant_turns,
-                    "max_user_turns": self.max_user_turns,
-                }
+                "evaluation_config": self._evaluation_config(),
             }
 
+    async def _evaluate_with_deadline(self, input_data: dict) -> Optional[dict]:
+        """
+        评测单个样本；设置 sample_timeout 时超过时限即取消，记为超时失败的结果
+        """
+        if not self.sample_timeout:
+            return await self._evaluate_one(input_data, num_samples=self.num_samples)
+        try:
+            return await asyncio.wait_for(self._evaluate_one(input_data, num_samples=self.num_samples), timeout=self.sample_timeout)
+        except asyncio.TimeoutError:
+            self.timed_out_samples += 1
+            return {
+                "input": input_data,
+                "tools": [],
+                "messages": None,
+                "output": None,
+                "score": 0,
+                "error": f"Sample timed out after {self.sample_timeout}s",
+                "timed_out": True,
+                "reached_max_turns": False,
+                "turn_record": {},
+                "success": False,
+                "prompt_tokens": None,
+                "global_seq_tokens": 0,
+                "token_usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+                "evaluation_config": self._evaluation_config(),
+            }
+
+    async def _call_api_samples(
+        self,
+        payload: dict,
+        num_samples: int,
+        early_stop: Optional[Callable[[str], bool]] = None,
+        ) -> Tuple[Dict[str, Any], Dict[str, Any], List[Dict[str, Any]]]:
+        """
+        对同一 payload 获取 num_samples 个 completion，返回 (第一个响应, 合计 usage, 其余 assistant 消息)。
+
+        优先用 n 参数一次请求（prompt 只需处理一次）；流式模式、端点不支持 n 或返回数量不足时，
+        缺少的部分改为并发的独立请求。
+        """
+        responses = []
+        if not self.stream and self._n_supported is not False:
+            try:
+                response_dict, usage = await self._call_api({**payload, "n": num_samples})
+                choices = sorted(response_dict["choices"], key=lambda c: c.get("index", 0))
+                responses.append(({**response_dict, "choices": choices[:1]}, usage))
+                responses.extend(({**response_dict, "choices": [choice]}, {}) for choice in choices[1:num_samples])
+                if len(choices) < num_samples and self._n_supported is None:
+                    print(f"⚠️ 端点只返回了 {len(choices)}/{num_samples} 个 completion，改为并发请求剩余采样")
+                self._n_supported = len(choices) >= num_samples
+            except openai.BadRequestError as e:
+                print(f"⚠️ 端点不支持 n={num_samples}，改为并发请求: {e}")
+                self._n_supported = False
+        missing = range(len(responses), num_samples)
+        if missing:
+            responses.extend(await asyncio.gather(*[
+                run_as_sample(index, lambda: self._call_api(payload, early_stop)) for index in missing
+            ]))
+        usage = {}
+        for _, sample_usage in responses:
+            for key in ("prompt_tokens", "completion_tokens", "total_tokens"):
+                usage[key] = usage.get(key, 0) + ((sample_usage or {}).get(key) or 0)
+        extra_messages = [response_dict["choices"][0]["message"] for response_dict, _ in responses[1:]]
+        return responses[0][0], usage, extra_messages
+
+    async def _evaluate_independent_samples(self, input_data: dict, num_samples: int) -> dict:
+        """
+        多轮（工具 / 交互）评测的多次采样：并发运行 num_samples 条独立轨迹，
+        以第一条成功的轨迹作为主记录，汇总各轨迹的分数
+        """
+        results = await asyncio.gather(*[
+            run_as_sample(index, lambda: self._evaluate_one(input_data)) for index in range(num_samples)
+        ])
+        results = [r for r in results if r is not None]
+        if not results:
+            return None
+        primary_index = next((i for i, r in enumerate(results) if r.get("success")), 0)
+        primary = dict(results[primary_index])
+        samples = []
+        for i, r in enumerate(results):
+            sample = {"score": r.get("score"), "extracted_output": r.get("extracted_output"), "success": bool(r.get("success"))}
+            # 主记录的消息已在 messages 字段中
+            if i != primary_index:
+                sample["messages"] = r.get("messages")
+            samples.append(sample)
+        token_usage = {}
+        for r in results:
+            for key, value in (r.get("token_usage") or {}).items():
+                token_usage[key] = token_usage.get(key, 0) + (value or 0)
+        primary["token_usage"] = token_usage
+        primary.update(self._sample_group_fields(samples))
+        return primary
+
+    def _sample_group_fields(self, samples: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        多次采样的结果字段：score 为各次采样的平均分，sampling 为 pass@k / 多数投票 / 方差汇总
+        """
+        summary = summarize_samples(samples, self.sample_pass_threshold)
+        return {
+            "score": summary["score_mean"],
+            "samples": samples,
+            "sampling": summary,
+        }
+
+    def _evaluation_config(self) -> Dict[str, Any]:
+        """
+        每条结果记录的评测配置（紧凑格式下提升到结果文件头部）
+        """
+        return {
+            "model": self.api_model,
+            "api_extra_params": self.api_extra_params,
+            "api_extra_headers": self.api_extra_headers,
+            "max_assistant_turns": self.max_assistant_turns,
+            "max_user_turns": self.max_user_turns,
+            "num_samples": self.num_samples,
+        }
+
+    async def _record_messages(self, messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        写入结果记录的消息；开启图片外置时内联的 base64 图片替换为内容哈希引用
+
+        base64 解码和 sha256 计算在图片编码线程池中执行，不阻塞事件循环
+        """
+        if self.image_externalizer is None:
+            return messages
+        return await self.image_cache.run(self.image_externalizer.externalize, messages)
+
     async def _evaluate_batch(
         self,
-        input_list: List[dict],
+        input_list: Iterable[dict],
         max_concurrent: int = 1,
-        output_path: Optional[str] = None  # 新增参数
-        ) -> List[dict]:
-        results = []
-        
-        # 创建信号量控制并发数
-        semaphore = asyncio.Semaphore(max_concurrent)
-        results = [None] * len(input_list)
+        output_path: Optional[str] = None,  # 新增参数
+        total: Optional[int] = None,
+        collect_results: bool = True,
+        aggregator: Optional[EvaluationAggregator] = None,
+        ) -> Optional[List[dict]]:
+        """
+        并发评测一批样本。
 
+        input_list 可以是列表，也可以是惰性迭代器（流式模式）：生产者按需从迭代器取样本放入
+        容量为 max_concurrent 的有界队列，由 max_concurrent 个 worker 消费，
+        内存占用与数据集大小无关，首个请求无需等待整个数据集加载完成。
+        collect_results=False 时不在内存中保留结果（结果只写入 output_path），返回 None。
+        传入 aggregator 时每完成一个样本就增量更新统计。
+        """
+        if total is None and hasattr(input_list, "__len__"):
+            total = len(input_list)
+        await self._fit_connection_pool(max_concurrent)
+        if self.adaptive_concurrency:
+            # worker 数量取上限，实际在途请求数由控制器决定
+            self.concurrency_limiter = AdaptiveConcurrencyLimiter(min_limit=self.min_concurrent, max_limit=max_concurrent)
+        results = {}
+        queue = asyncio.Queue(maxsize=max_concurrent)
+        if self.dedup_requests:
+            self.request_dedup = RequestDeduplicator()
 
         # 创建进度条和锁
         progress_bar = tqdm(
-            total=len(input_list), 
-            desc="Evaling...",
+            total=total, 
+            desc="Evaling..." if self.progress_position is None else f"Evaling {self.api_model}",
+            position=self.progress_position,
             colour="cyan",
             dynamic_ncols=True,  # 允许动态调整宽度
             unit_scale=False
         )
         progress_lock = asyncio.Lock()
-        file_write_lock = asyncio.Lock()
-
-        async def worker(idx, input_data):
-            async with semaphore:
-                result = await self._evaluate_one(input_data)
-                results[idx] = result
-                if output_path:
-                    async with file_write_lock:
-                        with open(output_path, "a", encoding="utf-8") as f:
-                            try:
-                                f.write(json.dumps(result, ensure_ascii=False) + "\n")
-                            except Exception as e:
-                                print(f"❌ 写入结果失败: {e}")
-                                print(f"❌ 写入结果: {result}")
+        # 结果由后台线程编码并批量写入，worker 不再等待磁盘 I/O
+        # 紧凑格式：新文件先写头部，已有文件沿用其头部（没有头部时不提升配置）
+        new_file = bool(output_path) and (not os.path.exists(output_path) or os.path.getsize(output_path) == 0)
+        if self.compact_results and output_path:
+            self.result_header = make_result_header(self._evaluation_config()) if new_file else read_result_header(output_path)
+        writer = AsyncResultWriter(
+            output_path,
+            flush_interval=self.result_flush_interval,
+            flush_size=self.result_flush_size,
+            index_path=resume_index_path(output_path),
+            fingerprint_fn=self._sample_fingerprint,
+            transform=(lambda r: compact_result(r, self.result_header)) if self.compact_results else None,
+            header=self.result_header if self.compact_results and new_file else None,
+        ) if output_path else None
+        tracer = ChromeTraceWriter(strip_result_suffix(output_path) + ".trace.json") if self.trace and output_path else None
+        if tracer is not None and writer is not None:
+            writer.on_flush = tracer.record_flush
+
+        async def producer():
+            for idx, input_data in enumerate(input_list):
+                await queue.put((idx, input_data, time.monotonic()))
+            # 每个 worker 一个结束标记
+            for _ in range(max_concurrent):
+                await queue.put(None)
+
+        async def worker(worker_id: int):
+            while True:
+                item = await queue.get()
+                if item is None:
+                    break
+                idx, input_data, enqueued_at = item
+                # 记录样本各阶段耗时，写入结果的 timings 字段
+                with sample_spans() as spans:
+                    result = await self._evaluate_with_deadline(input_data)
+                if result is not None:
+                    result["timings"] = spans.summary()
+                if collect_results:
+                    results[idx] = result
+                if aggregator is not None:
+                    aggregator.update(result)
+                if writer:
+                    submit_started = time.monotonic()
+                    await writer.submit(result)
+                    spans.add("result_submit", submit_started, time.monotonic())
+                if tracer is not None:
+                    tracer.record_sample(
+                        worker_id,
+                        f"sample {idx}",
+                        spans,
+                        enqueued_at=enqueued_at,
+                        args={
+                            "data_source": input_data.get("data_source"),
+                            "success": bool(result and result.get("success")),
+                            "score": result.get("score") if result else None,
+                        },
+                    )
                 
                 # 任务完成时立即更新进度条
                 async with progress_lock:
                     progress_bar.update(1)
 
-        # 创建所有任务
-        tasks = [worker(idx, input_data) for idx, input_data in enumerate(input_list)]
-        
-        # 等待所有任务完成
-        await asyncio.gather(*tasks)
-        
-        # 关闭进度条
-        progress_bar.close()
+        # 启动生产者和固定数量的 worker，等待全部完成
+        try:
+            await asyncio.gather(producer(), *(worker(worker_id) for worker_id in range(max_concurrent)))
+        finally:
+            # 无论正常结束还是异常中断，都把已完成的结果写完并落盘
+            if writer:
+                await writer.aclose()
+            if tracer is not None:
+                tracer.close()
+                print(f"🧭 Trace timeline saved to: {tracer.path} ({tracer.events} events, open with https://ui.perfetto.dev)")
+            # 关闭进度条
+            progress_bar.close()
         
-        return results
+        if not collect_results:
+            return None
+        return [results[idx] for idx in sorted(results)]
+
+    def _sample_fingerprint(self, input_data: dict) -> str:
+        return sample_fingerprint(input_data, self.resume_key_field)
 
     def _load_bootcamp_registry(self, bootcamp_registry: str):
         with jsonlines.open(bootcamp_registry) as reader:
@@ -672,7 +1460,8 @@ class BaseEvaluator:
         yaml_interaction_path: Optional[str] = None,
         max_concurrent: int = 1,
         bootcamp_registry: Optional[str] = None,
-        resume_from_result_path: Optional[str] = None
+        resume_from_result_path: Optional[str] = None,
+        stream_dataset: bool = False,
         ) -> List[dict]:
         """
         启动完整评测流程
@@ -683,20 +1472,41 @@ class BaseEvaluator:
         - tool_registry: 自定义工具注册表（可选）
         - output_dir: 结果保存路径（JSONL）
         - yaml_tool_path: 工具 YAML 配置路径（如果传入，会覆盖当前 tools）
+        - stream_dataset: 流式模式，从 dataset_path 惰性读取样本，评测过程中不在内存中保留结果
+        """
+        self._load_components(yaml_tool_path, yaml_interaction_path, bootcamp_registry)
+        results, _ = await self._evaluate_dataset(
+            dataset=dataset,
+            dataset_path=dataset_path,
+            output_dir=output_dir,
+            yaml_tool_path=yaml_tool_path,
+            max_concurrent=max_concurrent,
+            resume_from_result_path=resume_from_result_path,
+            stream_dataset=stream_dataset,
+        )
+        return results
+
+    async def _evaluate_dataset(
+        self,
+        dataset: Optional[List[dict]] = None,
+        dataset_path: Optional[str] = None,
+        output_dir: Optional[str] = None,
+        yaml_tool_path: Optional[str] = None,
+        max_concurrent: int = 1,
+        resume_from_result_path: Optional[str] = None,
+        stream_dataset: bool = False,
+        ) -> Tuple[List[dict], dict]:
+        """
+        评测数据集并生成报告（工具、交互等组件需已加载），返回 (评测结果, 报告数据)。
+        断点重试时结果包括结果文件中已有的结果；流式模式下不保留结果，返回空列表
         """
-        # 加载工具配置（可选）
-        if yaml_tool_path:
-            self.tool_schemas, self.tool_instances = self._load_tools_from_yaml(yaml_tool_path)
-        else:
-            self.tool_schemas, self.tool_instances = None, None
-        if yaml_interaction_path:
-            self.interaction = self._load_interaction_from_yaml(yaml_interaction_path)
-        else:
-            self.interaction = None
-        if bootcamp_registry:
-            self._load_bootcamp_registry(bootcamp_registry)
         # 加载数据集
-        if dataset_path and not dataset:
+        stream_dataset = stream_dataset and bool(dataset_path) and not dataset
+        dataset_total = None
+        if stream_dataset:
+            dataset = iter_dataset(dataset_path)
+            dataset_total = count_dataset_rows(dataset_path)
+        elif dataset_path and not dataset:
             dataset = load_dataset(dataset_path)
 
         if not dataset:
@@ -704,38 +1514,39 @@ class BaseEvaluator:
 
         # 断点重试逻辑
         completed_inputs = set()
-        original_dataset_size = len(dataset)
+        original_dataset_size = dataset_total if stream_dataset else len(dataset)
         
         if resume_from_result_path and os.path.exists(resume_from_result_path):
             print(f"🔄 检测到断点重试模式，正在从 {resume_from_result_path} 加载已完成的结果...")
             try:
-                with open(resume_from_result_path, "r", encoding="utf-8") as f:
-                    for line in f:
-                        if line.strip():
-                            result = json.loads(line.strip())
-                            if result.get("input"):
-                                # 将input转换为字符串作为唯一标识
-                                input_key = json.dumps(result["input"], sort_keys=True, ensure_ascii=False)
-                                completed_inputs.add(input_key)
-                print(f"📊 已完成 {len(completed_inputs)} 个样本，剩余 {original_dataset_size - len(completed_inputs)} 个样本需要评测")
-                # 过滤已完成的样本
-                filtered_dataset = []
-                for item in dataset:
-                    item_key = json.dumps(item, sort_keys=True, ensure_ascii=False)
-                    if item_key not in completed_inputs:
-                        filtered_dataset.append(item)
-                dataset = filtered_dataset
+                # 已完成样本的定长指纹集合（优先读取 sidecar 索引）
+                completed_inputs = load_resume_index(resume_from_result_path, self.resume_key_field)
+                if original_dataset_size is not None:
+                    print(f"📊 已完成 {len(completed_inputs)} 个样本，剩余 {original_dataset_size - len(completed_inputs)} 个样本需要评测")
+                    if dataset_total is not None:
+                        dataset_total = max(dataset_total - len(completed_inputs), 0)
+                else:
+                    print(f"📊 已完成 {len(completed_inputs)} 个样本")
+                # 过滤已完成的样本（流式模式下惰性过滤）
+                filtered_dataset = (
+                    item for item in dataset
+                    if self._sample_fingerprint(item) not in completed_inputs
+                )
+                dataset = filtered_dataset if stream_dataset else list(filtered_dataset)
                 # 使用现有文件路径作为输出路径
                 output_path = resume_from_result_path
             except Exception as e:
                 print(f"⚠️ 读取已完成结果时发生错误: {e}，将重新开始评测")
                 completed_inputs = set()
-                output_path = os.path.join(output_dir, f"{self.api_model.replace('/', '-').strip('-')}/eval_results_{format_time_now()}.jsonl")
+                output_path = self._new_output_path(output_dir)
         else:
             # 正常模式，生成新的输出文件
-            output_path = os.path.join(output_dir, f"{self.api_model.replace('/', '-').strip('-')}/eval_results_{format_time_now()}.jsonl")
+            output_path = self._new_output_path(output_dir)
         
-        print(f"🚀 Starting evaluation with {len(dataset)} samples...")
+        if stream_dataset:
+            print(f"🚀 Starting streaming evaluation{f' with {dataset_total} samples' if dataset_total is not None else ''}...")
+        else:
+            print(f"🚀 Starting evaluation with {len(dataset)} samples...")
         
         # 清空或创建输出文件
         if not resume_from_result_path or not os.path.exists(output_path):
@@ -745,45 +1556,41 @@ class BaseEvaluator:
         # Create result file
         if output_path and not os.path.exists(os.path.dirname(output_path)):
             os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        # 新的结果文件对应新的断点索引
+        if output_path != resume_from_result_path:
+            write_index_header(resume_index_path(output_path), self.resume_key_field)
         print(f"💾 Evaluation results will be saved to: {output_path}")
         
-        if len(dataset) == 0:
+        summary_path = strip_result_suffix(output_path) + ".csv"
+        # 在线增量聚合评测统计；断点重试时先流式累加已有结果
+        aggregator = EvaluationAggregator()
+        if output_path == resume_from_result_path and os.path.exists(output_path):
+            aggregator.update_from_file(output_path)
+        
+        if not stream_dataset and len(dataset) == 0:
             print("✅ 所有样本已完成评测!")
-            # 加载完整结果用于报告生成
             results = []
-            if os.path.exists(output_path):
-                with open(output_path, "r", encoding="utf-8") as f:
-                    for line in f:
-                        if line.strip():
-                            results.append(json.loads(line.strip()))
         else:
-            results = await self._evaluate_batch(dataset, max_concurrent=max_concurrent, output_path=output_path)
-        summary_path = output_path.replace(".jsonl", ".csv")
-        
-        # 如果是断点重试模式，确保加载所有结果用于统计
-        if resume_from_result_path and len(completed_inputs) > 0:
-            # 重新加载完整结果
-            all_results = []
-            if os.path.exists(output_path):
-                with open(output_path, "r", encoding="utf-8") as f:
-                    for line in f:
-                        if line.strip():
-                            all_results.append(json.loads(line.strip()))
-            results = all_results
+            report_task = asyncio.create_task(
+                self._periodic_report(aggregator, dataset_path, yaml_tool_path, output_path, summary_path)
+            ) if self.report_interval else None
+            try:
+                results = await self._evaluate_batch(
+                    dataset,
+                    max_concurrent=max_concurrent,
+                    output_path=output_path,
+                    total=dataset_total,
+                    collect_results=not stream_dataset,
+                    aggregator=aggregator,
+                )
+            finally:
+                if report_task:
+                    report_task.cancel()
         
         # Save evaluation report, record accuracy, evaluation set, evaluation parameters, etc.
-        # Calculate accuracy
-        total = len(results)
-        score_sum = sum(
-            r.get("score", 0)
-            for r in results
-            if r.get("success") and isinstance(r.get("score"), (int, float))
-        )
-        avg_score = score_sum / total if total > 0 else 0
-
         # Generate detailed evaluation report
         report_data = self._generate_evaluation_report(
-            results, dataset_path, yaml_tool_path, output_path, avg_score, total
+            aggregator, dataset_path, yaml_tool_path, output_path
         )
         
         # Save CSV report
@@ -792,226 +1599,181 @@ class BaseEvaluator:
         # Print console report
         self._print_console_report(report_data)
 
-        return results
+        # 断点重试时返回结果文件中的全部结果，与一次完整运行的返回值一致
+        if not stream_dataset and completed_inputs and output_path == resume_from_result_path:
+            results = list(iter_results(output_path))
+        return results or [], report_data
+
+    async def run_multi_model_evaluation(
+        self,
+        targets: List[Dict[str, Any]],
+        dataset: Optional[List[dict]] = None,
+        dataset_path: Optional[str] = None,
+        output_dir: Optional[str] = None,
+        yaml_tool_path: Optional[str] = None,
+        yaml_interaction_path: Optional[str] = None,
+        max_concurrent: int = 1,
+        bootcamp_registry: Optional[str] = None,
+        ) -> Dict[str, List[dict]]:
+        """
+        在一个进程中评测多个模型，返回 {模型名: 结果列表}
+
+        参数:
+        - targets: 评测目标列表，每项包含 model，可选 api_url / api_key（为空时沿用当前评测器的配置）
+
+        数据集只加载一次，tokenizer、图片编码缓存、工具与奖励计算器在模型间共享；
+        各模型并发评测（每个模型 max_concurrent 个 worker），请求在各服务间交错，所有服务同时保持忙碌。
+        每个模型照常生成各自的结果文件与报告，另在 output_dir 下生成模型对比 CSV。
+        """
+        models = [target["model"] for target in targets]
+        if not models:
+            raise ValueError("targets 不能为空")
+        if len(set(models)) != len(models):
+            raise ValueError(f"评测目标中有重复的模型: {models}")
+        # 各模型的结果文件与模型对比 CSV 都写在 output_dir 下，评测开始前检查，避免评测完成后才失败
+        if not output_dir:
+            raise ValueError("多模型评测必须提供 output_dir")
+        self._load_components(yaml_tool_path, yaml_interaction_path, bootcamp_registry)
+        if not dataset:
+            if not dataset_path:
+                raise ValueError("必须提供 dataset 或 dataset_path")
+            dataset = load_dataset(dataset_path)
+        print(f"🚀 Evaluating {len(models)} models on {len(dataset)} samples: {', '.join(models)}")
+        evaluators = [self.for_target(target["model"], target.get("api_url"), target.get("api_key")) for target in targets]
+        for position, evaluator in enumerate(evaluators):
+            evaluator.progress_position = position
+        try:
+            outcomes = await asyncio.gather(*[
+                evaluator._evaluate_dataset(
+                    dataset=dataset,
+                    dataset_path=dataset_path,
+                    output_dir=output_dir,
+                    yaml_tool_path=yaml_tool_path,
+                    max_concurrent=max_concurrent,
+                )
+                for evaluator in evaluators
+            ])
+        finally:
+            for evaluator in evaluators:
+                await evaluator._close_endpoints()
+        reports = {model: report_data for model, (_, report_data) in zip(models, outcomes)}
+        comparison_path = os.path.join(output_dir, f"model_comparison_{format_time_now()}.csv")
+        save_comparison_csv(comparison_path, reports)
+        print_comparison(reports)
+        print(f"💾 Model comparison saved to: {comparison_path}")
+        return {model: results for model, (results, _) in zip(models, outcomes)}
+
+    def _load_components(
+        self,
+        yaml_tool_path: Optional[str] = None,
+        yaml_interaction_path: Optional[str] = None,
+        bootcamp_registry: Optional[str] = None,
+        ) -> None:
+        # 加载工具配置（可选）
+        if yaml_tool_path:
+            self.tool_schemas, self.tool_instances = self._load_tools_from_yaml(yaml_tool_path)
+        else:
+            self.tool_schemas, self.tool_instances = None, None
+        if yaml_interaction_path:
+            self.interaction = self._load_interaction_from_yaml(yaml_interaction_path)
+        else:
+            self.interaction = None
+        if bootcamp_registry:
+            self._load_bootcamp_registry(bootcamp_registry)
+
+    async def render_batch_requests(
+        self,
+        batch_request_path: str,
+        dataset: Optional[List[dict]] = None,
+        dataset_path: Optional[str] = None,
+        yaml_tool_path: Optional[str] = None,
+        yaml_interaction_path: Optional[str] = None,
+        bootcamp_registry: Optional[str] = None,
+        ) -> Dict[str, int]:
+        """
+        离线批量模式第一阶段：把每个样本的第一轮请求（与 _evaluate_one 相同的 payload，图片内联）
+        写成 OpenAI 批量请求 JSONL，交给 Batch API 或 vLLM run_batch 离线推理。
+
+        推理完成后用 batch_output_path 创建评测器并照常调用 run_evaluation，即可在不访问接口的情况下
+        计算奖励并生成报告。需要工具或交互的多轮样本依赖上一轮输出，无法离线生成，会被跳过。
+        """
+        self._load_components(yaml_tool_path, yaml_interaction_path, bootcamp_registry)
+        if not dataset:
+            if not dataset_path:
+                raise ValueError("必须提供 dataset 或 dataset_path")
+            dataset = iter_dataset(dataset_path)
+        stats = {"samples": 0, "requests": 0, "duplicates": 0, "skipped_multi_turn": 0, "skipped_unknown_source": 0}
+        with BatchRequestWriter(batch_request_path) as writer:
+            for input_data in tqdm(dataset, desc="Rendering...", colour="cyan", dynamic_ncols=True):
+                stats["samples"] += 1
+                components = self._resolve_components(input_data.get("data_source", None))
+                if components is None:
+                    stats["skipped_unknown_source"] += 1
+                    continue
+                tool_schemas, _, interaction_instance, _ = components
+                needed_tools = self._select_tools(input_data, tool_schemas)
+                if interaction_instance is not None or needed_tools:
+                    stats["skipped_multi_turn"] += 1
+                    continue
+                _, payload = await self._build_initial_request(input_data, needed_tools)
+                if self.num_samples > 1:
+                    payload = {**payload, "n": self.num_samples}
+                writer.write(payload)
+        stats["requests"] = writer.requests
+        stats["duplicates"] = writer.duplicates
+        print(f"📦 Rendered {stats['requests']} batch requests from {stats['samples']} samples to: {batch_request_path}")
+        if stats["duplicates"]:
+            print(f"♻️  {stats['duplicates']} samples share an identical request and will reuse its response")
+        if stats["skipped_multi_turn"] or stats["skipped_unknown_source"]:
+            print(f"⚠️ 跳过 {stats['skipped_multi_turn']} 个多轮（工具/交互）样本和 {stats['skipped_unknown_source']} 个未知数据源样本，离线模式不支持")
+        return stats
+
+    def _new_output_path(self, output_dir: str) -> str:
+        suffix = ".jsonl" + (ZSTD_SUFFIX if self.compress_results else "")
+        return os.path.join(output_dir, f"{self.api_model.replace('/', '-').strip('-')}/eval_results_{format_time_now()}{suffix}")
+
+    async def _periodic_report(
+        self,
+        aggregator: EvaluationAggregator,
+        dataset_path: Optional[str],
+        yaml_tool_path: Optional[str],
+        output_path: str,
+        summary_path: str,
+    ) -> None:
+        """
+        长时间运行时每隔 report_interval 秒根据当前聚合结果刷新一次 CSV 报告
+        """
+        while True:
+            await asyncio.sleep(self.report_interval)
+            report_data = self._generate_evaluation_report(aggregator, dataset_path, yaml_tool_path, output_path)
+            self._save_csv_report(summary_path, report_data)
+            overall = report_data["overall_stats"]
+            tqdm.write(
+                f"📝 Intermediate report: {overall['success_count']}/{overall['total_samples']} successful, "
+                f"avg score {overall['overall_avg_score']:.4f} -> {summary_path}"
+            )
 
     def _generate_evaluation_report(
         self, 
-        results: List[dict], 
+        aggregator: EvaluationAggregator, 
         dataset_path: Optional[str], 
         yaml_tool_path: Optional[str], 
         output_path: str, 
-        avg_score: float, 
-        total: int
     ) -> dict:
         """
-        Generate detailed evaluation report data
+        Generate detailed evaluation report data from the incremental aggregator
         
         Returns:
             dict: Dictionary containing all report data
         """
         # Basic statistics
-        success_count = sum(1 for r in results if r.get("success"))
+        total = aggregator.total
+        success_count = aggregator.success_count
         error_count = total - success_count
+        avg_score = aggregator.avg_score
         
         # Group statistics by data_source (one-to-many relationship: one data_source corresponds to multiple generators)
-        data_source_stats = {}
-        
-        # Detailed failure analysis
-        error_analysis = {"errors": [], "error_types": {}}
-        
-        for r in results:
-            # Get data_source and generator_name
-            data_source = r.get("input", {}).get("data_source", "Unknown")
-            generator_name = r.get("input", {}).get("extra_info", {}).get("generator_name", "")
-            
-            # Initialize data_source statistics
-            if data_source not in data_source_stats:
-                data_source_stats[data_source] = {
-                    "total_count": 0,
-                    "success_count": 0, 
-                    "error_count": 0,
-                    "total_score": 0,
-                    "avg_score": 0,
-                    "max_score": float('-inf'),  # 最高分数
-                    "min_score": float('inf'),   # 最低分数
-                    "total_assistant_turns": 0,  # 总assistant轮数
-                    "avg_assistant_turns": 0,    # 平均assistant轮数
-                    "total_tool_calls": 0,       # 总工具调用次数
-                    "avg_tool_calls": 0,         # 平均工具调用次数
-                    "total_interaction_turns": 0,  # 总interaction轮数
-                    "avg_interaction_turns": 0,    # 平均interaction轮数
-                    "total_initial_prompt_tokens": 0,           # 初始 prompt tokens
-                    "avg_initial_prompt_tokens": 0,      # 平均初始 prompt tokens
-                    "total_global_seq_tokens": 0,  # 总 global sequence tokens
-                    "avg_global_seq_tokens": 0,    # 平均 global sequence tokens
-                    "total_cumulative_prompt_tokens": 0,    # 总 combined prompt tokens
-                    "total_completion_tokens": 0,  # 总 completion tokens
-                    "total_tokens": 0,           # 总 tokens
-                    "avg_cumulative_prompt_tokens": 0,      # 平均 prompt tokens
-                    "avg_completion_tokens": 0,  # 平均 completion tokens
-                    "avg_tokens": 0,             # 平均 tokens
-                    "generators": {}  # All generators under this data source
-                }
-            
-            # Initialize generator statistics
-            if generator_name and generator_name not in data_source_stats[data_source]["generators"]:
-                data_source_stats[data_source]["generators"][generator_name] = {
-                    "total_count": 0,
-                    "success_count": 0, 
-                    "error_count": 0,
-                    "total_score": 0,
-                    "avg_score": 0,
-                    "max_score": float('-inf'),  # 最高分数
-                    "min_score": float('inf'),   # 最低分数
-                    "total_assistant_turns": 0,  # 总assistant轮数
-                    "avg_assistant_turns": 0,    # 平均assistant轮数
-                    "total_tool_calls": 0,       # 总工具调用次数
-                    "avg_tool_calls": 0,         # 平均工具调用次数
-                    "total_interaction_turns": 0,  # 总interaction轮数
-                    "avg_interaction_turns": 0,    # 平均interaction轮数
-                    "total_initial_prompt_tokens": 0,           # 初始 prompt tokens
-                    "avg_initial_prompt_tokens": 0,      # 平均初始 prompt tokens
-                    "total_global_seq_tokens": 0,  # 总 global sequence tokens
-                    "avg_global_seq_tokens": 0,    # 平均 global sequence tokens
-                    "total_cumulative_prompt_tokens": 0,    # 总 combined prompt tokens
-                    "total_completion_tokens": 0,  # 总 completion tokens
-                    "total_tokens": 0,           # 总 tokens
-                    "avg_cumulative_prompt_tokens": 0,      # 平均 prompt tokens
-                    "avg_completion_tokens": 0,  # 平均 completion tokens
-                    "avg_tokens": 0,             # 平均 tokens
-                }
-            
-            # Update data_source level statistics
-            data_source_stats[data_source]["total_count"] += 1
-            
-            if r.get("success"):
-                data_source_stats[data_source]["success_count"] += 1
-                current_score = r.get("score", 0)
-                if isinstance(current_score, (int, float)):
-                    data_source_stats[data_source]["total_score"] += current_score
-                    # 更新最高分和最低分
-                    data_source_stats[data_source]["max_score"] = max(
-                        data_source_stats[data_source]["max_score"], 
-                        current_score
-                    )
-                    data_source_stats[data_source]["min_score"] = min(
-                        data_source_stats[data_source]["min_score"], 
-                        current_score
-                    )
-                
-                # 计算工具调用统计数据
-                assistant_turns, tool_calls, interaction_turns = self._calculate_tool_statistics(r.get("turn_record", {}))
-                data_source_stats[data_source]["total_assistant_turns"] += assistant_turns
-                data_source_stats[data_source]["total_tool_calls"] += tool_calls
-                data_source_stats[data_source]["total_interaction_turns"] += interaction_turns
-                
-                # sample token usage statistics
-                data_source_stats[data_source]["total_initial_prompt_tokens"] += r.get("prompt_tokens", 0)
-                data_source_stats[data_source]["total_global_seq_tokens"] += r.get("global_seq_tokens", 0)
-
-                # 累计 token usage使用统计
-                token_usage = r.get("token_usage", {})
-                data_source_stats[data_source]["total_global_seq_tokens"] += token_usage.get("global_seq_tokens", 0)
-                data_source_stats[data_source]["total_cumulative_prompt_tokens"] += token_usage.get("prompt_tokens", 0)
-                data_source_stats[data_source]["total_completion_tokens"] += token_usage.get("completion_tokens", 0)
-                data_source_stats[data_source]["total_tokens"] += token_usage.get("total_tokens", 0)
-                
-                # Update generator level statistics
-                if generator_name:
-                    data_source_stats[data_source]["generators"][generator_name]["total_count"] += 1
-                    data_source_stats[data_source]["generators"][generator_name]["success_count"] += 1
-                    if isinstance(current_score, (int, float)):
-                        data_source_stats[data_source]["generators"][generator_name]["total_score"] += current_score
-                        # 更新生成器的最高分和最低分
-                        data_source_stats[data_source]["generators"][generator_name]["max_score"] = max(
-                            data_source_stats[data_source]["generators"][generator_name]["max_score"], 
-                            current_score
-                        )
-                        data_source_stats[data_source]["generators"][generator_name]["min_score"] = min(
-                            data_source_stats[data_source]["generators"][generator_name]["min_score"], 
-                            current_score
-                        )
-                    
-                    # 更新生成器的工具调用统计数据
-                    data_source_stats[data_source]["generators"][generator_name]["total_assistant_turns"] += assistant_turns
-                    data_source_stats[data_source]["generators"][generator_name]["total_tool_calls"] += tool_calls
-                    data_source_stats[data_source]["generators"][generator_name]["total_interaction_turns"] += interaction_turns
-                    # 累计生成器的 token 使用统计
-                    data_source_stats[data_source]["generators"][generator_name]["total_initial_prompt_tokens"] += r.get("prompt_tokens", 0)
-                    data_source_stats[data_source]["generators"][generator_name]["total_global_seq_tokens"] += r.get("global_seq_tokens", 0)
-                    data_source_stats[data_source]["generators"][generator_name]["total_cumulative_prompt_tokens"] += token_usage.get("prompt_tokens", 0)
-                    data_source_stats[data_source]["generators"][generator_name]["total_completion_tokens"] += token_usage.get("completion_tokens", 0)
-                    data_source_stats[data_source]["generators"][generator_name]["total_tokens"] += token_usage.get("total_tokens", 0)
-            else:
-                data_source_stats[data_source]["error_count"] += 1
-                
-                # Update generator level statistics
-                if generator_name:
-                    data_source_stats[data_source]["generators"][generator_name]["total_count"] += 1
-                    data_source_stats[data_source]["generators"][generator_name]["error_count"] += 1
-                
-                # Record error information
-                error_info = {
-                    "data_source": data_source,
-                    "generator_name": generator_name,
-                    "error": r.get("error", "Unknown error"),
-                    "input_id": r.get("input", {}).get("id", "Unknown")
-                }
-                error_analysis["errors"].append(error_info)
-                
-                # 统计错误类型
-                error_type = str(r.get("error", "Unknown error"))[:50]
-                error_analysis["error_types"][error_type] = error_analysis["error_types"].get(error_type, 0) + 1
-        
-        # 计算平均分和平均工具调用统计
-        for data_source, stats in data_source_stats.items():
-            # 计算 data_source 层级平均分
-            if stats["success_count"] > 0:
-                stats["avg_score"] = stats["total_score"] / stats["success_count"]
-                stats["avg_assistant_turns"] = stats["total_assistant_turns"] / stats["success_count"]
-                stats["avg_tool_calls"] = stats["total_tool_calls"] / stats["success_count"]
-                stats["avg_cumulative_prompt_tokens"] = stats["total_cumulative_prompt_tokens"] / stats["success_count"]
-                stats["avg_completion_tokens"] = stats["total_completion_tokens"] / stats["success_count"]
-                stats["avg_tokens"] = stats["total_tokens"] / stats["success_count"]
-                stats["avg_interaction_turns"] = stats["total_interaction_turns"] / stats["success_count"]
-                stats["avg_initial_prompt_tokens"] = stats["total_initial_prompt_tokens"] / stats["success_count"]
-                stats["avg_global_seq_tokens"] = stats["total_global_seq_tokens"] / stats["success_count"]
-            else:
-                # 如果没有成功样本，重置最大最小分数
-                stats["max_score"] = 0
-                stats["min_score"] = 0
-                stats["avg_assistant_turns"] = 0
-                stats["avg_tool_calls"] = 0
-                stats["avg_interaction_turns"] = 0
-                stats["avg_cumulative_prompt_tokens"] = 0
-                stats["avg_completion_tokens"] = 0
-                stats["avg_tokens"] = 0
-                stats["avg_initial_prompt_tokens"] = 0
-                stats["avg_global_seq_tokens"] = 0
-            
-            # 计算各 generator 平均分和平均工具调用统计
-            for generator_name, gen_stats in stats["generators"].items():
-                if gen_stats["success_count"] > 0:
-                    gen_stats["avg_score"] = gen_stats["total_score"] / gen_stats["success_count"]
-                    gen_stats["avg_assistant_turns"] = gen_stats["total_assistant_turns"] / gen_stats["success_count"]
-                    gen_stats["avg_tool_calls"] = gen_stats["total_tool_calls"] / gen_stats["success_count"]
-                    gen_stats["avg_cumulative_prompt_tokens"] = gen_stats["total_cumulative_prompt_tokens"] / gen_stats["success_count"]
-                    gen_stats["avg_completion_tokens"] = gen_stats["total_completion_tokens"] / gen_stats["success_count"]
-                    gen_stats["avg_tokens"] = gen_stats["total_tokens"] / gen_stats["success_count"]
-                    gen_stats["avg_interaction_turns"] = gen_stats["total_interaction_turns"] / gen_stats["success_count"]
-                    gen_stats["avg_initial_prompt_tokens"] = gen_stats["total_initial_prompt_tokens"] / gen_stats["success_count"]
-                    gen_stats["avg_global_seq_tokens"] = gen_stats["total_global_seq_tokens"] / gen_stats["success_count"]
-                else:
-                    gen_stats["max_score"] = 0
-                    gen_stats["min_score"] = 0
-                    gen_stats["avg_assistant_turns"] = 0
-                    gen_stats["avg_tool_calls"] = 0
-                    gen_stats["avg_interaction_turns"] = 0
-                    gen_stats["avg_cumulative_prompt_tokens"] = 0
-                    gen_stats["avg_completion_tokens"] = 0
-                    gen_stats["avg_tokens"] = 0
-                    gen_stats["avg_initial_prompt_tokens"] = 0
-                    gen_stats["avg_global_seq_tokens"] = 0
+        data_source_stats, error_analysis = aggregator.snapshot()
         # 汇总报告数据
         report_data = {
             "basic_info": {
@@ -1032,12 +1794,55 @@ class BaseEvaluator:
                 "overall_avg_score": avg_score,
             },
             "data_source_stats": data_source_stats,
-            "error_analysis": error_analysis
+            "error_analysis": error_analysis,
+            "runtime_stats": self._collect_runtime_stats(),
+            "latency_stats": aggregator.latency_snapshot(),
+            "sampling_stats": aggregator.sampling_snapshot(),
+            "circuit_breaker_transitions": list(self.circuit_breaker.transitions) if self.circuit_breaker is not None else [],
         }
         
         return report_data
+
+    def _collect_runtime_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        收集评测过程中的运行时统计（缓存命中等），按报告小节名组织
+        """
+        runtime_stats = {}
+        if self.response_cache is not None:
+            runtime_stats["Response Cache"] = self.response_cache.stats()
+        runtime_stats["HTTP Connections"] = self.http_connection_stats.stats()
+        if self.image_cache.lookups:
+            runtime_stats["Image Encoding Cache"] = self.image_cache.stats()
+        if self.image_externalizer is not None:
+            runtime_stats["Image Externalization"] = self.image_externalizer.stats()
+        for tool_name, stats in self.tool_stats.stats().items():
+            runtime_stats[f"Tool {tool_name}"] = stats
+        if self.concurrency_limiter is not None:
+            runtime_stats["Adaptive Concurrency"] = self.concurrency_limiter.stats()
+        if self.rate_limiter is not None:
+            runtime_stats["Rate Limiter"] = self.rate_limiter.stats()
+        if self.streaming_stats.requests:
+            runtime_stats["Streaming"] = self.streaming_stats.stats()
+        if self.circuit_breaker is not None:
+            runtime_stats["Circuit Breaker"] = self.circuit_breaker.stats()
+        if self.retry_budget is not None:
+            runtime_stats["Retry Budget"] = self.retry_budget.stats()
+        if self.hedge_policy is not None:
+            runtime_stats["Hedged Requests"] = self.hedge_policy.stats()
+        if self.batch_responses is not None:
+            runtime_stats["Batch Ingest"] = self.batch_responses.stats()
+        if self.completion_batcher is not None and self.completion_batcher.requests:
+            runtime_stats["Batched Completions"] = self.completion_batcher.stats()
+        if self.sample_timeout:
+            runtime_stats["Sample Deadline"] = {"timeout_seconds": self.sample_timeout, "timed_out": self.timed_out_samples}
+        if self.request_dedup is not None and self.request_dedup.requests:
+            runtime_stats["Request Dedup"] = self.request_dedup.stats()
+        if len(self.endpoint_pool) > 1:
+            for name, stats in self.endpoint_pool.stats().items():
+                runtime_stats[f"Endpoint {name}"] = stats
+        return runtime_stats
     
-    def _calculate_tool_statistics(self, turn_record: dict) -> Tuple[int, int]:
+    def _calculate_tool_statistics(self, turn_record: dict) -> Tuple[int, int, int]:
         """
         计算工具相关统计数据
         
@@ -1045,17 +1850,9 @@ class BaseEvaluator:
             turn_record: 包含每轮交互记录的字典
             
         Returns:
-            Tuple[int, int]: (总assistant轮数, 总工具调用次数)
-        """
-        total_assistant_turns = 0
-        total_tool_calls = 0
-        total_interaction_turns = 0
-        for turn_key, turn_data in turn_record.items():
-            if turn_key.startswith("interaction_turn_"):
-                total_assistant_turns += turn_data.get("assistant_turns", 0)
-                total_tool_calls += turn_data.get("tool_calls_executed", 0)
-                total_interaction_turns += 1
-        return total_assistant_turns, total_tool_calls, total_interaction_turns
+            Tuple[int, int, int]: (总assistant轮数, 总工具调用次数, 总interaction轮数)
+        """
+        return calculate_tool_statistics(turn_record)
 
     def _save_csv_report(self, summary_path: str, report_data: dict) -> None:
         """
@@ -1092,6 +1889,22 @@ class BaseEvaluator:
             writer.writerow(["Overall Average Score", f"{overall['overall_avg_score']:.4f}"])
             
             writer.writerow([])  # 空行分隔
+
+            # 2.1 Runtime Statistics (cache etc.)
+            for section, stats in report_data.get("runtime_stats", {}).items():
+                writer.writerow([section])
+                writer.writerow(["Metric", "Value"])
+                for key, value in stats.items():
+                    writer.writerow([key, f"{value:.4f}" if isinstance(value, float) else value])
+                writer.writerow([])  # 空行分隔
+
+            # 2.2 Circuit Breaker Transitions
+            if report_data.get("circuit_breaker_transitions"):
+                writer.writerow(["Circuit Breaker Transitions"])
+                writer.writerow(["Time (s)", "From", "To", "Reason"])
+                for transition in report_data["circuit_breaker_transitions"]:
+                    writer.writerow([f"{transition['time']:.2f}", transition["from"], transition["to"], transition["reason"]])
+                writer.writerow([])  # 空行分隔
             
             # 3. Data Source Summary Statistics
             if report_data["data_source_stats"]:
@@ -1182,6 +1995,52 @@ class BaseEvaluator:
                         ])
                 
                 writer.writerow([])  # 空行分隔
+
+            # 4.1 Sampling Statistics (pass@k / majority vote)
+            sampling_stats = report_data.get("sampling_stats", {})
+            if sampling_stats:
+                ks = sorted({k for stats in sampling_stats.values() for k in stats["pass_at_k"]}, key=int)
+                writer.writerow(["Sampling Statistics"])
+                writer.writerow(["Data Source", "Questions", "Samples/Question"] + [f"pass@{k}" for k in ks] + ["Majority Vote Accuracy", "Mean Score Variance"])
+                for data_source, stats in sampling_stats.items():
+                    writer.writerow(
+                        [data_source, stats["questions"], f"{stats['samples_per_question']:.2f}"]
+                        + [f"{stats['pass_at_k'][k]:.4f}" if k in stats["pass_at_k"] else "" for k in ks]
+                        + [f"{stats['majority_vote_accuracy']:.4f}", f"{stats['mean_score_variance']:.4f}"]
+                    )
+                writer.writerow([])  # 空行分隔
+
+            # 4.2 Latency / Throughput Statistics
+            latency_stats = report_data.get("latency_stats", {})
+            if latency_stats:
+                writer.writerow(["Latency Statistics (seconds per sample)"])
+                writer.writerow(["Data Source", "Stage", "Count", "Mean", "P50", "P90", "P99"])
+                for data_source, entry in latency_stats.items():
+                    for stage, stage_stats in entry["stages"].items():
+                        writer.writerow([
+                            data_source,
+                            stage,
+                            stage_stats["count"],
+                            f"{stage_stats['mean']:.4f}",
+                            f"{stage_stats['p50']:.4f}",
+                            f"{stage_stats['p90']:.4f}",
+                            f"{stage_stats['p99']:.4f}",
+                        ])
+                writer.writerow([])  # 空行分隔
+
+                writer.writerow(["Throughput Statistics (this run)"])
+                writer.writerow(["Data Source", "Samples", "Wall Time (s)", "Samples/s", "Completion Tokens/s"])
+                for data_source, entry in latency_stats.items():
+                    throughput = entry.get("throughput")
+                    if throughput:
+                        writer.writerow([
+                            data_source,
+                            throughput["samples"],
+                            f"{throughput['wall_seconds']:.2f}",
+                            f"{throughput['samples_per_second']:.4f}",
+                            f"{throughput['completion_tokens_per_second']:.2f}",
+                        ])
+                writer.writerow([])  # 空行分隔
             
             # 5. Error Analysis
             if report_data["error_analysis"]["errors"]:
@@ -1207,7 +2066,7 @@ class BaseEvaluator:
         Print formatted console report
         """
         # Output file path
-        print(f"\n💾 Evaluation report saved to: {report_data['basic_info']['output_path'].replace('.jsonl', '.csv')}")
+        print(f"\n💾 Evaluation report saved to: {strip_result_suffix(report_data['basic_info']['output_path']) + '.csv'}")
         
         # Overall Summary Section
         overall = report_data["overall_stats"]
@@ -1216,6 +2075,49 @@ class BaseEvaluator:
         print(f"{'='*100}")
         print(f"  ✅ Overall Status     : {overall['success_count']}/{overall['total_samples']} successful (Success Rate: {overall['success_rate']:.1%})")
         print(f"  📈 Average Score      : {overall['overall_avg_score']:.4f}")
+        runtime_stats = report_data.get("runtime_stats", {})
+        cache_stats = runtime_stats.get("Response Cache")
+        if cache_stats:
+            print(f"  🗄️  Response Cache     : {cache_stats['hits']} hits / {cache_stats['misses']} misses (Hit Rate: {cache_stats['hit_rate']:.1%}, mode: {cache_stats['mode']})")
+        http_stats = runtime_stats.get("HTTP Connections")
+        if http_stats and http_stats["requests"]:
+            print(f"  🔌 HTTP Connections   : {http_stats['requests']} requests over {http_stats['new_connections']} connections (Reuse Rate: {http_stats['connection_reuse_rate']:.1%}, {'HTTP/2' if http_stats['http2'] else 'HTTP/1.1'})")
+        image_stats = runtime_stats.get("Image Encoding Cache")
+        if image_stats:
+            print(f"  🖼️  Image Encoding     : {image_stats['encoded']} encoded, {image_stats['memory_hits'] + image_stats['disk_hits'] + image_stats['inflight_hits']} reused (Hit Rate: {image_stats['hit_rate']:.1%}, {image_stats['encode_seconds']:.2f}s encoding)")
+        concurrency_stats = runtime_stats.get("Adaptive Concurrency")
+        if concurrency_stats:
+            print(f"  🎚️  Concurrency        : final {concurrency_stats['final_limit']}, peak {concurrency_stats['peak_limit']}, avg {concurrency_stats['time_weighted_avg_limit']:.1f} ({concurrency_stats['increases']} increases / {concurrency_stats['decreases']} decreases)")
+        breaker_stats = runtime_stats.get("Circuit Breaker")
+        if breaker_stats and breaker_stats["opens"]:
+            print(f"  ⚡ Circuit Breaker    : opened {breaker_stats['opens']}x ({breaker_stats['open_seconds']:.1f}s open), {breaker_stats['rejected']} requests rejected, final state {breaker_stats['state']}")
+        retry_stats = runtime_stats.get("Retry Budget")
+        if retry_stats and (retry_stats["retries"] or retry_stats["retries_denied"]):
+            print(f"  🔁 Retries            : {retry_stats['retries']} retries for {retry_stats['successful_requests']} successful requests ({retry_stats['retry_ratio']:.1%}), {retry_stats['retries_denied']} denied by budget")
+        hedge_stats = runtime_stats.get("Hedged Requests")
+        if hedge_stats:
+            print(f"  🪃 Hedged Requests    : {hedge_stats['hedged']}/{hedge_stats['requests']} hedged ({hedge_stats['hedge_rate']:.1%}), hedge won {hedge_stats['hedge_wins']}, delay {hedge_stats['current_delay_seconds']:.2f}s")
+        batcher_stats = runtime_stats.get("Batched Completions")
+        if batcher_stats:
+            print(f"  🧺 Batched Completions: {batcher_stats['requests']} prompts in {batcher_stats['batches']} /v1/completions calls (avg batch {batcher_stats['avg_batch_size']:.1f}, {batcher_stats['failed_batches']} failed)")
+        batch_stats = runtime_stats.get("Batch Ingest")
+        if batch_stats:
+            print(f"  📦 Batch Ingest       : {batch_stats['hits']} responses read from {batch_stats['files']} batch output file(s), {batch_stats['missing']} missing, {batch_stats['failed']} failed")
+        deadline_stats = runtime_stats.get("Sample Deadline")
+        if deadline_stats and deadline_stats["timed_out"]:
+            print(f"  ⏰ Sample Deadline    : {deadline_stats['timed_out']} samples exceeded {deadline_stats['timeout_seconds']}s and were recorded as timeouts")
+        dedup_stats = runtime_stats.get("Request Dedup")
+        if dedup_stats:
+            print(f"  ♻️  Request Dedup      : {dedup_stats['saved_calls']}/{dedup_stats['deterministic_requests']} identical requests served without an API call ({dedup_stats['saved_rate']:.1%})")
+        streaming_stats = runtime_stats.get("Streaming")
+        if streaming_stats:
+            print(f"  📡 Streaming          : {streaming_stats['early_stopped']}/{streaming_stats['requests']} stopped early ({streaming_stats['early_stop_rate']:.1%}), avg {streaming_stats['avg_completion_tokens']:.0f} completion tokens, TTFT {streaming_stats['avg_ttft_seconds'] * 1000:.0f}ms")
+        # 工具与端点按名称各占一行，与 _collect_runtime_stats 中的顺序一致
+        for section, stats in runtime_stats.items():
+            if section.startswith("Tool "):
+                print(f"  🔧 {section[len('Tool '):]:<18}: {stats['create_count']} creates ({stats['create_avg_seconds'] * 1000:.0f}ms avg), {stats['execute_count']} executes ({stats['execute_avg_seconds'] * 1000:.0f}ms avg, {stats['execute_errors']} errors), {stats['release_count']} releases")
+            elif section.startswith("Endpoint "):
+                print(f"  🌐 {section[len('Endpoint '):]:<18}: {stats['successes']}/{stats['requests']} ok, avg latency {stats['avg_latency_seconds']:.2f}s, {stats['completion_tokens_per_second']:.1f} tok/s, ejected {stats['ejections']}x")
         print(f"{'='*100}")
         
         # Statistics grouped by data source (hierarchical structure)
@@ -1306,13 +2208,50 @@ class BaseEvaluator:
                     print(f"{'-'*159}")
             
             print(f"{'='*159}")
+
+        # pass@k / majority vote by data source
+        sampling_stats = report_data.get("sampling_stats", {})
+        if sampling_stats:
+            print(f"\n{'='*100}")
+            print(f"{'🎲 SAMPLING (PASS@K / MAJORITY VOTE) BY DATA SOURCE':^100}")
+            print(f"{'='*100}")
+            for data_source, stats in sampling_stats.items():
+                pass_at_k = ", ".join(f"pass@{k} {value:.4f}" for k, value in stats["pass_at_k"].items())
+                print(f"  {data_source:<20}: {stats['questions']} questions x {stats['samples_per_question']:.0f} samples | {pass_at_k} | maj@{stats['samples_per_question']:.0f} {stats['majority_vote_accuracy']:.4f} | score var {stats['mean_score_variance']:.4f}")
+            print(f"{'='*100}")
+
+        # Latency / throughput by data source
+        latency_stats = report_data.get("latency_stats", {})
+        if latency_stats:
+            print(f"\n{'='*100}")
+            print(f"{'⏱️  LATENCY & THROUGHPUT BY DATA SOURCE':^100}")
+            print(f"{'='*100}")
+            print(f"{'Data Source':<20} {'Stage':<20} {'Count':>8} {'Mean':>9} {'P50':>9} {'P90':>9} {'P99':>9}")
+            print(f"{'-'*100}")
+            for data_source, entry in latency_stats.items():
+                for idx, (stage, stage_stats) in enumerate(entry["stages"].items()):
+                    source_col = data_source if idx == 0 else ""
+                    print(
+                        f"{source_col:<20} {stage:<20} {stage_stats['count']:>8} "
+                        f"{stage_stats['mean']:>8.3f}s {stage_stats['p50']:>8.3f}s "
+                        f"{stage_stats['p90']:>8.3f}s {stage_stats['p99']:>8.3f}s"
+                    )
+                throughput = entry.get("throughput")
+                if throughput:
+                    print(
+                        f"  └─ Throughput: {throughput['samples_per_second']:.2f} samples/s, "
+                        f"{throughput['completion_tokens_per_second']:.1f} completion tokens/s "
+                        f"({throughput['samples']} samples in {throughput['wall_seconds']:.1f}s)"
+                    )
+                print(f"{'-'*100}")
+            print(f"{'='*100}")
         
         # Error Summary Section
         if report_data["error_analysis"]["errors"]:
             print(f"\n{'='*100}")
             print(f"{'⚠️  ERROR SUMMARY':^100}")
             print(f"{'='*100}")
-            print(f"  Total Errors: {len(report_data['error_analysis']['errors'])}")
+            print(f"  Total Errors: {sum(report_data['error_analysis']['error_types'].values())}")
             print(f"\n  Main Error Types:")
             for error_type, count in list(report_data["error_analysis"]["error_types"].items())[:3]:
                 print(f"    • {error_type:<80} ({count} occurrence{'s' if count > 1 else ''})")
@@ -15,6 +15,20 @@ class BaseRewardCalculator:
         """
         pass
     
+    @classmethod
+    def should_stop_early(cls, partial_output: str) -> bool:
+        """
+        Early-stop predicate used by the evaluator in streaming mode.
+
+        Called with the response generated so far; returning True cancels the stream
+        because the answer is already complete. Reasoning streamed separately as
+        reasoning_content is passed wrapped in <think>...</think> before the content,
+        as in the recorded context. It is re-evaluated only when a chunk
+        ends a line, closes a tag (">") or terminates a number. Defaults to never
+        stopping early.
+        """
+        return False
+
     @abstractmethod
     def _verify_correction(self, extract_solution: dict, identity: dict, **kwargs) -> float:
         """
@@ -1,15 +1,53 @@
 import os
 import io
+import math
 import base64
 from PIL import Image
 
+# 估算编码体积时使用的探测图长边（另一张探测图再缩小一半）
+PROBE_EDGE = 512
+# 预留的体积余量，抵消估算误差
+SIZE_MARGIN = 0.95
+# JPEG 每像素字节数的保守上界；低于该上界即可确定不会超过 MAX_IMAGE_SIZE，无需估算
+WORST_BYTES_PER_PIXEL = 3
+# 按实际体积继续缩小时每次至少缩小到的比例，保证有限步内结束
+MAX_SHRINK_STEP = 0.7
+
+
 def resize_image_by_factor(img, factor=1):
     w, h = img.size
-    new_w, new_h = int(w * factor), int(h * factor)
+    new_w, new_h = max(1, int(w * factor)), max(1, int(h * factor))
     img = img.resize((new_w, new_h))
     return img
 
 
+def _size_limits():
+    max_size = int(os.environ.get('MAX_IMAGE_SIZE', 1e9))
+    min_edge = int(os.environ.get('MIN_IMAGE_EDGE', 1e2))
+    return max_size, min_edge
+
+
+def _base64_length(n_bytes):
+    return 4 * ((n_bytes + 2) // 3)
+
+
+def _encode(img, fmt):
+    img_buffer = io.BytesIO()
+    img.save(img_buffer, format=fmt)
+    return img_buffer.getvalue()
+
+
+def _fit_bytes_model(img, fmt):
+    # 在两个小尺寸上编码，拟合 编码字节数 = b * (像素数 / p) ** alpha，用于外推原图任意缩放后的体积
+    # 探测图用整数倍盒式下采样（reduce）生成，开销远小于一次全尺寸编码
+    large = img.reduce(max(1, math.ceil(max(img.size) / PROBE_EDGE)))
+    small = large.reduce(2)
+    p1, b1 = small.size[0] * small.size[1], len(_encode(small, fmt))
+    p2, b2 = large.size[0] * large.size[1], len(_encode(large, fmt))
+    alpha = math.log(b2 / b1) / math.log(p2 / p1) if p2 > p1 and b2 > 0 and b1 > 0 else 1.0
+    return p2, b2, min(1.5, max(0.3, alpha))
+
+
 def encode_image_to_base64(img, target_size=-1, fmt='JPEG'):
     # if target_size == -1, will not do resizing
     # else, will set the max_size ot (target_size, target_size)
@@ -17,31 +55,30 @@ def encode_image_to_base64(img, target_size=-1, fmt='JPEG'):
         img = img.convert('RGB')
     if target_size > 0:
         img.thumbnail((target_size, target_size))
-    img_buffer = io.BytesIO()
-    img.save(img_buffer, format=fmt)
-    image_data = img_buffer.getvalue()
-    ret = base64.b64encode(image_data).decode('utf-8')
-    max_size = os.environ.get('MAX_IMAGE_SIZE', 1e9)
-    min_edge = os.environ.get('MIN_IMAGE_EDGE', 1e2)
-    max_size = int(max_size)
-    min_edge = int(min_edge)
+    max_size, min_edge = _size_limits()
 
-    if min(img.size) < min_edge:
-        factor = min_edge / min(img.size)
-        image_new = resize_image_by_factor(img, factor)
-        img_buffer = io.BytesIO()
-        image_new.save(img_buffer, format=fmt)
-        image_data = img_buffer.getvalue()
-        ret = base64.b64encode(image_data).decode('utf-8')
-
-    factor = 1
-    while len(ret) > max_size:
-        factor *= 0.7  # Half Pixels Per Resize, approximately
+    # 预先确定目标分辨率：短边不足 MIN_IMAGE_EDGE 时放大，预计超过 MAX_IMAGE_SIZE 时按像素数缩小
+    w, h = img.size
+    factor = 1.0
+    if min(w, h) < min_edge:
+        factor = min_edge / min(w, h)
+    max_bytes = max_size * 3 // 4
+    if w * h * factor * factor * WORST_BYTES_PER_PIXEL > max_bytes and max(w, h) > 2 * PROBE_EDGE:
+        probe_pixels, probe_bytes, alpha = _fit_bytes_model(img, fmt)
+        budget = max_bytes * SIZE_MARGIN
+        if probe_bytes * (w * h * factor * factor / probe_pixels) ** alpha > budget:
+            target_pixels = probe_pixels * (budget / probe_bytes) ** (1 / alpha)
+            factor = math.sqrt(target_pixels / (w * h))
+
+    image_new = img if factor == 1 else resize_image_by_factor(img, factor)
+    image_data = _encode(image_new, fmt)
+    # 估算偏小时按实际体积继续缩小（极少发生）；缩到 1x1 仍超出时 MAX_IMAGE_SIZE 无法满足
+    while _base64_length(len(image_data)) > max_size:
+        if max(image_new.size) <= 1:
+            raise ValueError(f'`MAX_IMAGE_SIZE` {max_size} is too small, a 1x1 image still exceeds it')
+        factor *= min(MAX_SHRINK_STEP, math.sqrt(max_bytes / len(image_data)) * SIZE_MARGIN)
         image_new = resize_image_by_factor(img, factor)
-        img_buffer = io.BytesIO()
-        image_new.save(img_buffer, format=fmt)
-        image_data = img_buffer.getvalue()
-        ret = base64.b64encode(image_data).decode('utf-8')
+        image_data = _encode(image_new, fmt)
 
     if factor < 1:
         new_w, new_h = image_new.size
@@ -50,9 +87,27 @@ def encode_image_to_base64(img, target_size=-1, fmt='JPEG'):
             f'resize to {factor:.2f} of original size: ({new_w}, {new_h})'
         )
 
-    return ret
+    return base64.b64encode(image_data).decode('utf-8')
+
+
+def _can_pass_through(img, image_path, target_size, fmt):
+    # 已经是合规的 JPEG 时直接使用原始字节，无需解码和重新编码
+    if fmt.upper() != 'JPEG' or img.format != 'JPEG' or img.mode not in ('RGB', 'L'):
+        return False
+    # 重新编码会去掉 EXIF（包括方向标记），带 EXIF 的文件仍重新编码，保证两种路径的输出一致
+    if img.info.get('exif'):
+        return False
+    max_size, min_edge = _size_limits()
+    if target_size > 0 and max(img.size) > target_size:
+        return False
+    if min(img.size) < min_edge:
+        return False
+    return _base64_length(os.path.getsize(image_path)) <= max_size
 
 
 def encode_image_file_to_base64(image_path, target_size=-1, fmt='JPEG'):
-    image = Image.open(image_path)
-    return encode_image_to_base64(image, target_size=target_size, fmt=fmt)
\ No newline at end of file
+    with Image.open(image_path) as image:
+        if _can_pass_through(image, image_path, target_size, fmt):
+            with open(image_path, 'rb') as f:
+                return base64.b64encode(f.read()).decode('utf-8')
+        return encode_image_to_base64(image, target_size=target_size, fmt=fmt)
@@ -0,0 +1,127 @@
+import json
+import os
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from internbootcamp.utils.response_cache import payload_hash
+
+# OpenAI Batch API / vLLM run_batch 中 chat completion 请求的 url 字段
+BATCH_CHAT_COMPLETIONS_URL = "/v1/chat/completions"
+
+
+class BatchResponseMissing(RuntimeError):
+    """离线批量模式下请求不在批量输出文件中（如多轮样本的后续轮次、渲染后 payload 发生变化）"""
+    pass
+
+
+class BatchResponseError(RuntimeError):
+    """批量输出中该请求失败（error 字段非空或 status_code 不是 200）"""
+    pass
+
+
+def batch_custom_id(payload: dict) -> str:
+    """批量请求的 custom_id：payload 的内容哈希，读取结果时按重新构造的 payload 查找"""
+    return payload_hash(payload)
+
+
+class BatchRequestWriter:
+    """
+    把请求 payload 写成 OpenAI 批量请求格式的 JSONL（每行 custom_id / method / url / body），
+    可直接提交给 Batch API 或 vLLM 的 run_batch 入口。相同的 payload 只写一次。
+    """
+
+    def __init__(self, path: str, url: str = BATCH_CHAT_COMPLETIONS_URL):
+        self.path = path
+        self.url = url
+        self.requests = 0
+        self.duplicates = 0
+        self._seen = set()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._file = open(path, "w", encoding="utf-8")
+
+    def write(self, payload: dict) -> bool:
+        """写入一个请求，返回 False 表示与已写入的请求相同而被跳过"""
+        custom_id = batch_custom_id(payload)
+        if custom_id in self._seen:
+            self.duplicates += 1
+            return False
+        self._seen.add(custom_id)
+        line = {"custom_id": custom_id, "method": "POST", "url": self.url, "body": payload}
+        self._file.write(json.dumps(line, ensure_ascii=False) + "\n")
+        self.requests += 1
+        return True
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class BatchResponseIndex:
+    """
+    批量输出 JSONL 的 custom_id 索引。只在内存中保存每行的文件偏移，
+    查找时按偏移读取对应行，输出文件很大时也不会整体加载到内存。
+    """
+
+    def __init__(self, paths: Union[str, List[str]]):
+        self.paths = [paths] if isinstance(paths, str) else list(paths)
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self._offsets: Dict[str, Tuple[int, int]] = {}
+        self._files = []
+        for file_index, path in enumerate(self.paths):
+            f = open(path, "rb")
+            self._files.append(f)
+            offset = 0
+            for raw in f:
+                if raw.strip():
+                    custom_id = json.loads(raw).get("custom_id")
+                    if custom_id is not None:
+                        self._offsets[custom_id] = (file_index, offset)
+                offset += len(raw)
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def _read(self, custom_id: str) -> Optional[Dict[str, Any]]:
+        location = self._offsets.get(custom_id)
+        if location is None:
+            return None
+        file_index, offset = location
+        f = self._files[file_index]
+        f.seek(offset)
+        return json.loads(f.readline())
+
+    def lookup(self, payload: dict) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """返回 payload 对应的 (响应, usage)，与在线请求的返回值结构相同"""
+        custom_id = batch_custom_id(payload)
+        line = self._read(custom_id)
+        if line is None:
+            self.misses += 1
+            raise BatchResponseMissing(f"批量输出中没有该请求: {custom_id}")
+        response = line.get("response") or {}
+        if line.get("error") or response.get("status_code", 200) != 200 or not response.get("body"):
+            self.errors += 1
+            raise BatchResponseError(f"批量请求 {custom_id} 失败: {line.get('error') or response.get('body')}")
+        self.hits += 1
+        body = response["body"]
+        return body, body.get("usage") or {}
+
+    def close(self) -> None:
+        for f in self._files:
+            f.close()
+        self._files = []
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "files": len(self.paths),
+            "responses": len(self._offsets),
+            "hits": self.hits,
+            "missing": self.misses,
+            "failed": self.errors,
+        }
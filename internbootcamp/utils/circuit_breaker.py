@@ -0,0 +1,197 @@
+import asyncio
+import time
+from typing import Any, Dict, List, Optional
+
+from internbootcamp.utils.concurrency import is_overload_error
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(RuntimeError):
+    """熔断器持续打开超过上限时间，请求直接失败（不再重试）"""
+    pass
+
+
+class _Guard:
+    def __init__(self, breaker: "CircuitBreaker"):
+        self.breaker = breaker
+        self.probe = False
+
+    async def __aenter__(self):
+        self.probe = await self.breaker.acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        if exc is None:
+            self.breaker.on_success()
+        elif isinstance(exc, asyncio.CancelledError):
+            self.breaker.on_cancel(self.probe)
+        else:
+            self.breaker.on_failure(overloaded=is_overload_error(exc))
+        return False
+
+
+class CircuitBreaker:
+    """
+    进程级熔断器（closed / open / half_open），所有 worker 共享。
+
+    - closed：请求正常发出；连续 failure_threshold 次过载类失败（429/5xx/超时/连接失败）后打开
+    - open：新请求在冷却期内等待，不再访问服务端；冷却时间从 reset_timeout 开始，
+      每次探测失败翻倍（上限 max_reset_timeout）
+    - half_open：冷却结束后只放行 half_open_max_calls 个探测请求，其余继续等待；
+      探测成功则关闭，失败则重新打开
+    - 从首次打开起持续 max_open_seconds 秒仍未恢复时，视为服务不可用，请求直接抛出 CircuitOpenError
+
+    状态变化记录在 transitions 中，写入评测报告。
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 10,
+        reset_timeout: float = 10.0,
+        max_reset_timeout: float = 120.0,
+        max_open_seconds: float = 600.0,
+        half_open_max_calls: int = 1,
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout
+        self.max_open_seconds = max_open_seconds
+        self.half_open_max_calls = half_open_max_calls
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opens = 0
+        self.rejected = 0
+        self.transitions: List[Dict[str, Any]] = []
+        self._created = time.monotonic()
+        self._cooldown = reset_timeout
+        self._retry_at = 0.0
+        self._unavailable_since: Optional[float] = None
+        self._probes = 0
+        self._open_seconds = 0.0
+        self._opened_at: Optional[float] = None
+        self._changed: Optional[asyncio.Event] = None
+
+    def guard(self) -> _Guard:
+        """包住一次请求：进入时等待放行，退出时按结果更新状态"""
+        return _Guard(self)
+
+    def _transition(self, state: str, reason: str) -> None:
+        now = time.monotonic()
+        if self.state == OPEN and self._opened_at is not None:
+            self._open_seconds += now - self._opened_at
+            self._opened_at = None
+        previous, self.state = self.state, state
+        if state == OPEN:
+            self.opens += 1
+            self._opened_at = now
+            self._retry_at = now + self._cooldown
+        elif state == HALF_OPEN:
+            self._probes = 0
+        self.transitions.append({"time": now - self._created, "from": previous, "to": state, "reason": reason})
+        print(f"⚡ 熔断器 {previous} -> {state}: {reason}")
+        if self._changed is not None:
+            self._changed.set()
+            self._changed = None
+
+    async def _wait_for_change(self, timeout: float) -> None:
+        if self._changed is None:
+            self._changed = asyncio.Event()
+        try:
+            await asyncio.wait_for(self._changed.wait(), timeout=max(0.0, timeout))
+        except asyncio.TimeoutError:
+            pass
+
+    async def acquire(self) -> bool:
+        """等待直到允许发出请求；返回是否为 half_open 状态下的探测请求"""
+        while True:
+            now = time.monotonic()
+            if self.state == CLOSED:
+                return False
+            if self._unavailable_since is not None and now - self._unavailable_since > self.max_open_seconds:
+                self.rejected += 1
+                raise CircuitOpenError(f"服务持续不可用超过 {self.max_open_seconds:.0f}s，熔断器拒绝请求")
+            if self.state == OPEN:
+                if now >= self._retry_at:
+                    self._transition(HALF_OPEN, f"冷却 {self._cooldown:.0f}s 结束，开始探测")
+                    continue
+                await self._wait_for_change(self._retry_at - now)
+                continue
+            if self._probes < self.half_open_max_calls:
+                self._probes += 1
+                return True
+            await self._wait_for_change(self._cooldown)
+
+    def on_success(self) -> None:
+        self.consecutive_failures = 0
+        if self.state != CLOSED:
+            self._cooldown = self.reset_timeout
+            self._unavailable_since = None
+            self._transition(CLOSED, "请求成功，服务已恢复")
+
+    def on_failure(self, overloaded: bool = True) -> None:
+        if not overloaded:
+            # 非过载类错误（如 400）说明服务端可以响应，按成功处理熔断状态
+            self.on_success()
+            return
+        self.consecutive_failures += 1
+        if self.state == HALF_OPEN:
+            self._cooldown = min(self.max_reset_timeout, self._cooldown * 2)
+            self._transition(OPEN, "探测请求失败")
+        elif self.state == CLOSED and self.consecutive_failures >= self.failure_threshold:
+            self._unavailable_since = time.monotonic()
+            self._transition(OPEN, f"连续 {self.consecutive_failures} 次过载类失败")
+
+    def on_cancel(self, probe: bool) -> None:
+        # 被取消的探测请求（如对冲落败、样本超时）归还探测名额
+        if probe and self.state == HALF_OPEN:
+            self._probes = max(0, self._probes - 1)
+            if self._changed is not None:
+                self._changed.set()
+                self._changed = None
+
+    def stats(self) -> Dict[str, Any]:
+        open_seconds = self._open_seconds + (time.monotonic() - self._opened_at if self._opened_at is not None else 0.0)
+        return {
+            "state": self.state,
+            "opens": self.opens,
+            "transitions": len(self.transitions),
+            "open_seconds": open_seconds,
+            "rejected": self.rejected,
+        }
+
+
+class RetryBudget:
+    """
+    全局重试预算：重试次数不超过 min_retries + ratio * 成功请求数。
+    服务整体故障时快速停止重试，避免所有样本各自重试放大负载。
+    """
+
+    def __init__(self, ratio: float = 0.5, min_retries: int = 20):
+        self.ratio = ratio
+        self.min_retries = min_retries
+        self.successes = 0
+        self.retries = 0
+        self.denied = 0
+
+    def record_success(self) -> None:
+        self.successes += 1
+
+    def try_acquire(self) -> bool:
+        """申请一次重试，预算不足时返回 False"""
+        if self.retries < self.min_retries + self.ratio * self.successes:
+            self.retries += 1
+            return True
+        self.denied += 1
+        return False
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "retries": self.retries,
+            "retries_denied": self.denied,
+            "successful_requests": self.successes,
+            "retry_ratio": self.retries / self.successes if self.successes else 0.0,
+            "budget_ratio": self.ratio,
+        }
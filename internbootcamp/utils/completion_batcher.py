@@ -0,0 +1,173 @@
+import asyncio
+import json
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from internbootcamp.utils.rate_limiter import estimate_text_tokens
+
+# 可以原样传给 /v1/completions 的请求参数
+_COMPLETION_PARAMS = frozenset({
+    "model", "frequency_penalty", "logit_bias", "max_tokens", "n", "presence_penalty", "seed", "stop",
+    "temperature", "top_p", "user", "extra_headers", "extra_query", "extra_body", "timeout",
+})
+# 转换时丢弃的 chat 字段（消息渲染为 prompt；不带工具时工具相关参数没有作用）
+_DROPPED_CHAT_KEYS = frozenset({"messages", "tools", "tool_choice", "parallel_tool_calls"})
+
+
+def chat_payload_to_completion(payload: dict, tokenizer) -> Optional[Tuple[str, Dict[str, Any]]]:
+    """
+    把 chat 请求在本地用 tokenizer 的 chat template 渲染为 prompt，返回 (prompt, completions 请求参数)。
+
+    max_completion_tokens 转为 max_tokens；extra_body.chat_template_kwargs（如 enable_thinking）用于本地渲染，
+    不再发给服务端。带工具、多模态内容或 completions 接口不支持的参数（如 response_format、logprobs）的请求
+    无法等价转换，返回 None（仍走 chat 接口）
+    """
+    if payload.get("tools"):
+        return None
+    messages = payload["messages"]
+    if any(not isinstance(message.get("content"), str) for message in messages):
+        return None
+    params = {}
+    for key, value in payload.items():
+        if key in _DROPPED_CHAT_KEYS:
+            continue
+        if key == "max_completion_tokens":
+            key = "max_tokens"
+        if key not in _COMPLETION_PARAMS:
+            return None
+        params[key] = value
+    extra_body = dict(params.get("extra_body") or {})
+    template_kwargs = extra_body.pop("chat_template_kwargs", None) or {}
+    if extra_body:
+        params["extra_body"] = extra_body
+    else:
+        params.pop("extra_body", None)
+    prompt = tokenizer.apply_chat_template(
+        messages,
+        tokenize=False,
+        add_generation_prompt=True,
+        **template_kwargs,
+    )
+    return prompt, params
+
+
+def completion_to_chat_response(response: Dict[str, Any], choices: List[Dict[str, Any]], prompt: str, tokenizer) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    把批量 completions 响应中属于某个 prompt 的 choices 转为 chat.completion 结构，返回 (响应, usage)。
+    服务端只返回整批的 usage，单个 prompt 的 token 数用 tokenizer 计算（标记为 estimated）
+    """
+    prompt_tokens = estimate_text_tokens(prompt, tokenizer)
+    completion_tokens = sum(estimate_text_tokens(choice.get("text") or "", tokenizer) for choice in choices)
+    usage = {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens,
+        "estimated": True,
+    }
+    response_dict = {
+        "id": response.get("id"),
+        "object": "chat.completion",
+        "created": response.get("created"),
+        "model": response.get("model"),
+        "choices": [
+            {
+                "index": index,
+                "message": {"role": "assistant", "content": choice.get("text") or "", "tool_calls": None},
+                "finish_reason": choice.get("finish_reason"),
+            }
+            for index, choice in enumerate(choices)
+        ],
+        "usage": usage,
+    }
+    return response_dict, usage
+
+
+class _PendingBatch:
+    def __init__(self, params: Dict[str, Any]):
+        self.params = params
+        self.prompts: List[str] = []
+        self.futures: List[asyncio.Future] = []
+        self.timer: Optional[asyncio.TimerHandle] = None
+
+
+class CompletionBatcher:
+    """
+    把并发的单个 completion 请求合并为一次 /v1/completions 调用（prompt 为列表）。
+
+    采样参数相同的请求进入同一批，批满 max_batch_size 或第一个请求等待超过 flush_timeout 秒时发出；
+    send(prompts, params) 返回完整响应，按 choice 的 index（prompt 序号 * n + 采样序号）分发给各请求。
+    整批失败时每个请求都收到同样的异常，由各自的重试逻辑重新提交。
+    """
+
+    def __init__(
+        self,
+        send: Callable[[List[str], Dict[str, Any]], Awaitable[Dict[str, Any]]],
+        max_batch_size: int = 32,
+        flush_timeout: float = 0.05,
+    ):
+        self.send = send
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.flush_timeout = flush_timeout
+        self.requests = 0
+        self.batches = 0
+        self.full_flushes = 0
+        self.failed_batches = 0
+        self._pending: Dict[str, _PendingBatch] = {}
+        self._tasks = set()
+
+    async def submit(self, prompt: str, params: Dict[str, Any]) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+        """提交一个 prompt，返回 (整批响应, 该 prompt 的 choices)"""
+        loop = asyncio.get_running_loop()
+        key = json.dumps(params, sort_keys=True, default=str)
+        batch = self._pending.get(key)
+        if batch is None:
+            batch = self._pending[key] = _PendingBatch(params)
+            batch.timer = loop.call_later(self.flush_timeout, self._flush, key)
+        future = loop.create_future()
+        batch.prompts.append(prompt)
+        batch.futures.append(future)
+        self.requests += 1
+        if len(batch.prompts) >= self.max_batch_size:
+            self.full_flushes += 1
+            self._flush(key)
+        return await future
+
+    def _flush(self, key: str) -> None:
+        batch = self._pending.pop(key, None)
+        if batch is None:
+            return
+        batch.timer.cancel()
+        self.batches += 1
+        task = asyncio.ensure_future(self._send_batch(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _send_batch(self, batch: _PendingBatch) -> None:
+        try:
+            response = await self.send(batch.prompts, batch.params)
+        except Exception as e:
+            self.failed_batches += 1
+            for future in batch.futures:
+                # 等待方已取消（如样本超时）时跳过
+                if not future.done():
+                    future.set_exception(e)
+            return
+        n = int(batch.params.get("n") or 1)
+        choices = sorted(response.get("choices") or [], key=lambda choice: choice.get("index", 0))
+        for i, future in enumerate(batch.futures):
+            if future.done():
+                continue
+            prompt_choices = choices[i * n:(i + 1) * n]
+            if prompt_choices:
+                future.set_result((response, prompt_choices))
+            else:
+                future.set_exception(RuntimeError(f"批量 completions 响应缺少第 {i} 个 prompt 的结果"))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "batches": self.batches,
+            "avg_batch_size": self.requests / self.batches if self.batches else 0.0,
+            "full_flushes": self.full_flushes,
+            "timeout_flushes": self.batches - self.full_flushes,
+            "failed_batches": self.failed_batches,
+        }
@@ -0,0 +1,172 @@
+import asyncio
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+import openai
+
+
+def is_overload_error(e: BaseException) -> bool:
+    """
+    判断异常是否表示服务端过载：429、5xx、超时或连接失败
+    """
+    if isinstance(e, (openai.APITimeoutError, openai.APIConnectionError, httpx.TimeoutException, asyncio.TimeoutError)):
+        return True
+    status_code = getattr(e, "status_code", None)
+    return status_code == 429 or (isinstance(status_code, int) and status_code >= 500)
+
+
+class _Slot:
+    """一次接口调用占用的并发槽位；调用方可在退出前填写 tokens 以便按 token 归一化延迟"""
+
+    def __init__(self, limiter: "AdaptiveConcurrencyLimiter"):
+        self.limiter = limiter
+        self.tokens = None
+        self.started = None
+
+    async def __aenter__(self):
+        await self.limiter.acquire()
+        self.started = time.monotonic()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        try:
+            if exc is None:
+                self.limiter.on_success(self.started, time.monotonic() - self.started, self.tokens)
+            elif not isinstance(exc, asyncio.CancelledError):
+                self.limiter.on_failure(self.started, overloaded=is_overload_error(exc))
+        finally:
+            self.limiter.release()
+        return False
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    AIMD（加性增、乘性减）自适应并发控制器。
+
+    - 慢启动：首次拥塞前每次成功 +1（每个窗口翻倍）
+    - 拥塞避免：每次成功 +increase_step/limit（约每个窗口 +increase_step）
+    - 拥塞信号（429/5xx/超时，或单 token 延迟超过基线的 latency_tolerance 倍）：
+      limit 乘以 decrease_factor；同一窗口内发出的请求只触发一次回退
+
+    并发上限始终限制在 [min_limit, max_limit]，变化轨迹记录在 trajectory 中用于报告。
+    """
+
+    def __init__(
+        self,
+        min_limit: int = 1,
+        max_limit: int = 64,
+        initial_limit: Optional[int] = None,
+        increase_step: float = 1.0,
+        decrease_factor: float = 0.5,
+        latency_tolerance: Optional[float] = 3.0,
+        max_trajectory_points: int = 200,
+    ):
+        self.min_limit = max(1, int(min_limit))
+        self.max_limit = max(self.min_limit, int(max_limit))
+        self.limit = float(min(self.max_limit, max(self.min_limit, initial_limit or self.min_limit)))
+        self.increase_step = increase_step
+        self.decrease_factor = decrease_factor
+        self.latency_tolerance = latency_tolerance
+        self.max_trajectory_points = max_trajectory_points
+
+        self.in_flight = 0
+        self.increases = 0
+        self.decreases = 0
+        self.overload_errors = 0
+        self.slow_responses = 0
+        self._slow_start = True
+        self._baseline_latency = None
+        self._last_decrease = float('-inf')
+        self._start_time = time.monotonic()
+        self._limit_integral = 0.0
+        self._last_change = self._start_time
+        self._trajectory: List[Tuple[float, int]] = [(0.0, int(self.limit))]
+        self._condition = asyncio.Condition()
+
+    @property
+    def current_limit(self) -> int:
+        return int(self.limit)
+
+    def slot(self) -> _Slot:
+        return _Slot(self)
+
+    async def acquire(self) -> None:
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < self.current_limit)
+            self.in_flight += 1
+
+    def release(self) -> None:
+        self.in_flight -= 1
+        asyncio.get_running_loop().create_task(self._notify())
+
+    async def _notify(self) -> None:
+        async with self._condition:
+            self._condition.notify_all()
+
+    def _set_limit(self, new_limit: float) -> None:
+        new_limit = min(float(self.max_limit), max(float(self.min_limit), new_limit))
+        old_int = self.current_limit
+        now = time.monotonic()
+        self._limit_integral += old_int * (now - self._last_change)
+        self._last_change = now
+        self.limit = new_limit
+        if self.current_limit != old_int:
+            self._trajectory.append((now - self._start_time, self.current_limit))
+            if len(self._trajectory) > self.max_trajectory_points:
+                # 轨迹过长时隔点抽稀，保留首尾
+                self._trajectory = self._trajectory[:-1:2] + self._trajectory[-1:]
+            if self.current_limit > old_int:
+                asyncio.get_running_loop().create_task(self._notify())
+
+    def _decrease(self, started: float) -> None:
+        # 在上一次回退之前发出的请求属于同一拥塞窗口，不重复回退
+        if started <= self._last_decrease:
+            return
+        self._last_decrease = time.monotonic()
+        self._slow_start = False
+        self.decreases += 1
+        self._set_limit(self.limit * self.decrease_factor)
+
+    def on_success(self, started: float, latency: float, tokens: Optional[int] = None) -> None:
+        normalized = latency / max(tokens, 1) if tokens else latency
+        if self.latency_tolerance:
+            if self._baseline_latency is None:
+                self._baseline_latency = normalized
+            elif normalized > self._baseline_latency * self.latency_tolerance:
+                self.slow_responses += 1
+                self._decrease(started)
+                return
+            else:
+                # 基线缓慢跟随较低的延迟，避免被个别极快的响应拉得过低
+                self._baseline_latency = min(self._baseline_latency * 1.01, 0.9 * self._baseline_latency + 0.1 * normalized)
+        if self.limit >= self.max_limit:
+            return
+        self.increases += 1
+        if self._slow_start:
+            self._set_limit(self.limit + 1)
+        else:
+            self._set_limit(self.limit + self.increase_step / self.limit)
+
+    def on_failure(self, started: float, overloaded: bool = True) -> None:
+        if overloaded:
+            self.overload_errors += 1
+            self._decrease(started)
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        elapsed = now - self._start_time
+        integral = self._limit_integral + self.current_limit * (now - self._last_change)
+        limits = [limit for _, limit in self._trajectory]
+        return {
+            "min_limit": self.min_limit,
+            "max_limit": self.max_limit,
+            "final_limit": self.current_limit,
+            "peak_limit": max(limits),
+            "time_weighted_avg_limit": integral / elapsed if elapsed > 0 else float(self.current_limit),
+            "increases": self.increases,
+            "decreases": self.decreases,
+            "overload_errors": self.overload_errors,
+            "slow_responses": self.slow_responses,
+            "trajectory": " ".join(f"{t:.1f}s:{limit}" for t, limit in self._trajectory),
+        }
@@ -9,6 +9,7 @@
 import json
 import hashlib
 import jsonlines
+from internbootcamp.utils.result_io import is_compressed, iter_results, strip_result_suffix
 from typing import Callable, List, Dict, Any, Optional, Union
 from pathlib import Path
 from collections import defaultdict
@@ -185,7 +186,10 @@ class DataPostProcessor:
         
         # 如果未提供输出路径，自动生成
         if output_path is None:
-            output_path = input_path.parent / f"{input_path.stem}_processed{input_path.suffix}"
+            if is_compressed(str(input_path)):
+                output_path = Path(strip_result_suffix(str(input_path)) + "_processed.jsonl")
+            else:
+                output_path = input_path.parent / f"{input_path.stem}_processed{input_path.suffix}"
         else:
             output_path = Path(output_path)
         
@@ -199,10 +203,10 @@ class DataPostProcessor:
             print(f"📖 正在读取输入文件: {input_path}")
         
         # 处理数据
-        with jsonlines.open(input_path) as reader, \
-             jsonlines.open(output_path, mode='w') as writer:
+        with jsonlines.open(output_path, mode='w') as writer:
             
-            for line in reader:
+            # 透明读取压缩(.zst)和紧凑格式的结果文件
+            for line in iter_results(str(input_path)):
                 self.stats['total_input'] += 1
                 
                 # 应用过滤器
@@ -0,0 +1,140 @@
+import time
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+from internbootcamp.utils.concurrency import is_overload_error
+
+
+def parse_api_urls(api_url: Union[str, List[str], None]) -> List[Optional[str]]:
+    """
+    解析 api_url：支持单个 URL、逗号分隔的多个 URL 或 URL 列表；为空时返回 [None]（使用默认 OpenAI 地址）
+    """
+    if not api_url:
+        return [None]
+    if isinstance(api_url, str):
+        api_url = api_url.split(",")
+    urls = [url.strip() for url in api_url if url and url.strip()]
+    return urls or [None]
+
+
+class Endpoint:
+    """单个模型服务端点及其客户端、负载与统计信息"""
+
+    def __init__(self, url: Optional[str], client: Any):
+        self.url = url
+        self.client = client
+        self.outstanding = 0
+        self.requests = 0
+        self.successes = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.ejections = 0
+        self.ejected_until = 0.0
+        self.total_latency = 0.0
+        self.ewma_latency = None
+        self.completion_tokens = 0
+        self.first_request_at = None
+        self.last_response_at = None
+
+    @property
+    def name(self) -> str:
+        return self.url or "default"
+
+    def is_healthy(self, now: float) -> bool:
+        return now >= self.ejected_until
+
+
+class _EndpointCall:
+    def __init__(self, pool: "EndpointPool", endpoint: Endpoint):
+        self.pool = pool
+        self.endpoint = endpoint
+        self.completion_tokens = None
+        self.started = None
+
+    async def __aenter__(self):
+        self.started = time.monotonic()
+        self.endpoint.outstanding += 1
+        self.endpoint.requests += 1
+        if self.endpoint.first_request_at is None:
+            self.endpoint.first_request_at = self.started
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.endpoint.outstanding -= 1
+        if exc is None:
+            self.pool._record_success(self.endpoint, time.monotonic() - self.started, self.completion_tokens)
+        elif is_overload_error(exc):
+            self.pool._record_failure(self.endpoint)
+        return False
+
+
+class EndpointPool:
+    """
+    多个模型服务端点的客户端负载均衡。
+
+    - 路由：在健康端点中选择在途请求最少的（并列时选请求总数更少、延迟更低的）
+    - 摘除：连续 eject_after 次过载类失败（429/5xx/超时/连接失败）后暂时摘除，
+      摘除时长随摘除次数指数增长（上限 max_eject_seconds）；到期后重新参与路由，成功一次即恢复
+    - 所有端点都被摘除时，仍选择最早恢复的端点，保证请求不会失败在路由上
+    """
+
+    def __init__(self, endpoints: Iterable[Endpoint], eject_after: int = 3, eject_seconds: float = 30.0, max_eject_seconds: float = 300.0):
+        self.endpoints: List[Endpoint] = list(endpoints)
+        if not self.endpoints:
+            raise ValueError("EndpointPool 至少需要一个端点")
+        self.eject_after = eject_after
+        self.eject_seconds = eject_seconds
+        self.max_eject_seconds = max_eject_seconds
+
+    def __len__(self) -> int:
+        return len(self.endpoints)
+
+    def pick(self, exclude: Iterable[Endpoint] = ()) -> Endpoint:
+        """选择一个端点；exclude 中的端点仅在没有其它选择时使用"""
+        now = time.monotonic()
+        excluded = set(id(endpoint) for endpoint in exclude)
+        candidates = [e for e in self.endpoints if e.is_healthy(now) and id(e) not in excluded]
+        if not candidates:
+            candidates = [e for e in self.endpoints if e.is_healthy(now)]
+        if not candidates:
+            return min(self.endpoints, key=lambda e: e.ejected_until)
+        return min(candidates, key=lambda e: (e.outstanding, e.requests, e.ewma_latency or 0.0))
+
+    def call(self, endpoint: Endpoint) -> _EndpointCall:
+        """跟踪一次对 endpoint 的调用（在途数、延迟、健康状态）"""
+        return _EndpointCall(self, endpoint)
+
+    def _record_success(self, endpoint: Endpoint, latency: float, completion_tokens: Optional[int]) -> None:
+        endpoint.successes += 1
+        endpoint.consecutive_failures = 0
+        endpoint.total_latency += latency
+        endpoint.ewma_latency = latency if endpoint.ewma_latency is None else 0.8 * endpoint.ewma_latency + 0.2 * latency
+        endpoint.completion_tokens += completion_tokens or 0
+        endpoint.last_response_at = time.monotonic()
+
+    def _record_failure(self, endpoint: Endpoint) -> None:
+        endpoint.failures += 1
+        endpoint.consecutive_failures += 1
+        endpoint.last_response_at = time.monotonic()
+        if endpoint.consecutive_failures >= self.eject_after and endpoint.is_healthy(time.monotonic()):
+            endpoint.ejections += 1
+            duration = min(self.max_eject_seconds, self.eject_seconds * 2 ** (endpoint.ejections - 1))
+            endpoint.ejected_until = time.monotonic() + duration
+            print(f"⚠️ 端点 {endpoint.name} 连续失败 {endpoint.consecutive_failures} 次，暂时摘除 {duration:.0f}s")
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """每个端点的请求数、成功率、延迟和吞吐统计"""
+        now = time.monotonic()
+        stats = {}
+        for endpoint in self.endpoints:
+            active = (endpoint.last_response_at - endpoint.first_request_at) if endpoint.first_request_at and endpoint.last_response_at else 0
+            stats[endpoint.name] = {
+                "requests": endpoint.requests,
+                "successes": endpoint.successes,
+                "failures": endpoint.failures,
+                "ejections": endpoint.ejections,
+                "healthy": endpoint.is_healthy(now),
+                "avg_latency_seconds": endpoint.total_latency / endpoint.successes if endpoint.successes else 0.0,
+                "requests_per_second": endpoint.successes / active if active > 0 else 0.0,
+                "completion_tokens_per_second": endpoint.completion_tokens / active if active > 0 else 0.0,
+            }
+        return stats
@@ -0,0 +1,317 @@
+import copy
+import random
+from typing import Any, Dict, List, Optional, Tuple
+
+from internbootcamp.utils.result_io import iter_results
+
+# 逐样本累加的计数字段；对应的 avg_* 字段在生成报告时按成功样本数计算
+_SUM_FIELDS = (
+    "total_assistant_turns",
+    "total_tool_calls",
+    "total_interaction_turns",
+    "total_initial_prompt_tokens",
+    "total_global_seq_tokens",
+    "total_cumulative_prompt_tokens",
+    "total_completion_tokens",
+    "total_tokens",
+)
+_AVG_FIELDS = {
+    "avg_score": "total_score",
+    "avg_assistant_turns": "total_assistant_turns",
+    "avg_tool_calls": "total_tool_calls",
+    "avg_interaction_turns": "total_interaction_turns",
+    "avg_initial_prompt_tokens": "total_initial_prompt_tokens",
+    "avg_global_seq_tokens": "total_global_seq_tokens",
+    "avg_cumulative_prompt_tokens": "total_cumulative_prompt_tokens",
+    "avg_completion_tokens": "total_completion_tokens",
+    "avg_tokens": "total_tokens",
+}
+# 延迟分位数统计时每个 (data_source, 阶段) 最多保留的样本数
+LATENCY_RESERVOIR_SIZE = 4096
+LATENCY_PERCENTILES = (50, 90, 99)
+
+
+def calculate_tool_statistics(turn_record: dict) -> Tuple[int, int, int]:
+    """
+    计算工具相关统计数据
+
+    Args:
+        turn_record: 包含每轮交互记录的字典
+
+    Returns:
+        Tuple[int, int, int]: (总assistant轮数, 总工具调用次数, 总interaction轮数)
+    """
+    total_assistant_turns = 0
+    total_tool_calls = 0
+    total_interaction_turns = 0
+    for turn_key, turn_data in turn_record.items():
+        if turn_key.startswith("interaction_turn_"):
+            total_assistant_turns += turn_data.get("assistant_turns", 0)
+            total_tool_calls += turn_data.get("tool_calls_executed", 0)
+            total_interaction_turns += 1
+    return total_assistant_turns, total_tool_calls, total_interaction_turns
+
+
+def _new_stats() -> Dict[str, Any]:
+    stats = {
+        "total_count": 0,
+        "success_count": 0,
+        "error_count": 0,
+        "total_score": 0,
+        "max_score": float('-inf'),  # 最高分数
+        "min_score": float('inf'),   # 最低分数
+    }
+    for field in _SUM_FIELDS:
+        stats[field] = 0
+    for field in _AVG_FIELDS:
+        stats[field] = 0
+    return stats
+
+
+def _finalize_stats(stats: Dict[str, Any]) -> None:
+    if stats["success_count"] > 0:
+        for avg_field, total_field in _AVG_FIELDS.items():
+            stats[avg_field] = stats[total_field] / stats["success_count"]
+        # 有成功样本但都没有数值分数
+        if stats["max_score"] == float('-inf'):
+            stats["max_score"] = 0
+            stats["min_score"] = 0
+    else:
+        # 如果没有成功样本，重置最大最小分数
+        stats["max_score"] = 0
+        stats["min_score"] = 0
+        for avg_field in _AVG_FIELDS:
+            stats[avg_field] = 0
+
+
+class LatencyReservoir:
+    """
+    固定容量的蓄水池采样，用于在内存有界的前提下估计延迟分位数；
+    均值和次数按全部样本精确统计
+    """
+
+    def __init__(self, capacity: int = LATENCY_RESERVOIR_SIZE, rng: Optional[random.Random] = None):
+        self.capacity = capacity
+        self.count = 0
+        self.total = 0.0
+        self.samples: List[float] = []
+        self._rng = rng or random.Random(0)
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        if len(self.samples) < self.capacity:
+            self.samples.append(value)
+        else:
+            i = self._rng.randrange(self.count)
+            if i < self.capacity:
+                self.samples[i] = value
+
+    def percentile(self, q: float) -> float:
+        """线性插值的分位数，q 取 0-100"""
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        pos = (len(ordered) - 1) * q / 100
+        lower = int(pos)
+        upper = min(lower + 1, len(ordered) - 1)
+        return ordered[lower] + (ordered[upper] - ordered[lower]) * (pos - lower)
+
+    def summary(self) -> Dict[str, float]:
+        result = {"count": self.count, "mean": self.total / self.count if self.count else 0.0}
+        for q in LATENCY_PERCENTILES:
+            result[f"p{q}"] = self.percentile(q)
+        return result
+
+
+class EvaluationAggregator:
+    """
+    评测结果的在线增量聚合器。
+
+    每完成一个样本调用一次 update，只维护按 data_source / generator 分组的计数器，
+    内存占用与样本数无关；断点重试时可通过 update_from_file 流式重建。
+    错误明细最多保留 max_error_details 条，错误类型计数不受限制。
+    结果带有 timings 字段时同时统计各阶段延迟分位数；吞吐量只统计本次运行完成的样本，
+    从文件重建的历史结果不计入（其耗时跨越了中断前后的多次运行）。
+    """
+
+    def __init__(self, max_error_details: int = 1000):
+        self.max_error_details = max_error_details
+        self.total = 0
+        self.success_count = 0
+        self.score_sum = 0
+        self.data_source_stats: Dict[str, Dict[str, Any]] = {}
+        self.errors = []
+        self.error_types: Dict[str, int] = {}
+        self.latency: Dict[str, Dict[str, LatencyReservoir]] = {}
+        self.throughput: Dict[str, Dict[str, Any]] = {}
+        self.sampling: Dict[str, Dict[str, Any]] = {}
+        self._rng = random.Random(0)
+
+    def update(self, r: Optional[dict], track_throughput: bool = True) -> None:
+        """累加一条评测结果"""
+        if r is None:
+            return
+        self.total += 1
+        # Get data_source and generator_name
+        data_source = r.get("input", {}).get("data_source", "Unknown")
+        generator_name = r.get("input", {}).get("extra_info", {}).get("generator_name", "")
+        self._update_timings(data_source, r, track_throughput)
+
+        if data_source not in self.data_source_stats:
+            self.data_source_stats[data_source] = {**_new_stats(), "generators": {}}
+        ds_stats = self.data_source_stats[data_source]
+        gen_stats = None
+        if generator_name:
+            gen_stats = ds_stats["generators"].setdefault(generator_name, _new_stats())
+
+        ds_stats["total_count"] += 1
+        if gen_stats is not None:
+            gen_stats["total_count"] += 1
+
+        if not r.get("success"):
+            ds_stats["error_count"] += 1
+            if gen_stats is not None:
+                gen_stats["error_count"] += 1
+            # Record error information
+            if len(self.errors) < self.max_error_details:
+                self.errors.append({
+                    "data_source": data_source,
+                    "generator_name": generator_name,
+                    "error": r.get("error", "Unknown error"),
+                    "input_id": r.get("input", {}).get("id", "Unknown")
+                })
+            # 统计错误类型
+            error_type = str(r.get("error", "Unknown error"))[:50]
+            self.error_types[error_type] = self.error_types.get(error_type, 0) + 1
+            return
+
+        self.success_count += 1
+        current_score = r.get("score", 0)
+        assistant_turns, tool_calls, interaction_turns = calculate_tool_statistics(r.get("turn_record", {}))
+        token_usage = r.get("token_usage", {})
+        increments = {
+            "total_assistant_turns": assistant_turns,
+            "total_tool_calls": tool_calls,
+            "total_interaction_turns": interaction_turns,
+            "total_initial_prompt_tokens": r.get("prompt_tokens") or 0,
+            "total_global_seq_tokens": (r.get("global_seq_tokens") or 0) + token_usage.get("global_seq_tokens", 0),
+            "total_cumulative_prompt_tokens": token_usage.get("prompt_tokens", 0),
+            "total_completion_tokens": token_usage.get("completion_tokens", 0),
+            "total_tokens": token_usage.get("total_tokens", 0),
+        }
+        for stats in (ds_stats, gen_stats):
+            if stats is None:
+                continue
+            stats["success_count"] += 1
+            if isinstance(current_score, (int, float)):
+                stats["total_score"] += current_score
+                stats["max_score"] = max(stats["max_score"], current_score)
+                stats["min_score"] = min(stats["min_score"], current_score)
+            for field, value in increments.items():
+                stats[field] += value
+        if isinstance(current_score, (int, float)):
+            self.score_sum += current_score
+        if isinstance(r.get("sampling"), dict):
+            self._update_sampling(data_source, r["sampling"])
+
+    def _update_sampling(self, data_source: str, sampling: Dict[str, Any]) -> None:
+        stats = self.sampling.setdefault(data_source, {
+            "questions": 0, "samples": 0, "majority_correct": 0, "variance_sum": 0.0, "pass_at_k": {},
+        })
+        stats["questions"] += 1
+        stats["samples"] += sampling.get("num_samples", 0)
+        stats["majority_correct"] += int(bool(sampling.get("majority_correct")))
+        stats["variance_sum"] += sampling.get("score_variance", 0.0)
+        for k, value in (sampling.get("pass_at_k") or {}).items():
+            total, count = stats["pass_at_k"].get(k, (0.0, 0))
+            stats["pass_at_k"][k] = (total + value, count + 1)
+
+    def _update_timings(self, data_source: str, r: dict, track_throughput: bool) -> None:
+        timings = r.get("timings")
+        if not isinstance(timings, dict):
+            return
+        reservoirs = self.latency.setdefault(data_source, {})
+        total_seconds = timings.get("total_seconds", 0.0)
+        reservoirs.setdefault("total", LatencyReservoir(rng=self._rng)).add(total_seconds)
+        for stage, stage_stats in (timings.get("stages") or {}).items():
+            reservoirs.setdefault(stage, LatencyReservoir(rng=self._rng)).add(stage_stats.get("seconds", 0.0))
+        started_at = timings.get("started_at")
+        if not track_throughput or started_at is None:
+            return
+        tp = self.throughput.setdefault(data_source, {
+            "samples": 0, "completion_tokens": 0, "first_start": started_at, "last_end": started_at,
+        })
+        tp["samples"] += 1
+        tp["completion_tokens"] += (r.get("token_usage") or {}).get("completion_tokens", 0)
+        tp["first_start"] = min(tp["first_start"], started_at)
+        tp["last_end"] = max(tp["last_end"], started_at + total_seconds)
+
+    def update_from_file(self, result_path: str) -> int:
+        """流式读取结果文件（支持 .zst 和紧凑格式）并累加，返回读取的结果条数"""
+        count = 0
+        for result in iter_results(result_path, expand=False):
+            self.update(result, track_throughput=False)
+            count += 1
+        return count
+
+    @property
+    def avg_score(self) -> float:
+        return self.score_sum / self.total if self.total > 0 else 0
+
+    def snapshot(self) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        生成当前的统计快照（不影响后续累加）
+
+        Returns:
+            Tuple[dict, dict]: (data_source_stats, error_analysis)
+        """
+        data_source_stats = copy.deepcopy(self.data_source_stats)
+        for stats in data_source_stats.values():
+            _finalize_stats(stats)
+            for gen_stats in stats["generators"].values():
+                _finalize_stats(gen_stats)
+        error_analysis = {"errors": list(self.errors), "error_types": dict(self.error_types)}
+        return data_source_stats, error_analysis
+
+    def sampling_snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """
+        按 data_source 返回多次采样统计：
+        {questions, samples_per_question, pass_at_k: {k: 平均 pass@k}, majority_vote_accuracy, mean_score_variance}
+        """
+        result = {}
+        for data_source, stats in self.sampling.items():
+            questions = stats["questions"]
+            result[data_source] = {
+                "questions": questions,
+                "samples_per_question": stats["samples"] / questions if questions else 0.0,
+                "pass_at_k": {k: total / count for k, (total, count) in sorted(stats["pass_at_k"].items(), key=lambda item: int(item[0]))},
+                "majority_vote_accuracy": stats["majority_correct"] / questions if questions else 0.0,
+                "mean_score_variance": stats["variance_sum"] / questions if questions else 0.0,
+            }
+        return result
+
+    def latency_snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """
+        按 data_source 返回延迟与吞吐统计：
+        {"stages": {阶段: {count, mean, p50, p90, p99}}, "throughput": {samples, wall_seconds, samples_per_second, completion_tokens_per_second}}
+        其中阶段 total 为样本端到端耗时，其余阶段为单个样本内该阶段的累计耗时
+        """
+        result = {}
+        for data_source, reservoirs in self.latency.items():
+            stages = {"total": reservoirs["total"].summary()} if "total" in reservoirs else {}
+            for stage in sorted(reservoirs):
+                if stage != "total":
+                    stages[stage] = reservoirs[stage].summary()
+            entry = {"stages": stages}
+            tp = self.throughput.get(data_source)
+            if tp:
+                wall_seconds = tp["last_end"] - tp["first_start"]
+                entry["throughput"] = {
+                    "samples": tp["samples"],
+                    "wall_seconds": wall_seconds,
+                    "samples_per_second": tp["samples"] / wall_seconds if wall_seconds > 0 else 0.0,
+                    "completion_tokens_per_second": tp["completion_tokens"] / wall_seconds if wall_seconds > 0 else 0.0,
+                }
+            result[data_source] = entry
+        return result
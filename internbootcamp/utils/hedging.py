@@ -0,0 +1,99 @@
+import asyncio
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class HedgePolicy:
+    """
+    对冲请求策略：一次请求耗时超过近期成功请求延迟的 percentile 分位数（不低于 min_delay 秒）仍未返回时，
+    再发出一个相同的请求，取先返回的结果并取消另一个。
+
+    延迟分位数基于最近 window 次成功请求，样本少于 min_samples 时不对冲；
+    对冲请求数不超过总请求数的 max_ratio，避免整体变慢时成倍放大负载。
+    """
+
+    def __init__(self, percentile: float = 95, min_delay: float = 1.0, max_ratio: float = 0.1, min_samples: int = 20, window: int = 1000):
+        if not 0 < percentile < 100:
+            raise ValueError(f"hedge percentile 必须在 (0, 100) 之间: {percentile}")
+        self.percentile = percentile
+        self.min_delay = min_delay
+        self.max_ratio = max_ratio
+        self.min_samples = min_samples
+        self._latencies = deque(maxlen=window)
+        self._cached_delay: Optional[float] = None
+        self._observed_since_refresh = 0
+        self.requests = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.primary_wins = 0
+
+    def observe(self, latency: float) -> None:
+        """记录一次成功请求的延迟"""
+        self._latencies.append(latency)
+        self._observed_since_refresh += 1
+
+    def delay(self) -> Optional[float]:
+        """当前的对冲等待时间；返回 None 表示不对冲"""
+        if len(self._latencies) < self.min_samples:
+            return None
+        # 分位数每 50 次观测重新计算一次
+        if self._cached_delay is None or self._observed_since_refresh >= 50:
+            ordered = sorted(self._latencies)
+            index = min(len(ordered) - 1, int(len(ordered) * self.percentile / 100))
+            self._cached_delay = max(self.min_delay, ordered[index])
+            self._observed_since_refresh = 0
+        return self._cached_delay
+
+    def _can_hedge(self) -> bool:
+        return self.hedged < max(1, self.requests * self.max_ratio)
+
+    async def run(self, primary: Callable[[], Awaitable[T]], hedge: Callable[[], Awaitable[T]]) -> T:
+        """
+        执行 primary；超过对冲等待时间仍未完成时并发执行 hedge，返回先成功的结果。
+        两者都失败时抛出先发生的异常
+        """
+        self.requests += 1
+        delay = self.delay()
+        if delay is None:
+            return await primary()
+        primary_task = asyncio.ensure_future(primary())
+        hedge_task = None
+        try:
+            done, _ = await asyncio.wait({primary_task}, timeout=delay)
+            if done or not self._can_hedge():
+                return await primary_task
+            self.hedged += 1
+            hedge_task = asyncio.ensure_future(hedge())
+            pending = {primary_task, hedge_task}
+            first_error = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge_task:
+                            self.hedge_wins += 1
+                        else:
+                            self.primary_wins += 1
+                        return task.result()
+                    first_error = first_error or task.exception()
+            raise first_error
+        finally:
+            for task in (primary_task, hedge_task):
+                if task is None:
+                    continue
+                if not task.done():
+                    task.cancel()
+                elif not task.cancelled():
+                    task.exception()  # 标记为已读取，避免未处理异常的警告
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "hedged": self.hedged,
+            "hedge_rate": self.hedged / self.requests if self.requests else 0.0,
+            "hedge_wins": self.hedge_wins,
+            "primary_wins_after_hedge": self.primary_wins,
+            "current_delay_seconds": self.delay() or 0.0,
+        }
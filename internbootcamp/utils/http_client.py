@@ -0,0 +1,90 @@
+import importlib.util
+from typing import Any, Dict, Optional
+
+import httpx
+
+# 默认的连接池大小与空闲连接保活时长（秒）；LLM 请求间隔较长，保活时间比 httpx 默认的 5s 更长
+DEFAULT_MAX_CONNECTIONS = 100
+DEFAULT_KEEPALIVE_EXPIRY = 60.0
+
+
+def http2_available() -> bool:
+    """HTTP/2 需要安装 h2（pip install httpx[http2]）"""
+    return importlib.util.find_spec("h2") is not None
+
+
+class HttpConnectionStats:
+    """
+    统计 HTTP 请求数与新建连接数，用于评估连接复用效果。
+
+    通过 httpx 的 trace 扩展记录底层 TCP 建连和 TLS 握手事件，多个客户端可共享同一个实例。
+    """
+
+    def __init__(self):
+        self.requests = 0
+        self.new_connections = 0
+        self.tls_handshakes = 0
+        self.http2_requests = 0
+        self.max_connections = None
+        self.http2 = False
+
+    async def _trace(self, event_name: str, info: dict) -> None:
+        if event_name == "connection.connect_tcp.complete":
+            self.new_connections += 1
+        elif event_name == "connection.start_tls.complete":
+            self.tls_handshakes += 1
+        elif event_name == "http2.send_request_headers.started":
+            self.http2_requests += 1
+
+    async def on_request(self, request: httpx.Request) -> None:
+        self.requests += 1
+        request.extensions["trace"] = self._trace
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_connections_per_endpoint": self.max_connections,
+            "http2": self.http2,
+            "requests": self.requests,
+            "new_connections": self.new_connections,
+            "tls_handshakes": self.tls_handshakes,
+            "http2_requests": self.http2_requests,
+            "connection_reuse_rate": 1 - self.new_connections / self.requests if self.requests > 0 else 0.0,
+        }
+
+
+def build_http_client(
+    max_connections: Optional[int] = None,
+    keepalive_expiry: float = DEFAULT_KEEPALIVE_EXPIRY,
+    http2: bool = False,
+    timeout: Optional[httpx.Timeout] = None,
+    verify: bool = False,
+    connection_stats: Optional[HttpConnectionStats] = None,
+) -> httpx.AsyncClient:
+    """
+    创建评测器共用的 httpx 异步客户端。
+
+    Args:
+        max_connections: 连接池上限，通常与最大并发数一致；空闲连接全部保活复用
+        keepalive_expiry: 空闲连接保活时长（秒）
+        http2: 是否启用 HTTP/2（未安装 h2 时回退到 HTTP/1.1）
+        timeout: 请求超时配置，为空时使用 httpx 默认值
+        verify: 是否校验 TLS 证书
+        connection_stats: 可选的连接复用统计
+    """
+    max_connections = max_connections or DEFAULT_MAX_CONNECTIONS
+    if http2 and not http2_available():
+        print("⚠️ 未安装 h2，HTTP/2 不可用，回退到 HTTP/1.1 (pip install httpx[http2])")
+        http2 = False
+    limits = httpx.Limits(
+        max_connections=max_connections,
+        max_keepalive_connections=max_connections,
+        keepalive_expiry=keepalive_expiry,
+    )
+    kwargs = {}
+    if timeout is not None:
+        kwargs["timeout"] = timeout
+    if connection_stats is not None:
+        connection_stats.max_connections = max_connections
+        connection_stats.http2 = http2
+        kwargs["event_hooks"] = {"request": [connection_stats.on_request]}
+    return httpx.AsyncClient(verify=verify, limits=limits, http2=http2, **kwargs)
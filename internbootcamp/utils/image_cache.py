@@ -0,0 +1,141 @@
+import asyncio
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from internbootcamp.src.img2base64 import encode_image_file_to_base64
+
+
+class ImageEncodingCache:
+    """
+    图片 base64 编码缓存。
+
+    键由 (绝对路径, mtime, 文件大小, 编码参数, MAX_IMAGE_SIZE/MIN_IMAGE_EDGE 环境变量) 计算，
+    文件被修改后自动失效。内存中按总字节数做 LRU 淘汰，可选落盘（disk_dir）供后续运行复用；
+    编码在线程池中执行，不阻塞事件循环，同一图片的并发请求只编码一次。
+    """
+
+    def __init__(
+        self,
+        max_bytes: Optional[int] = 256 * 1024 * 1024,
+        disk_dir: Optional[str] = None,
+        max_workers: Optional[int] = None,
+        encode_fn: Callable[..., str] = encode_image_file_to_base64,
+    ):
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self.encode_fn = encode_fn
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="image-encode")
+        self._memory: "OrderedDict[str, str]" = OrderedDict()
+        self._memory_bytes = 0
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.inflight_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.encode_seconds = 0.0
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    def _key(self, image_path: str, target_size: int, fmt: str) -> str:
+        abs_path = os.path.abspath(image_path)
+        stat = os.stat(abs_path)
+        raw = "|".join(str(part) for part in (
+            abs_path, stat.st_mtime_ns, stat.st_size, target_size, fmt,
+            os.environ.get("MAX_IMAGE_SIZE", ""), os.environ.get("MIN_IMAGE_EDGE", ""),
+        ))
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, key[:2], key + ".b64")
+
+    def _remember(self, key: str, value: str) -> None:
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                return
+            self._memory[key] = value
+            self._memory_bytes += len(value)
+            while self.max_bytes is not None and self._memory_bytes > self.max_bytes and len(self._memory) > 1:
+                _, evicted = self._memory.popitem(last=False)
+                self._memory_bytes -= len(evicted)
+                self.evictions += 1
+
+    def _load_or_encode(self, key: str, image_path: str, target_size: int, fmt: str) -> str:
+        # 在线程池中执行：先查磁盘缓存，未命中再编码并落盘
+        if self.disk_dir:
+            disk_path = self._disk_path(key)
+            if os.path.exists(disk_path):
+                with open(disk_path, "r", encoding="ascii") as f:
+                    value = f.read()
+                with self._lock:
+                    self.disk_hits += 1
+                return value
+        started = time.perf_counter()
+        value = self.encode_fn(image_path, target_size=target_size, fmt=fmt)
+        # 多个编码线程同时更新统计，统一在锁内累加
+        with self._lock:
+            self.encode_seconds += time.perf_counter() - started
+            self.misses += 1
+        if self.disk_dir:
+            os.makedirs(os.path.dirname(disk_path), exist_ok=True)
+            tmp_path = f"{disk_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w", encoding="ascii") as f:
+                f.write(value)
+            os.replace(tmp_path, disk_path)
+        return value
+
+    async def encode(self, image_path: str, target_size: int = -1, fmt: str = "JPEG") -> str:
+        """返回图片的 base64 编码（与 encode_image_file_to_base64 结果一致）"""
+        key = self._key(image_path, target_size, fmt)
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return self._memory[key]
+            inflight = self._inflight.get(key)
+            if inflight is not None:
+                self.inflight_hits += 1
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self._executor, self._load_or_encode, key, image_path, target_size, fmt)
+        self._inflight[key] = future
+        try:
+            value = await asyncio.shield(future)
+        finally:
+            self._inflight.pop(key, None)
+        self._remember(key, value)
+        return value
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.lookups
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "inflight_hits": self.inflight_hits,
+                "encoded": self.misses,
+                "hit_rate": 1 - self.misses / lookups if lookups else 0.0,
+                "encode_seconds": self.encode_seconds,
+                "entries": len(self._memory),
+                "size_mb": self._memory_bytes / 1024 / 1024,
+                "evictions": self.evictions,
+            }
+
+    async def run(self, fn: Callable[..., Any], *args) -> Any:
+        """在编码线程池中执行其他图片相关的 CPU 任务（如 base64 解码、哈希）"""
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    @property
+    def lookups(self) -> int:
+        return self.memory_hits + self.disk_hits + self.inflight_hits + self.misses
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False)
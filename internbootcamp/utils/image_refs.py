@@ -0,0 +1,130 @@
+import base64
+import hashlib
+import os
+import threading
+from typing import Any, Dict, List, Optional
+
+REF_PREFIX = "sha256:"
+_DATA_URL_PREFIX = "data:"
+_EXTENSIONS = {"image/jpeg": ".jpg", "image/png": ".png", "image/webp": ".webp", "image/gif": ".gif"}
+
+
+def _parse_data_url(url: str):
+    # data:image/jpeg;base64,<payload>
+    header, _, payload = url.partition(",")
+    mime_type = header[len(_DATA_URL_PREFIX):].split(";")[0] or "application/octet-stream"
+    return mime_type, payload
+
+
+class ImageBlobStore:
+    """
+    结果文件之外的图片存储：按内容哈希保存解码后的图片字节，路径为 <root>/<hash[:2]>/<hash><ext>
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self.written = 0
+        self._known = set()
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    def path(self, digest: str, mime_type: str) -> str:
+        return os.path.join(self.root, digest[:2], digest + _EXTENSIONS.get(mime_type, ".bin"))
+
+    def put(self, digest: str, mime_type: str, data: bytes) -> None:
+        with self._lock:
+            if digest in self._known:
+                return
+            self._known.add(digest)
+        path = self.path(digest, mime_type)
+        if os.path.exists(path):
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        with self._lock:
+            self.written += 1
+
+    def get(self, digest: str, mime_type: str) -> Optional[bytes]:
+        path = self.path(digest, mime_type)
+        if not os.path.exists(path):
+            return None
+        with open(path, "rb") as f:
+            return f.read()
+
+
+class ImageExternalizer:
+    """
+    将消息中内联的 base64 图片（data URL）替换为内容哈希引用，避免结果文件被图片数据撑大。
+
+    替换后的内容块形如 {"type": "image_url", "image_url": {"url": "sha256:<hex>", "mime_type": "image/jpeg"}}；
+    配置 blob_store 时同时保存图片字节，可通过 restore 还原为 data URL。
+    """
+
+    def __init__(self, blob_store: Optional[ImageBlobStore] = None):
+        self.blob_store = blob_store
+        self.images = 0
+        self.bytes_saved = 0
+        # externalize 可能在线程池中并发执行
+        self._lock = threading.Lock()
+
+    def _externalize_part(self, part: Dict[str, Any]) -> Dict[str, Any]:
+        image_url = part.get("image_url")
+        url = image_url.get("url") if isinstance(image_url, dict) else None
+        if not isinstance(url, str) or not url.startswith(_DATA_URL_PREFIX):
+            return part
+        mime_type, payload = _parse_data_url(url)
+        data = base64.b64decode(payload)
+        digest = hashlib.sha256(data).hexdigest()
+        if self.blob_store is not None:
+            self.blob_store.put(digest, mime_type, data)
+        with self._lock:
+            self.images += 1
+            self.bytes_saved += len(url)
+        return {**part, "image_url": {**image_url, "url": REF_PREFIX + digest, "mime_type": mime_type}}
+
+    def externalize(self, messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """返回替换了内联图片的消息列表（浅拷贝，不修改原消息）"""
+        result = []
+        for message in messages:
+            content = message.get("content") if isinstance(message, dict) else None
+            if isinstance(content, list) and any(isinstance(part, dict) and part.get("type") == "image_url" for part in content):
+                message = {**message, "content": [
+                    self._externalize_part(part) if isinstance(part, dict) and part.get("type") == "image_url" else part
+                    for part in content
+                ]}
+            result.append(message)
+        return result
+
+    def restore(self, messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """从 blob_store 还原图片引用为 data URL；找不到的图片保持引用不变"""
+        if self.blob_store is None:
+            return messages
+        result = []
+        for message in messages:
+            content = message.get("content") if isinstance(message, dict) else None
+            if isinstance(content, list):
+                parts = []
+                for part in content:
+                    url = part.get("image_url", {}).get("url") if isinstance(part, dict) and part.get("type") == "image_url" else None
+                    if isinstance(url, str) and url.startswith(REF_PREFIX):
+                        mime_type = part["image_url"].get("mime_type", "image/jpeg")
+                        data = self.blob_store.get(url[len(REF_PREFIX):], mime_type)
+                        if data is not None:
+                            image_url = {k: v for k, v in part["image_url"].items() if k != "mime_type"}
+                            image_url["url"] = f"data:{mime_type};base64,{base64.b64encode(data).decode('utf-8')}"
+                            part = {**part, "image_url": image_url}
+                    parts.append(part)
+                message = {**message, "content": parts}
+            result.append(message)
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "images_externalized": self.images,
+            "inline_mb_saved": self.bytes_saved / 1024 / 1024,
+            "blob_store": self.blob_store.root if self.blob_store is not None else "disabled",
+            "blobs_written": self.blob_store.written if self.blob_store is not None else 0,
+        }
@@ -0,0 +1,81 @@
+import csv
+import os
+from typing import Any, Dict, List, Tuple
+
+
+def comparison_table(reports: Dict[str, dict]) -> Tuple[List[str], List[List[Any]]]:
+    """
+    多模型评测的对比表：每个模型一行，包含总体成功率与平均分、各 data_source 的平均分、
+    相对第一个模型（基线）的分数差、平均 completion token 数、吞吐与样本平均耗时。
+
+    reports 为 {模型名: 该模型的报告数据}（_generate_evaluation_report 的返回值），按评测目标顺序排列
+    """
+    data_sources = []
+    for report in reports.values():
+        for data_source in report["data_source_stats"]:
+            if data_source not in data_sources:
+                data_sources.append(data_source)
+    header = ["Model", "Samples", "Success Rate", "Avg Score", "Δ Score vs Baseline"]
+    header += [f"{data_source} Avg Score" for data_source in data_sources]
+    header += ["Avg Completion Tokens", "Samples/s", "Avg Sample Latency (s)"]
+
+    rows = []
+    baseline_score = None
+    for model, report in reports.items():
+        overall = report["overall_stats"]
+        ds_stats = report["data_source_stats"]
+        if baseline_score is None:
+            baseline_score = overall["overall_avg_score"]
+        success = sum(stats["success_count"] for stats in ds_stats.values())
+        completion_tokens = sum(stats["total_completion_tokens"] for stats in ds_stats.values())
+        # 各 data_source 并发评测，墙钟时间取最长者
+        latency = report.get("latency_stats", {})
+        throughputs = [entry["throughput"] for entry in latency.values() if "throughput" in entry]
+        wall_seconds = max((tp["wall_seconds"] for tp in throughputs), default=0.0)
+        samples = sum(tp["samples"] for tp in throughputs)
+        totals = [entry["stages"]["total"] for entry in latency.values() if "total" in entry.get("stages", {})]
+        latency_count = sum(total["count"] for total in totals)
+        rows.append(
+            [
+                model,
+                overall["total_samples"],
+                f"{overall['success_rate']:.2%}",
+                f"{overall['overall_avg_score']:.4f}",
+                f"{overall['overall_avg_score'] - baseline_score:+.4f}",
+            ]
+            + [f"{ds_stats[data_source]['avg_score']:.4f}" if data_source in ds_stats else "-" for data_source in data_sources]
+            + [
+                f"{completion_tokens / success:.1f}" if success else "0.0",
+                f"{samples / wall_seconds:.2f}" if wall_seconds > 0 else "0.00",
+                f"{sum(total['mean'] * total['count'] for total in totals) / latency_count:.2f}" if latency_count else "0.00",
+            ]
+        )
+    return header, rows
+
+
+def save_comparison_csv(path: str, reports: Dict[str, dict]) -> None:
+    """保存多模型对比 CSV，并附上每个模型的结果文件路径"""
+    header, rows = comparison_table(reports)
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Model Comparison"])
+        writer.writerow(header)
+        writer.writerows(rows)
+        writer.writerow([])
+        writer.writerow(["Model", "Result File"])
+        for model, report in reports.items():
+            writer.writerow([model, report["basic_info"]["output_path"]])
+
+
+def print_comparison(reports: Dict[str, dict]) -> None:
+    header, rows = comparison_table(reports)
+    widths = [max(len(str(value)) for value in column) for column in zip(header, *rows)]
+    print(f"\n{'='*100}")
+    print(f"{'🏁 MODEL COMPARISON':^100}")
+    print(f"{'='*100}")
+    print("  ".join(str(value).ljust(width) for value, width in zip(header, widths)))
+    for row in rows:
+        print("  ".join(str(value).ljust(width) for value, width in zip(row, widths)))
+    print(f"{'='*100}")
@@ -0,0 +1,144 @@
+import asyncio
+import time
+from typing import Any, Dict, List, Optional
+
+# 单张图片的估算 token 数（base64 内容不计入文本长度）
+IMAGE_TOKEN_ESTIMATE = 765
+
+
+def estimate_text_tokens(text: str, tokenizer=None) -> int:
+    if not text:
+        return 0
+    if tokenizer is not None:
+        try:
+            return len(tokenizer.encode(text, add_special_tokens=False))
+        except Exception:
+            pass
+    # 启发式：ASCII 约 4 字符 1 个 token，非 ASCII（如中文）约 1 字符 1 个 token
+    non_ascii = sum(1 for ch in text if ord(ch) > 127)
+    return (len(text) - non_ascii) // 4 + non_ascii + 1
+
+
+def estimate_prompt_tokens(payload: dict, tokenizer=None) -> int:
+    """
+    估算请求 prompt（messages + tools）的 token 数
+    """
+    tokens = 0
+    for message in payload.get("messages", []):
+        tokens += 4  # 每条消息的角色与分隔符开销
+        content = message.get("content")
+        if isinstance(content, list):
+            for part in content:
+                if part.get("type") == "text":
+                    tokens += estimate_text_tokens(part.get("text", ""), tokenizer)
+                elif part.get("type") in ("image_url", "image"):
+                    tokens += IMAGE_TOKEN_ESTIMATE
+        elif content:
+            tokens += estimate_text_tokens(str(content), tokenizer)
+        for tool_call in message.get("tool_calls") or []:
+            tokens += estimate_text_tokens(str(tool_call.get("function", {})), tokenizer)
+    if payload.get("tools"):
+        tokens += estimate_text_tokens(str(payload["tools"]), tokenizer)
+    return tokens
+
+
+def estimate_payload_tokens(payload: dict, tokenizer=None) -> int:
+    """
+    估算一次请求消耗的 token 数：prompt（messages + tools）加上请求的最大生成长度
+    """
+    tokens = estimate_prompt_tokens(payload, tokenizer)
+    max_new_tokens = payload.get("max_completion_tokens") or payload.get("max_tokens") or 0
+    return tokens + int(max_new_tokens) * max(1, int(payload.get("n") or 1))
+
+
+class TokenBucket:
+    """按秒匀速补充的令牌桶，容量为一分钟的配额"""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = float(per_minute) / 60.0
+        self.level = self.capacity
+        self._updated = time.monotonic()
+
+    def refill(self) -> None:
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, amount: float) -> float:
+        # 单次请求超过桶容量时按满桶处理，避免永远等待
+        amount = min(amount, self.capacity)
+        return max(0.0, (amount - self.level) / self.rate)
+
+    def consume(self, amount: float) -> None:
+        # 允许为负（欠账），后续请求会等待补足
+        self.level -= amount
+
+
+class RateLimiter:
+    """
+    客户端 RPM/TPM 限流器，所有 worker 共享。
+
+    acquire 按 FIFO 顺序为请求同时预留 1 个请求配额和估算的 token 配额，
+    配额不足时等待补充；请求完成后用 settle 按实际 usage 修正 token 消耗。
+    """
+
+    def __init__(self, requests_per_minute: Optional[float] = None, tokens_per_minute: Optional[float] = None):
+        self.request_bucket = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.token_bucket = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self.requests = 0
+        self.throttled_requests = 0
+        self.estimated_tokens = 0
+        self.actual_tokens = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self._lock = asyncio.Lock()
+
+    def _buckets(self) -> List[TokenBucket]:
+        return [bucket for bucket in (self.request_bucket, self.token_bucket) if bucket is not None]
+
+    async def acquire(self, tokens: int) -> None:
+        started = time.monotonic()
+        async with self._lock:
+            while True:
+                for bucket in self._buckets():
+                    bucket.refill()
+                wait = max(
+                    self.request_bucket.wait_time(1) if self.request_bucket else 0.0,
+                    self.token_bucket.wait_time(tokens) if self.token_bucket else 0.0,
+                )
+                if wait <= 0:
+                    break
+                await asyncio.sleep(wait)
+            if self.request_bucket:
+                self.request_bucket.consume(1)
+            if self.token_bucket:
+                self.token_bucket.consume(tokens)
+        waited = time.monotonic() - started
+        self.requests += 1
+        self.estimated_tokens += tokens
+        self.total_wait += waited
+        self.max_wait = max(self.max_wait, waited)
+        if waited > 0.01:
+            self.throttled_requests += 1
+
+    def settle(self, estimated_tokens: int, actual_tokens: Optional[int]) -> None:
+        """按实际 token 消耗修正预留量（多退少补）"""
+        if actual_tokens is None:
+            return
+        self.actual_tokens += actual_tokens
+        if self.token_bucket:
+            self.token_bucket.refill()
+            self.token_bucket.consume(actual_tokens - estimated_tokens)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "requests_per_minute": self.request_bucket.capacity if self.request_bucket else "unlimited",
+            "tokens_per_minute": self.token_bucket.capacity if self.token_bucket else "unlimited",
+            "requests": self.requests,
+            "throttled_requests": self.throttled_requests,
+            "estimated_tokens": self.estimated_tokens,
+            "actual_tokens": self.actual_tokens,
+            "total_wait_seconds": self.total_wait,
+            "max_wait_seconds": self.max_wait,
+        }
@@ -0,0 +1,87 @@
+import asyncio
+import copy
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+# 保留已完成响应的最大条数，超出后按最近使用淘汰
+DEFAULT_MAX_COMPLETED = 10000
+
+
+def is_deterministic_payload(payload: dict) -> bool:
+    """temperature 为 0 且只请求一个 completion 时，相同的 payload 应得到相同的响应"""
+    temperature = payload.get("temperature")
+    return temperature is not None and float(temperature) == 0 and int(payload.get("n") or 1) == 1
+
+
+class RequestDeduplicator:
+    """
+    单次评测内相同请求的去重：同一键的请求只发出一次，在途期间到达的相同请求等待其结果，
+    完成后的相同请求直接复用（内存 LRU，最多 max_completed 条）。
+
+    每个调用方拿到的是响应的独立副本，互不影响；首个请求失败时，等待中的请求收到同样的异常。
+    请求在独立的 task 中执行：某个调用方被取消时其余调用方照常拿到结果，所有调用方都取消后才取消请求。
+    """
+
+    def __init__(self, max_completed: int = DEFAULT_MAX_COMPLETED):
+        self.max_completed = max_completed
+        self.requests = 0
+        self.inflight_joins = 0
+        self.completed_hits = 0
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._waiters: Dict[asyncio.Future, int] = {}
+        self._completed: "OrderedDict[str, Any]" = OrderedDict()
+
+    async def run(self, key: str, fn: Callable[[], Awaitable[Tuple[Any, ...]]]) -> Tuple[Any, ...]:
+        self.requests += 1
+        if key in self._completed:
+            self._completed.move_to_end(key)
+            self.completed_hits += 1
+            return copy.deepcopy(self._completed[key])
+        task = self._inflight.get(key)
+        if task is None:
+            # 请求在独立的 task 中执行，发起方被取消（如样本超时）时不影响其他等待方
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            self._waiters[task] = 0
+            task.add_done_callback(lambda t: self._on_done(key, t))
+        else:
+            self.inflight_joins += 1
+        self._waiters[task] += 1
+        try:
+            result = await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if not task.done():
+                self._waiters[task] -= 1
+                # 所有等待方都已取消时才取消请求；之后到达的相同请求重新发起
+                if self._waiters[task] == 0:
+                    if self._inflight.get(key) is task:
+                        del self._inflight[key]
+                    task.cancel()
+            raise
+        return copy.deepcopy(result)
+
+    def _on_done(self, key: str, task: asyncio.Future) -> None:
+        self._waiters.pop(task, None)
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if task.cancelled():
+            return
+        if task.exception() is not None:
+            # 没有等待方时避免 "Task exception was never retrieved" 警告（exception() 已标记为已读取）
+            return
+        self._completed[key] = task.result()
+        if len(self._completed) > self.max_completed:
+            self._completed.popitem(last=False)
+
+    @property
+    def saved_calls(self) -> int:
+        return self.inflight_joins + self.completed_hits
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "deterministic_requests": self.requests,
+            "saved_calls": self.saved_calls,
+            "inflight_joins": self.inflight_joins,
+            "completed_hits": self.completed_hits,
+            "saved_rate": self.saved_calls / self.requests if self.requests else 0.0,
+        }
@@ -0,0 +1,134 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+
+def payload_hash(payload: dict) -> str:
+    """
+    计算请求 payload 的内容哈希（sha256），作为响应缓存的键。
+
+    使用排序后的紧凑 JSON 作为规范形式，因此 model、messages、tools 以及额外参数
+    中任何一项变化都会得到不同的键。
+    """
+    canonical = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class ResponseCacheMiss(RuntimeError):
+    """replay 模式下请求未命中缓存"""
+    pass
+
+
+class ResponseCache:
+    """
+    基于 SQLite 的持久化响应缓存（内容寻址）。
+
+    - readwrite: 命中则直接返回，未命中时由调用方请求接口并写回缓存
+    - replay: 只读模式，未命中时调用方应抛出 ResponseCacheMiss，不访问接口
+
+    超过 max_bytes 时按最近访问时间淘汰最旧的条目。
+    """
+
+    MODES = ("readwrite", "replay")
+
+    def __init__(self, path: str, mode: str = "readwrite", max_bytes: Optional[int] = None):
+        if mode not in self.MODES:
+            raise ValueError(f"不支持的缓存模式: {mode}，可选: {self.MODES}")
+        self.path = path
+        self.mode = mode
+        self.max_bytes = int(max_bytes) if max_bytes else None
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+        if self.replay:
+            if not os.path.exists(path):
+                raise FileNotFoundError(f"replay 模式需要已存在的缓存文件: {path}")
+            self._conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+        else:
+            if os.path.dirname(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, last_access REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_last_access ON responses(last_access)")
+        row = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        self._entries, self._total_bytes = row[0], row[1]
+
+    @property
+    def replay(self) -> bool:
+        return self.mode == "replay"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """按键读取缓存，未命中返回 None"""
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            if not self.replay:
+                self._conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (time.time(), key))
+        return json.loads(row[0])
+
+    def put(self, key: str, value: Dict[str, Any]) -> None:
+        """写入缓存；replay 模式下忽略"""
+        if self.replay:
+            return
+        data = json.dumps(value, ensure_ascii=False).encode("utf-8")
+        with self._lock:
+            old = self._conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, size, last_access) VALUES (?, ?, ?, ?)",
+                (key, data, len(data), time.time()),
+            )
+            if old is None:
+                self._entries += 1
+            else:
+                self._total_bytes -= old[0]
+            self._total_bytes += len(data)
+            self.writes += 1
+            self._evict_if_needed()
+
+    def _evict_if_needed(self) -> None:
+        # 淘汰到上限的 90%，避免每次写入都触发淘汰
+        if not self.max_bytes or self._total_bytes <= self.max_bytes:
+            return
+        target = int(self.max_bytes * 0.9)
+        rows = self._conn.execute("SELECT key, size FROM responses ORDER BY last_access ASC").fetchall()
+        evicted = []
+        for key, size in rows:
+            if self._total_bytes <= target:
+                break
+            evicted.append((key,))
+            self._total_bytes -= size
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", evicted)
+        self._entries -= len(evicted)
+        self.evictions += len(evicted)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "path": self.path,
+            "mode": self.mode,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0,
+            "writes": self.writes,
+            "evictions": self.evictions,
+            "entries": self._entries,
+            "size_mb": self._total_bytes / (1024 * 1024),
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
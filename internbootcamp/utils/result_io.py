@@ -0,0 +1,167 @@
+import io
+import json
+from typing import Any, Dict, Iterator, Optional
+
+ZSTD_SUFFIX = ".zst"
+# 结果文件首行（可选）：{"__result_header__": {...}}，记录紧凑格式版本和运行级配置
+HEADER_KEY = "__result_header__"
+COMPACT_FORMAT = "compact-v1"
+# 紧凑记录中可由其它字段重新计算的字段
+_DERIVABLE_FIELDS = ("full_context", "response_context")
+
+
+def is_compressed(path: str) -> bool:
+    return path.endswith(ZSTD_SUFFIX)
+
+
+def strip_result_suffix(path: str) -> str:
+    """去掉结果文件的 .jsonl / .jsonl.zst 后缀"""
+    if is_compressed(path):
+        path = path[:-len(ZSTD_SUFFIX)]
+    return path[:-len(".jsonl")] if path.endswith(".jsonl") else path
+
+
+def _zstd():
+    try:
+        import zstandard
+    except ImportError as e:
+        raise ImportError("读写 .zst 结果文件需要安装 zstandard: pip install zstandard") from e
+    return zstandard
+
+
+class _ZstdAppendFile:
+    """
+    追加写入的 zstd 文本文件：每次 flush 把缓冲内容压缩为一个独立的 zstd frame，
+    中断时最多丢失最后一个未完成的 frame，之前写入的内容仍可完整解压
+    """
+
+    def __init__(self, path: str, level: int = 3):
+        self._file = open(path, "ab")
+        self._compressor = _zstd().ZstdCompressor(level=level)
+        self._pending = []
+
+    def write(self, text: str) -> None:
+        self._pending.append(text)
+
+    def flush(self) -> None:
+        if self._pending:
+            self._file.write(self._compressor.compress("".join(self._pending).encode("utf-8")))
+            self._pending = []
+        self._file.flush()
+
+    def fileno(self) -> int:
+        return self._file.fileno()
+
+    def close(self) -> None:
+        self.flush()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+def open_result_append(path: str):
+    """以追加模式打开结果文件，.zst 后缀时透明压缩"""
+    if is_compressed(path):
+        return _ZstdAppendFile(path)
+    return open(path, "a", encoding="utf-8")
+
+
+def iter_result_lines(path: str) -> Iterator[str]:
+    """逐行读取结果文件（包括头部行），.zst 后缀时流式解压；末尾不完整的 frame 会被忽略"""
+    if not is_compressed(path):
+        with open(path, "r", encoding="utf-8") as f:
+            yield from f
+        return
+    zstandard = _zstd()
+    with open(path, "rb") as raw:
+        reader = zstandard.ZstdDecompressor().stream_reader(raw, read_across_frames=True)
+        text = io.TextIOWrapper(reader, encoding="utf-8")
+        try:
+            yield from text
+        except zstandard.ZstdError as e:
+            print(f"⚠️ 结果文件末尾数据不完整，已忽略: {path} ({e})")
+
+
+def is_header(record: Any) -> bool:
+    return isinstance(record, dict) and HEADER_KEY in record
+
+
+def read_result_header(path: str) -> Optional[Dict[str, Any]]:
+    """读取结果文件的头部信息，没有头部时返回 None"""
+    for line in iter_result_lines(path):
+        if line.strip():
+            record = json.loads(line)
+            return record[HEADER_KEY] if is_header(record) else None
+    return None
+
+
+def make_result_header(evaluation_config: Dict[str, Any]) -> Dict[str, Any]:
+    """紧凑格式的头部信息（写入文件时包装为 {HEADER_KEY: header}）"""
+    return {"format": COMPACT_FORMAT, "evaluation_config": evaluation_config}
+
+
+def _prompt_field(input_data: Dict[str, Any]) -> Optional[str]:
+    if "messages" in input_data:
+        return "messages"
+    if "prompt" in input_data:
+        return "prompt"
+    return None
+
+
+def compact_result(result: Optional[Dict[str, Any]], header: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+    """
+    转换为紧凑记录：去掉可重新计算的上下文字符串；与头部相同的 evaluation_config、
+    与输入相同的 ground_truth 不再重复存储；与输入相同的 prompt 前缀只保留引用（prompt_ref）
+    """
+    if not result:
+        return result
+    compact = {k: v for k, v in result.items() if k not in _DERIVABLE_FIELDS}
+    input_data = compact.get("input") or {}
+    if header is not None and compact.get("evaluation_config") == header.get("evaluation_config"):
+        compact.pop("evaluation_config")
+    if "ground_truth" in compact and compact["ground_truth"] == (input_data.get("reward_model") or {}).get("ground_truth"):
+        compact.pop("ground_truth")
+    field = _prompt_field(input_data)
+    messages = compact.get("messages")
+    if field and isinstance(messages, list) and isinstance(input_data[field], list):
+        prompt = input_data[field]
+        if messages[:len(prompt)] == prompt:
+            compact["messages"] = messages[len(prompt):]
+            compact["prompt_ref"] = field
+    return compact
+
+
+def expand_result(record: Dict[str, Any], header: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """紧凑记录还原为完整结构（full_context / response_context 需用评测器重新计算）"""
+    input_data = record.get("input") or {}
+    result = dict(record)
+    field = result.pop("prompt_ref", None)
+    if field:
+        result["messages"] = list(input_data.get(field) or []) + list(result.get("messages") or [])
+    if result.get("success") and "ground_truth" not in result:
+        result["ground_truth"] = (input_data.get("reward_model") or {}).get("ground_truth")
+    if "evaluation_config" not in result and header is not None and "evaluation_config" in header:
+        result["evaluation_config"] = header["evaluation_config"]
+    return result
+
+
+def iter_results(path: str, expand: bool = True) -> Iterator[Dict[str, Any]]:
+    """
+    流式读取评测结果：透明解压 .zst，跳过头部行；expand 为 True 时把紧凑记录还原为完整结构
+    """
+    header = None
+    for line in iter_result_lines(path):
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        if is_header(record):
+            header = record[HEADER_KEY]
+            continue
+        if record is None:
+            continue
+        yield expand_result(record, header) if expand else record
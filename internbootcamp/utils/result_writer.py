@@ -0,0 +1,145 @@
+import asyncio
+import json
+import os
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from internbootcamp.utils.result_io import HEADER_KEY, open_result_append
+from internbootcamp.utils.resume_index import PLACEHOLDER, index_checkpoint
+
+_STOP = object()
+# 队列等待超时（用于检查是否到了定时落盘的时间），与值为 None 的结果区分开
+_TICK = object()
+
+
+class AsyncResultWriter:
+    """
+    后台线程批量写入评测结果（JSONL）。
+
+    worker 通过 submit 把结果放入队列后立即返回，JSON 编码和磁盘写入都在后台线程完成，
+    不占用事件循环。缓冲达到 flush_size 条或距上次落盘超过 flush_interval 秒时批量写入；
+    close 会写完队列中剩余的结果并 fsync，保证退出时数据完整落盘。
+
+    指定 index_path 时，同时把每条结果输入的指纹（fingerprint_fn(result["input"])）追加到
+    断点索引文件，每批之后附上结果文件的大小与修改时间作为校验点；索引总是在对应结果落盘之后写入。
+
+    output_path 以 .zst 结尾时压缩写入（每批一个 zstd frame）；transform 在后台线程中
+    对结果做转换（如紧凑格式）；header 不为空时先写入一行头部信息。
+    on_flush(start, end, count) 在每次批量写入后于后台线程中调用（如记录时间线）。
+    """
+
+    def __init__(
+        self,
+        output_path: str,
+        flush_interval: float = 1.0,
+        flush_size: int = 64,
+        max_pending: Optional[int] = None,
+        index_path: Optional[str] = None,
+        fingerprint_fn: Optional[Callable[[dict], str]] = None,
+        transform: Optional[Callable[[dict], dict]] = None,
+        header: Optional[Dict[str, Any]] = None,
+        on_flush: Optional[Callable[[float, float, int], None]] = None,
+    ):
+        self.output_path = output_path
+        self.index_path = index_path
+        self.fingerprint_fn = fingerprint_fn
+        self.transform = transform
+        self.header = header
+        self.on_flush = on_flush
+        self.flush_interval = flush_interval
+        self.flush_size = max(1, int(flush_size))
+        self.written = 0
+        self.failed = 0
+        self.flushes = 0
+        # 有界队列：磁盘跟不上时对 worker 形成背压，而不是无限占用内存
+        self._queue = queue.Queue(maxsize=max_pending or self.flush_size * 16)
+        self._thread = threading.Thread(target=self._run, name="result-writer", daemon=True)
+        self._closed = False
+        self._thread.start()
+
+    async def submit(self, result: Dict[str, Any]) -> None:
+        """提交一条结果；队列满时在线程中等待，不阻塞事件循环"""
+        if self._closed or not self._thread.is_alive():
+            raise RuntimeError(f"结果写入线程不可用: {self.output_path}")
+        try:
+            self._queue.put_nowait(result)
+        except queue.Full:
+            await asyncio.to_thread(self._queue.put, result)
+
+    def _encode(self, result: Dict[str, Any]) -> Optional[str]:
+        try:
+            if self.transform is not None:
+                result = self.transform(result)
+            return json.dumps(result, ensure_ascii=False) + "\n"
+        except Exception as e:
+            self.failed += 1
+            print(f"❌ 写入结果失败: {e}")
+            print(f"❌ 写入结果: {result}")
+            return None
+
+    def _fingerprint(self, result: Optional[Dict[str, Any]]) -> str:
+        if result and result.get("input"):
+            return self.fingerprint_fn(result["input"])
+        return PLACEHOLDER
+
+    def _write(self, f, index_file, lines: List[str], fingerprints: List[str]) -> None:
+        started = time.monotonic()
+        f.write("".join(lines))
+        f.flush()
+        if index_file is not None and fingerprints:
+            # 指纹之后追加结果文件当前的校验点，断点重试时据此确认索引完整而无需扫描结果文件
+            index_file.write("".join(fingerprints) + index_checkpoint(os.fstat(f.fileno())))
+            index_file.flush()
+        self.written += len(lines)
+        self.flushes += 1
+        if self.on_flush is not None:
+            self.on_flush(started, time.monotonic(), len(lines))
+
+    def _run(self) -> None:
+        buffer, fingerprints = [], []
+        last_flush = time.monotonic()
+        index_file = open(self.index_path, "a", encoding="utf-8") if self.index_path else None
+        with open_result_append(self.output_path) as f:
+            if self.header is not None:
+                # 头部行在索引中对应一个占位符，保持逐行对应
+                buffer.append(json.dumps({HEADER_KEY: self.header}, ensure_ascii=False) + "\n")
+                fingerprints.append(PLACEHOLDER + "\n")
+            while True:
+                timeout = max(0.0, self.flush_interval - (time.monotonic() - last_flush))
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    item = _TICK
+                if item is _STOP:
+                    break
+                if item is not _TICK:
+                    line = self._encode(item)
+                    if line is not None:
+                        buffer.append(line)
+                        if index_file is not None:
+                            fingerprints.append(self._fingerprint(item) + "\n")
+                if buffer and (len(buffer) >= self.flush_size or time.monotonic() - last_flush >= self.flush_interval):
+                    self._write(f, index_file, buffer, fingerprints)
+                    buffer, fingerprints = [], []
+                if not buffer:
+                    last_flush = time.monotonic()
+            if buffer:
+                self._write(f, index_file, buffer, fingerprints)
+            f.flush()
+            os.fsync(f.fileno())
+        if index_file is not None:
+            os.fsync(index_file.fileno())
+            index_file.close()
+
+    def close(self) -> None:
+        """写完所有待写结果并落盘，可重复调用"""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join()
+
+    async def aclose(self) -> None:
+        await asyncio.to_thread(self.close)
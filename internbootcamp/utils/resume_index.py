@@ -0,0 +1,133 @@
+import hashlib
+import json
+import os
+from typing import Any, Optional, Set, Tuple
+
+from internbootcamp.utils.result_io import is_compressed, iter_result_lines
+
+INDEX_SUFFIX = ".index"
+_HEADER_PREFIX = "#key_field="
+# 校验点：写入索引时结果文件的大小与修改时间，与结果文件当前状态一致时无需扫描结果文件即可信任索引
+_CHECKPOINT_PREFIX = "#size="
+# 没有输入的结果行（如 null）在索引中的占位符，保证索引与结果文件逐行对应
+PLACEHOLDER = "-"
+_MISSING = object()
+
+
+def resume_index_path(result_path: str) -> str:
+    """结果文件对应的断点索引（sidecar）路径"""
+    return result_path + INDEX_SUFFIX
+
+
+def _get_field(item: dict, key_field: str) -> Any:
+    # 支持 "extra_info.index" 这样的点分路径
+    value = item
+    for key in key_field.split("."):
+        if not isinstance(value, dict) or key not in value:
+            return _MISSING
+        value = value[key]
+    return value
+
+
+def sample_fingerprint(item: dict, key_field: Optional[str] = None) -> str:
+    """
+    计算样本的稳定指纹（32 位十六进制的 blake2b 摘要）。
+
+    指定 key_field（如 "extra_info.index"、"data_id"）且样本包含该字段时只对该字段取哈希，
+    否则对整个输入的规范 JSON 取哈希。
+    """
+    if key_field:
+        value = _get_field(item, key_field)
+        if value is not _MISSING and value is not None:
+            canonical = f"{key_field}={json.dumps(value, sort_keys=True, ensure_ascii=False, default=str)}"
+            return hashlib.blake2b(canonical.encode("utf-8"), digest_size=16).hexdigest()
+    canonical = json.dumps(item, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+    return hashlib.blake2b(canonical.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def write_index_header(index_path: str, key_field: Optional[str]) -> None:
+    """创建（或清空）索引文件并写入指纹字段说明"""
+    with open(index_path, "w", encoding="utf-8") as f:
+        f.write(f"{_HEADER_PREFIX}{key_field or ''}\n")
+
+
+def index_checkpoint(result_stat: os.stat_result) -> str:
+    """结果文件状态对应的索引校验点行（每次批量写入后追加在指纹之后）"""
+    return f"{_CHECKPOINT_PREFIX}{result_stat.st_size} mtime_ns={result_stat.st_mtime_ns}\n"
+
+
+def _append_checkpoint(index_path: str, result_path: str) -> None:
+    with open(index_path, "a", encoding="utf-8") as f:
+        f.write(index_checkpoint(os.stat(result_path)))
+
+
+def _count_lines(path: str) -> int:
+    if is_compressed(path):
+        return sum(1 for _ in iter_result_lines(path))
+    count = 0
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            count += chunk.count(b"\n")
+    return count
+
+
+def _read_index(index_path: str, key_field: Optional[str]) -> Tuple[Optional[Set[str]], int, Optional[str]]:
+    """返回 (指纹集合, 条目数, 最后一行的校验点)；最后一行不是校验点时后者为 None"""
+    fingerprints, count, checkpoint = set(), 0, None
+    with open(index_path, "r", encoding="utf-8") as f:
+        header = f.readline().rstrip("\n")
+        if header != f"{_HEADER_PREFIX}{key_field or ''}":
+            return None, 0, None
+        for line in f:
+            if not line.strip():
+                continue
+            if line.startswith(_CHECKPOINT_PREFIX):
+                checkpoint = line if line.endswith("\n") else line + "\n"
+                continue
+            checkpoint = None
+            fingerprint = line.rstrip("\n")
+            if fingerprint != PLACEHOLDER:
+                fingerprints.add(fingerprint)
+            count += 1
+    return fingerprints, count, checkpoint
+
+
+def _rebuild_index(result_path: str, index_path: str, key_field: Optional[str]) -> Set[str]:
+    # 流式扫描结果文件，只保留定长摘要；索引与结果文件逐行对应
+    fingerprints = set()
+    write_index_header(index_path, key_field)
+    with open(index_path, "a", encoding="utf-8") as index_file:
+        for line in iter_result_lines(result_path):
+            if not line.strip():
+                continue
+            result = json.loads(line)
+            if result and result.get("input"):
+                fingerprint = sample_fingerprint(result["input"], key_field)
+                fingerprints.add(fingerprint)
+            else:
+                fingerprint = PLACEHOLDER
+            index_file.write(fingerprint + "\n")
+    _append_checkpoint(index_path, result_path)
+    return fingerprints
+
+
+def load_resume_index(result_path: str, key_field: Optional[str] = None) -> Set[str]:
+    """
+    加载已完成样本的指纹集合。
+
+    优先读取 sidecar 索引：索引末尾的校验点与结果文件当前的大小和修改时间一致时直接使用，
+    不读取结果文件；没有校验点的旧索引按条目数与结果文件行数校验一次并补上校验点。
+    索引不存在、指纹字段不一致或校验失败（例如中断发生在写结果与写索引之间）时，从结果文件重建一次索引。
+    """
+    index_path = resume_index_path(result_path)
+    if os.path.exists(index_path):
+        fingerprints, count, checkpoint = _read_index(index_path, key_field)
+        if fingerprints is not None:
+            if checkpoint is not None:
+                if checkpoint == index_checkpoint(os.stat(result_path)):
+                    return fingerprints
+            elif count == _count_lines(result_path):
+                _append_checkpoint(index_path, result_path)
+                return fingerprints
+        print(f"⚠️ 断点索引与结果文件不一致，正在重建: {index_path}")
+    return _rebuild_index(result_path, index_path, key_field)
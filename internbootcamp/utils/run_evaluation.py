@@ -90,6 +90,26 @@ def parse_extra_headers(headers_str: str) -> Dict[str, str]:
     return headers
 
 
+def parse_targets(target_strs: List[str], default_api_url: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    解析多模型评测目标
+
+    Args:
+        target_strs: 每项格式为 "model=api_url" 或 "model"（使用 default_api_url）；api_url 可用逗号分隔多个端点
+        default_api_url: 未指定 api_url 时使用的地址
+
+    Returns:
+        [{"model": ..., "api_url": ...}, ...]
+    """
+    targets = []
+    for target_str in target_strs:
+        model, _, api_url = target_str.partition('=')
+        if not model.strip():
+            raise ValueError(f"无效的评测目标: {target_str}")
+        targets.append({"model": model.strip(), "api_url": api_url.strip() or default_api_url})
+    return targets
+
+
 def parse_extra_params(params_str: str) -> Dict[str, any]:
     """
     解析额外的模型参数
@@ -177,7 +197,9 @@ def main():
     parser.add_argument('--dataset-path', type=str, help='数据集文件路径 (.json, .jsonl, .parquet)')
     parser.add_argument('--output-dir', type=str, help='评测结果输出目录')
     parser.add_argument('--api-key', type=str, help='API 密钥')
-    parser.add_argument('--api-url', type=str, default=None, help='API URL (如果不指定则使用默认的OpenAI API)')
+    parser.add_argument('--api-url', type=str, default=None, help='API URL (如果不指定则使用默认的OpenAI API)；多个端点用逗号分隔，按在途请求数负载均衡')
+    parser.add_argument('--endpoint-eject-after', type=int, default=3, help='多端点时，端点连续失败(429/5xx/超时)多少次后暂时摘除 (默认: 3)')
+    parser.add_argument('--endpoint-eject-seconds', type=float, default=30.0, help='端点首次摘除时长(秒)，再次摘除时指数增长 (默认: 30)')
     parser.add_argument('--api-model', type=str, default='gpt-3.5-turbo', help='模型名称 (默认: gpt-3.5-turbo)')
     parser.add_argument('--api-extra-headers', type=str, default=None, help='额外的API头部，格式: "key1:value1,key2:value2"')
     parser.add_argument('--api-extra-params', type=str, default=None, help='额外的模型参数；支持 JSON 字符串或 @文件（JSON）。示例：\n  1) JSON 字符串：\n     --api-extra-params \'{"temperature":0.7, "max_completion_tokens":65536, "extra_body": {"enable_thinking": true}}\'\n  2) 从文件读取（以 @ 开头）：\n     --api-extra-params @/path/to/params.json\n  3) 回退兼容旧格式："temperature:0.7,max_tokens:2048,top_p:0.9"')
@@ -190,13 +212,58 @@ def main():
     parser.add_argument('--max-interaction-turns', type=int, default=None, help='最大交互轮次 (已弃用)')
     parser.add_argument('--max-assistant-turns', type=int, default=None, help='assistant响应的最大轮次 (默认: None，无限制)')
     parser.add_argument('--max-user-turns', type=int, default=None, help='user输入的最大轮次(包括tool response, interaction response) (默认: None，无限制)')
+    parser.add_argument('--sequential-tool-calls', action='store_true', help='同一轮的多个工具调用按顺序执行 (默认: 并发执行，工具 config 中 sequential: true 的工具始终按顺序)')
     parser.add_argument('--max-concurrent', type=int, default=1, help='最大并发数 (默认: 1)')
+    parser.add_argument('--http-max-connections', type=int, default=None, help='每个端点的 HTTP 连接池大小 (默认: 按 --max-concurrent 与采样数自动设置)')
+    parser.add_argument('--http-keepalive-expiry', type=float, default=60.0, help='空闲 HTTP 连接保活时长(秒) (默认: 60)')
+    parser.add_argument('--http2', action='store_true', help='启用 HTTP/2 (需安装 h2: pip install httpx[http2])')
+    parser.add_argument('--adaptive-concurrency', action='store_true', help='自适应并发(AIMD)：根据延迟和 429/5xx/超时在 [--min-concurrent, --max-concurrent] 间动态调整并发')
+    parser.add_argument('--requests-per-minute', type=float, default=None, help='客户端请求数限流 RPM，所有并发 worker 共享 (默认: 不限制)')
+    parser.add_argument('--tokens-per-minute', type=float, default=None, help='客户端 token 限流 TPM，按 tokenizer 或消息长度估算 prompt+max_tokens (默认: 不限制)')
+    parser.add_argument('--min-concurrent', type=int, default=1, help='自适应并发的下限 (默认: 1)')
     parser.add_argument('--verbose', action='store_true', help='输出详细信息')
     parser.add_argument('--dry-run', action='store_true', help='只验证配置，不实际运行评测')
     parser.add_argument('--tokenizer-path', type=str, default=None, nargs='?', const=None, help='tokenizer路径(可选, apply template时使用)')
     parser.add_argument('--bootcamp-registry', type=str, default=None, help='bootcamp注册表路径(可选, 用于批量评测)')
-    parser.add_argument('--resume-from-result-path', type=str, default=None, help='断点重试模式：指定要恢复的结果文件路径(.jsonl)')
+    parser.add_argument('--resume-from-result-path', type=str, default=None, help='断点重试模式：指定要恢复的结果文件路径(.jsonl 或 .jsonl.zst)')
     parser.add_argument('--max-iterations', type=int, default=None, help='单轮数据最大迭代次数（用于单轮评测）')
+    parser.add_argument('--resume-key-field', type=str, default=None, help='断点索引使用的样本指纹字段，支持点分路径(如 extra_info.index)；默认对整个输入取哈希')
+    parser.add_argument('--report-interval', type=float, default=None, help='评测过程中定期刷新 CSV 报告的间隔(秒)，默认只在结束时生成')
+    parser.add_argument('--stream-dataset', action='store_true', help='流式读取数据集(JSONL/Parquet)，有界队列按需取样本，内存占用与数据集大小无关')
+    parser.add_argument('--result-flush-interval', type=float, default=1.0, help='结果文件后台批量写入的最长间隔(秒) (默认: 1.0)')
+    parser.add_argument('--result-flush-size', type=int, default=64, help='结果文件每批写入的最大条数 (默认: 64)')
+    parser.add_argument('--image-cache-mb', type=float, default=256, help='图片 base64 编码内存缓存上限(MB) (默认: 256)')
+    parser.add_argument('--image-cache-dir', type=str, default=None, help='图片编码磁盘缓存目录，跨运行复用(可选)')
+    parser.add_argument('--image-encode-workers', type=int, default=None, help='图片编码线程数 (默认: 由线程池自动决定)')
+    parser.add_argument('--externalize-images', action='store_true', help='结果文件中的内联 base64 图片替换为 sha256 内容哈希引用，显著减小结果文件')
+    parser.add_argument('--image-blob-dir', type=str, default=None, help='外置图片的存储目录(按内容哈希保存，可还原)；指定时自动启用 --externalize-images')
+    parser.add_argument('--compact-results', action='store_true', help='紧凑结果格式：不存储 full_context/response_context，prompt 只保留引用，评测配置写入文件头部')
+    parser.add_argument('--compress-results', action='store_true', help='结果文件使用 zstd 压缩写入(.jsonl.zst，需安装 zstandard)')
+    parser.add_argument('--num-samples', type=int, default=1, help='每个问题采样次数，>1 时报告 pass@k、多数投票准确率和分数方差 (默认: 1)')
+    parser.add_argument('--pass-threshold', type=float, default=1.0, help='多次采样时分数不低于该值视为正确 (默认: 1.0)')
+    parser.add_argument('--dedup-requests', action='store_true', help='相同请求去重：temperature=0 时相同 payload 只请求一次并分发给所有相同样本。仅在服务端贪心解码结果稳定、且不需要重复样本各自独立作答时使用 (默认关闭)')
+    parser.add_argument('--hedge-percentile', type=float, default=None, help='对冲请求：单次请求耗时超过近期成功请求延迟的该分位数(如 95)时，向另一个端点重发相同请求并取先返回者 (默认: 关闭)')
+    parser.add_argument('--hedge-min-delay', type=float, default=1.0, help='对冲前的最短等待时间(秒) (默认: 1.0)')
+    parser.add_argument('--hedge-max-ratio', type=float, default=0.1, help='对冲请求数占总请求数的上限比例 (默认: 0.1)')
+    parser.add_argument('--sample-timeout', type=float, default=None, help='单个样本的总耗时上限(秒)，超时记为失败结果而不阻塞评测 (默认: 不限制)')
+    parser.add_argument('--target', type=str, action='append', default=None, metavar='MODEL[=API_URL]', help='多模型评测：每个 --target 指定一个模型及其 API URL（省略时使用 --api-url），在同一进程中并发评测并生成对比报告')
+    parser.add_argument('--batch-render', type=str, default=None, help='离线批量模式第一阶段：把数据集渲染为 OpenAI 批量请求 JSONL（Batch API / vLLM run_batch）后退出')
+    parser.add_argument('--batch-output', type=str, nargs='+', default=None, help='离线批量模式第二阶段：从批量输出 JSONL 读取响应计算奖励并生成报告，不访问接口')
+    parser.add_argument('--batch-completions', action='store_true', help='纯文本单轮请求在本地用 tokenizer 的 chat template 渲染，多个 prompt 合并为一次 /v1/completions 调用 (需要 --tokenizer-path)')
+    parser.add_argument('--completion-batch-size', type=int, default=32, help='每次 /v1/completions 调用的最大 prompt 数 (默认: 32)')
+    parser.add_argument('--completion-batch-timeout', type=float, default=0.05, help='批次未满时最长等待时间(秒) (默认: 0.05)')
+    parser.add_argument('--circuit-breaker', action='store_true', help='开启进程级熔断器：连续过载失败后所有 worker 暂停请求，冷却后探测恢复 (默认关闭)')
+    parser.add_argument('--breaker-failure-threshold', type=int, default=10, help='熔断器打开前的连续过载类失败次数 (默认: 10)')
+    parser.add_argument('--breaker-reset-timeout', type=float, default=10.0, help='熔断器首次冷却时间(秒)，探测失败后翻倍 (默认: 10)')
+    parser.add_argument('--breaker-max-open-seconds', type=float, default=600.0, help='服务持续不可用超过该时间(秒)后请求直接失败 (默认: 600)')
+    parser.add_argument('--retry-budget-ratio', type=float, default=None, help='全局重试预算：重试次数不超过成功请求数的该倍数，如 0.5 (默认: 不限制)')
+    parser.add_argument('--stream', action='store_true', help='流式请求模型；奖励计算器判定答案已完整输出时提前结束生成(如 freecell 输出 "The answer is N" 后)')
+    parser.add_argument('--no-early-stop', action='store_true', help='流式模式下不提前结束，始终读取完整响应')
+    parser.add_argument('--stop-sequence', type=str, action='append', default=None, help='请求的 stop 序列，可重复指定多次')
+    parser.add_argument('--trace', action='store_true', help='导出 Chrome trace 时间线(<结果文件名>.trace.json)，可用 chrome://tracing 或 ui.perfetto.dev 查看每个样本的排队、请求、重试、工具调用和写入')
+    parser.add_argument('--response-cache-path', type=str, default=None, help='响应缓存文件路径(SQLite)，按 payload 哈希缓存模型响应(可选)')
+    parser.add_argument('--response-cache-mode', type=str, default='readwrite', choices=['readwrite', 'replay'], help='响应缓存模式：readwrite 读写缓存；replay 只读回放，未命中即失败 (默认: readwrite)')
+    parser.add_argument('--response-cache-max-mb', type=float, default=None, help='响应缓存大小上限(MB)，超出后按最近访问时间淘汰 (默认: 不限制)')
     args = parser.parse_args()
     
     # 验证输入文件
@@ -208,6 +275,11 @@ def main():
     if args.resume_from_result_path and not os.path.exists(args.resume_from_result_path):
         print(f"❌ 错误: 断点重试文件不存在: {args.resume_from_result_path}")
         sys.exit(1)
+
+    # 多模型评测
+    if args.target and (args.resume_from_result_path or args.batch_render):
+        print("❌ 错误: 多模型评测 (--target) 不支持断点重试和离线批量渲染")
+        sys.exit(1)
     
     # 创建输出目录
     os.makedirs(args.output_dir, exist_ok=True)
@@ -228,11 +300,14 @@ def main():
         print(f"  最大assistant轮次: {args.max_assistant_turns}")
         print(f"  最大user轮次: {args.max_user_turns}")
         print(f"  最大并发: {args.max_concurrent}")
+        print(f"  自适应并发: {'启用 (' + str(args.min_concurrent) + '~' + str(args.max_concurrent) + ')' if args.adaptive_concurrency else '禁用'}")
+        print(f"  流式读取数据集: {'启用' if args.stream_dataset else '禁用'}")
         print(f"  额外API头部: {args.api_extra_headers if args.api_extra_headers else '无'}")
         print(f"  额外模型参数: {args.api_extra_params if args.api_extra_params else '无'}")
         print(f"  验证修正参数: {args.verify_correction_kwargs if args.verify_correction_kwargs else '无'}")
         print(f"  断点重试: {'启用 (' + args.resume_from_result_path + ')' if args.resume_from_result_path else '禁用'}")
         print(f"  最大迭代次数: {args.max_iterations if args.max_iterations else '无'}")
+        print(f"  响应缓存: {args.response_cache_path + ' (' + args.response_cache_mode + ')' if args.response_cache_path else '禁用'}")
     try:
         # 解析额外头部和参数
         extra_headers = parse_extra_headers(args.api_extra_headers) if args.api_extra_headers else None
@@ -262,23 +337,105 @@ def main():
             api_extra_params=extra_params,
             verify_correction_kwargs=verify_correction_kwargs,
             tokenizer_path=args.tokenizer_path,
-            max_iterations=args.max_iterations
+            max_iterations=args.max_iterations,
+            resume_key_field=args.resume_key_field,
+            report_interval=args.report_interval,
+            adaptive_concurrency=args.adaptive_concurrency,
+            min_concurrent=args.min_concurrent,
+            requests_per_minute=args.requests_per_minute,
+            tokens_per_minute=args.tokens_per_minute,
+            endpoint_eject_after=args.endpoint_eject_after,
+            endpoint_eject_seconds=args.endpoint_eject_seconds,
+            http_max_connections=args.http_max_connections,
+            http_keepalive_expiry=args.http_keepalive_expiry,
+            http2=args.http2,
+            result_flush_interval=args.result_flush_interval,
+            result_flush_size=args.result_flush_size,
+            image_cache_mb=args.image_cache_mb,
+            image_cache_dir=args.image_cache_dir,
+            image_encode_workers=args.image_encode_workers,
+            externalize_images=args.externalize_images,
+            image_blob_dir=args.image_blob_dir,
+            parallel_tool_calls=not args.sequential_tool_calls,
+            compact_results=args.compact_results,
+            compress_results=args.compress_results,
+            trace=args.trace,
+            stream=args.stream,
+            stream_early_stop=not args.no_early_stop,
+            stop_sequences=args.stop_sequence,
+            num_samples=args.num_samples,
+            sample_pass_threshold=args.pass_threshold,
+            dedup_requests=args.dedup_requests,
+            hedge_percentile=args.hedge_percentile,
+            hedge_min_delay=args.hedge_min_delay,
+            hedge_max_ratio=args.hedge_max_ratio,
+            sample_timeout=args.sample_timeout,
+            circuit_breaker=args.circuit_breaker,
+            breaker_failure_threshold=args.breaker_failure_threshold,
+            breaker_reset_timeout=args.breaker_reset_timeout,
+            breaker_max_open_seconds=args.breaker_max_open_seconds,
+            retry_budget_ratio=args.retry_budget_ratio,
+            batch_output_path=args.batch_output,
+            batch_completions=args.batch_completions,
+            completion_batch_size=args.completion_batch_size,
+            completion_batch_timeout=args.completion_batch_timeout,
+            response_cache_path=args.response_cache_path,
+            response_cache_mode=args.response_cache_mode,
+            response_cache_max_mb=args.response_cache_max_mb,
         )
         
         if args.dry_run:
             print("✅ 配置验证通过！(干运行模式)")
             return
         
+        if args.batch_render:
+            async def render():
+                async with evaluator:
+                    await evaluator.render_batch_requests(
+                        args.batch_render,
+                        dataset_path=args.dataset_path,
+                        yaml_tool_path=args.tool_config,
+                        yaml_interaction_path=args.interaction_config,
+                        bootcamp_registry=args.bootcamp_registry,
+                    )
+
+            asyncio.run(render())
+            return
+
+        if args.target:
+            targets = parse_targets(args.target, args.api_url)
+
+            async def run_targets():
+                async with evaluator:
+                    await evaluator.run_multi_model_evaluation(
+                        targets,
+                        dataset_path=args.dataset_path,
+                        output_dir=args.output_dir,
+                        yaml_tool_path=args.tool_config,
+                        yaml_interaction_path=args.interaction_config,
+                        max_concurrent=args.max_concurrent,
+                        bootcamp_registry=args.bootcamp_registry,
+                    )
+
+            asyncio.run(run_targets())
+            return
+
         # 运行评测 - 直接使用base_evaluator的run_evaluation方法
-        asyncio.run(evaluator.run_evaluation(
-            dataset_path=args.dataset_path,
-            output_dir=args.output_dir,
-            yaml_tool_path=args.tool_config,
-            yaml_interaction_path=args.interaction_config,
-            max_concurrent=args.max_concurrent,
-            bootcamp_registry=args.bootcamp_registry,
-            resume_from_result_path=args.resume_from_result_path
-        ))
+        async def run():
+            # 评测结束后关闭连接池和缓存
+            async with evaluator:
+                await evaluator.run_evaluation(
+                    dataset_path=args.dataset_path,
+                    output_dir=args.output_dir,
+                    yaml_tool_path=args.tool_config,
+                    yaml_interaction_path=args.interaction_config,
+                    max_concurrent=args.max_concurrent,
+                    bootcamp_registry=args.bootcamp_registry,
+                    resume_from_result_path=args.resume_from_result_path,
+                    stream_dataset=args.stream_dataset,
+                )
+
+        asyncio.run(run())
         
     except Exception as e:
         print(f"❌ 评测过程中发生错误: {str(e)}")
@@ -0,0 +1,76 @@
+from collections import Counter
+from contextvars import ContextVar
+from math import comb
+from typing import Any, Awaitable, Callable, Dict, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+# 多次采样时当前请求对应的采样序号；序号不为 0 的请求使用独立的响应缓存键，避免 k 次采样命中同一条缓存
+current_sample_index: ContextVar[int] = ContextVar("current_sample_index", default=0)
+
+
+async def run_as_sample(index: int, fn: Callable[[], Awaitable[T]]) -> T:
+    """在采样序号为 index 的上下文中执行 fn（需在独立的 task 中调用，如 asyncio.gather 的子任务）"""
+    token = current_sample_index.set(index)
+    try:
+        return await fn()
+    finally:
+        current_sample_index.reset(token)
+
+
+def pass_at_k(n: int, c: int, k: int) -> float:
+    """
+    pass@k 的无偏估计：n 次采样中有 c 次正确时，随机取 k 次至少一次正确的概率
+    （1 - C(n-c, k) / C(n, k)）
+    """
+    if k > n:
+        raise ValueError(f"k ({k}) 不能大于采样次数 n ({n})")
+    if n - c < k:
+        return 1.0
+    return 1.0 - comb(n - c, k) / comb(n, k)
+
+
+def pass_k_values(n: int) -> List[int]:
+    """报告的 k 取值：1, 2, 4, ... 直到 n（总是包含 n）"""
+    ks, k = [], 1
+    while k < n:
+        ks.append(k)
+        k *= 2
+    ks.append(n)
+    return ks
+
+
+def summarize_samples(samples: List[Dict[str, Any]], pass_threshold: float = 1.0) -> Dict[str, Any]:
+    """
+    汇总同一问题的 k 次采样（每项包含 score、extracted_output、success）：
+    pass@k、多数投票结果及其是否正确、分数均值与方差
+    """
+    n = len(samples)
+    scores = [s["score"] if s.get("success") and isinstance(s.get("score"), (int, float)) else 0.0 for s in samples]
+    correct = sum(1 for score in scores if score >= pass_threshold)
+    # 多数投票：出现次数最多的答案（平票时取最先出现的），答案无法解析的采样不参与投票
+    votes = Counter(_vote_key(s.get("extracted_output")) for s in samples if s.get("success") and s.get("extracted_output") is not None)
+    majority_vote: Optional[Any] = None
+    majority_correct = False
+    if votes:
+        majority_key = votes.most_common(1)[0][0]
+        for sample, score in zip(samples, scores):
+            if sample.get("success") and sample.get("extracted_output") is not None and _vote_key(sample["extracted_output"]) == majority_key:
+                majority_vote = sample["extracted_output"]
+                majority_correct = score >= pass_threshold
+                break
+    mean = sum(scores) / n if n else 0.0
+    return {
+        "num_samples": n,
+        "num_correct": correct,
+        "pass_at_k": {str(k): pass_at_k(n, correct, k) for k in pass_k_values(n)},
+        "majority_vote": majority_vote,
+        "majority_correct": majority_correct,
+        "score_mean": mean,
+        "score_variance": sum((score - mean) ** 2 for score in scores) / n if n else 0.0,
+    }
+
+
+def _vote_key(extracted_output: Any) -> str:
+    # 提取结果可能是 dict / list 等不可哈希类型，统一转为字符串比较
+    return extracted_output if isinstance(extracted_output, str) else repr(extracted_output)
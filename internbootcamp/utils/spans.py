@@ -0,0 +1,80 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# 当前样本的计时记录；在 worker 中为每个样本设置，asyncio.gather 创建的子任务会继承
+_current_sample: ContextVar[Optional["SampleSpans"]] = ContextVar("current_sample_spans", default=None)
+
+
+class SampleSpans:
+    """
+    单个样本各阶段的计时记录（time.monotonic）。
+
+    spans 中每项为 (stage, start, end, attrs)，attrs 可携带工具名、重试次数等附加信息。
+    """
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.started_wall = time.time()
+        self.ended: Optional[float] = None
+        self.spans: List[Tuple[str, float, float, Dict[str, Any]]] = []
+
+    def add(self, stage: str, start: float, end: float, **attrs) -> None:
+        self.spans.append((stage, start, end, attrs))
+
+    def finish(self) -> None:
+        self.ended = time.monotonic()
+
+    @property
+    def total_seconds(self) -> float:
+        return (self.ended or time.monotonic()) - self.started
+
+    def summary(self) -> Dict[str, Any]:
+        """写入结果记录的计时摘要：总耗时和每个阶段的次数与累计耗时"""
+        stages: Dict[str, Dict[str, Any]] = {}
+        for stage, start, end, _ in self.spans:
+            stage_stats = stages.setdefault(stage, {"count": 0, "seconds": 0.0})
+            stage_stats["count"] += 1
+            stage_stats["seconds"] += end - start
+        for stage_stats in stages.values():
+            stage_stats["seconds"] = round(stage_stats["seconds"], 6)
+        return {
+            "started_at": self.started_wall,
+            "total_seconds": round(self.total_seconds, 6),
+            "stages": stages,
+        }
+
+
+@contextmanager
+def sample_spans() -> Iterator[SampleSpans]:
+    """为当前任务（及其子任务）开始记录一个样本的计时"""
+    spans = SampleSpans()
+    token = _current_sample.set(spans)
+    try:
+        yield spans
+    finally:
+        spans.finish()
+        _current_sample.reset(token)
+
+
+def current_sample_spans() -> Optional[SampleSpans]:
+    return _current_sample.get()
+
+
+@contextmanager
+def span(stage: str, **attrs) -> Iterator[Dict[str, Any]]:
+    """
+    记录一个阶段的耗时；不在样本上下文中时不做任何记录。
+    返回的 attrs 字典可在阶段内补充信息（如失败原因）。
+    """
+    spans = _current_sample.get()
+    start = time.monotonic()
+    try:
+        yield attrs
+    except BaseException as e:
+        attrs.setdefault("error", type(e).__name__)
+        raise
+    finally:
+        if spans is not None:
+            spans.add(stage, start, time.monotonic(), **attrs)
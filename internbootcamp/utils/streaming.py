@@ -0,0 +1,160 @@
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from internbootcamp.utils.rate_limiter import estimate_prompt_tokens, estimate_text_tokens
+
+
+def _may_complete_answer(previous: str, delta: str) -> bool:
+    """
+    早停判断只在答案可能刚变完整时重新执行：新内容包含换行、闭合标签（>），
+    或有数字在此结束（数字后出现非数字字符）。其余 chunk 跳过判断，避免每个 chunk 都重新扫描全部已生成内容
+    """
+    if "\n" in delta or ">" in delta:
+        return True
+    text = previous + delta
+    return any(a.isdigit() and not b.isdigit() for a, b in zip(text, text[1:]))
+
+
+class StreamAccumulator:
+    """
+    把流式返回的 chat.completion.chunk 拼接为与非流式 response.model_dump() 相同结构的响应。
+
+    early_stop(output) 返回 True 时停止读取（如答案已完整输出）。output 与最终消息转为上下文时的格式一致：
+    服务端以 reasoning_content 单独返回思考过程时，前面加上 <think>...</think>，
+    以便判断思考是否已结束。提前结束时服务端不会返回 usage，
+    prompt / completion token 数按 tokenizer（或启发式）估算，并在 usage 中标记 estimated。
+    """
+
+    def __init__(self, early_stop: Optional[Callable[[str], bool]] = None):
+        self.early_stop = early_stop
+        self.started = time.monotonic()
+        self.first_token_at: Optional[float] = None
+        self.chunks = 0
+        self.stopped_early = False
+        self._id = None
+        self._model = None
+        self._created = None
+        self._content: List[str] = []
+        self._reasoning: List[str] = []
+        self._tool_calls: Dict[int, Dict[str, Any]] = {}
+        self._finish_reason = None
+        self._usage: Optional[Dict[str, Any]] = None
+
+    @property
+    def content(self) -> str:
+        # 合并为单个字符串缓存，重复读取时不再重新拼接
+        if len(self._content) > 1:
+            self._content = ["".join(self._content)]
+        return self._content[0] if self._content else ""
+
+    @property
+    def reasoning(self) -> str:
+        if len(self._reasoning) > 1:
+            self._reasoning = ["".join(self._reasoning)]
+        return self._reasoning[0] if self._reasoning else ""
+
+    def _early_stop_output(self) -> str:
+        if self._reasoning:
+            return f"<think>\n{self.reasoning}\n</think>\n\n{self.content}"
+        return self.content
+
+    def add(self, chunk) -> bool:
+        """累加一个 chunk，返回 True 表示应提前结束读取"""
+        self.chunks += 1
+        self._id = self._id or chunk.id
+        self._model = self._model or chunk.model
+        self._created = self._created or chunk.created
+        if getattr(chunk, "usage", None) is not None:
+            self._usage = chunk.usage.model_dump()
+        if not chunk.choices:
+            return False
+        choice = chunk.choices[0]
+        if choice.finish_reason:
+            self._finish_reason = choice.finish_reason
+        delta = choice.delta
+        if delta is None:
+            return False
+        reasoning = getattr(delta, "reasoning_content", None)
+        if reasoning:
+            self._reasoning.append(reasoning)
+        for tool_call in delta.tool_calls or []:
+            entry = self._tool_calls.setdefault(tool_call.index, {"id": None, "type": "function", "function": {"name": "", "arguments": ""}})
+            if tool_call.id:
+                entry["id"] = tool_call.id
+            if tool_call.function is not None:
+                entry["function"]["name"] += tool_call.function.name or ""
+                entry["function"]["arguments"] += tool_call.function.arguments or ""
+        if delta.content:
+            if self.first_token_at is None:
+                self.first_token_at = time.monotonic()
+            previous = self._content[-1][-1:] if self._content else ""
+            self._content.append(delta.content)
+            # 正在生成工具调用时不提前结束
+            if (
+                self.early_stop is not None
+                and not self._tool_calls
+                and _may_complete_answer(previous, delta.content)
+                and self.early_stop(self._early_stop_output())
+            ):
+                self.stopped_early = True
+                return True
+        elif reasoning and self.first_token_at is None:
+            self.first_token_at = time.monotonic()
+        return False
+
+    def response(self, payload: dict, tokenizer=None) -> Dict[str, Any]:
+        message = {"role": "assistant", "content": self.content}
+        if self._reasoning:
+            message["reasoning_content"] = self.reasoning
+        message["tool_calls"] = [self._tool_calls[i] for i in sorted(self._tool_calls)] or None
+        usage = self._usage
+        if usage is None:
+            prompt_tokens = estimate_prompt_tokens(payload, tokenizer)
+            completion_tokens = estimate_text_tokens(self.content + message.get("reasoning_content", ""), tokenizer)
+            usage = {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+                "estimated": True,
+            }
+        return {
+            "id": self._id,
+            "object": "chat.completion",
+            "created": self._created,
+            "model": self._model,
+            "choices": [{
+                "index": 0,
+                "message": message,
+                "finish_reason": "stop" if self.stopped_early else self._finish_reason,
+            }],
+            "usage": usage,
+            "early_stopped": self.stopped_early,
+        }
+
+
+class StreamingStats:
+    """流式请求统计：提前结束次数与首 token 延迟"""
+
+    def __init__(self):
+        self.requests = 0
+        self.early_stopped = 0
+        self.completion_tokens = 0
+        self._ttft_total = 0.0
+        self._ttft_count = 0
+
+    def record(self, accumulator: StreamAccumulator, completion_tokens: int) -> None:
+        self.requests += 1
+        self.early_stopped += int(accumulator.stopped_early)
+        self.completion_tokens += completion_tokens or 0
+        if accumulator.first_token_at is not None:
+            self._ttft_total += accumulator.first_token_at - accumulator.started
+            self._ttft_count += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "early_stopped": self.early_stopped,
+            "early_stop_rate": self.early_stopped / self.requests if self.requests else 0.0,
+            "avg_completion_tokens": self.completion_tokens / self.requests if self.requests else 0.0,
+            "avg_ttft_seconds": self._ttft_total / self._ttft_count if self._ttft_count else 0.0,
+        }
@@ -0,0 +1,56 @@
+import time
+from typing import Any, Dict
+
+# 工具生命周期中统计的操作
+TOOL_OPERATIONS = ("create", "execute", "calc_reward", "release")
+
+
+class _TimedOperation:
+    def __init__(self, stats: "ToolLifecycleStats", tool_name: str, operation: str):
+        self.stats = stats
+        self.tool_name = tool_name
+        self.operation = operation
+        self.started = None
+
+    async def __aenter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.stats.record(self.tool_name, self.operation, time.perf_counter() - self.started, error=exc is not None)
+        return False
+
+
+class ToolLifecycleStats:
+    """按工具统计 create / execute / calc_reward / release 的调用次数、失败次数和耗时"""
+
+    def __init__(self):
+        self._stats: Dict[str, Dict[str, Dict[str, Any]]] = {}
+
+    def timed(self, tool_name: str, operation: str) -> _TimedOperation:
+        return _TimedOperation(self, tool_name, operation)
+
+    def record(self, tool_name: str, operation: str, seconds: float, error: bool = False) -> None:
+        tool_stats = self._stats.setdefault(tool_name, {})
+        op_stats = tool_stats.setdefault(operation, {"count": 0, "errors": 0, "total_seconds": 0.0, "max_seconds": 0.0})
+        op_stats["count"] += 1
+        op_stats["errors"] += int(error)
+        op_stats["total_seconds"] += seconds
+        op_stats["max_seconds"] = max(op_stats["max_seconds"], seconds)
+
+    def __bool__(self) -> bool:
+        return bool(self._stats)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """按工具名返回扁平的统计项，如 execute_count、execute_avg_seconds"""
+        result = {}
+        for tool_name, tool_stats in self._stats.items():
+            flat = {}
+            for operation in TOOL_OPERATIONS:
+                op_stats = tool_stats.get(operation, {"count": 0, "errors": 0, "total_seconds": 0.0, "max_seconds": 0.0})
+                flat[f"{operation}_count"] = op_stats["count"]
+                flat[f"{operation}_errors"] = op_stats["errors"]
+                flat[f"{operation}_avg_seconds"] = op_stats["total_seconds"] / op_stats["count"] if op_stats["count"] else 0.0
+                flat[f"{operation}_max_seconds"] = op_stats["max_seconds"]
+            result[tool_name] = flat
+        return result
@@ -0,0 +1,111 @@
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from internbootcamp.utils.spans import SampleSpans
+
+# 结果写入线程在时间线中的 tid（worker 的 tid 从 1 开始，每个 worker 预留 _LANES_PER_WORKER 条泳道）
+_WRITER_TID = 0
+_LANES_PER_WORKER = 100
+
+
+def _assign_lanes(spans: List[Tuple[str, float, float, Dict[str, Any]]]) -> List[int]:
+    """
+    为阶段分配泳道：同一泳道内的事件必须严格嵌套或不相交（Chrome trace 的 X 事件要求），
+    并行执行的工具调用等相互交叠的阶段放到额外泳道
+    """
+    order = sorted(range(len(spans)), key=lambda i: (spans[i][1], -spans[i][2]))
+    lanes: List[List[float]] = []  # 每条泳道上尚未结束的事件结束时间栈
+    assignment = [0] * len(spans)
+    for i in order:
+        _, start, end, _ = spans[i]
+        for lane, stack in enumerate(lanes):
+            while stack and stack[-1] <= start:
+                stack.pop()
+            if not stack or end <= stack[-1]:
+                stack.append(end)
+                assignment[i] = lane
+                break
+        else:
+            lanes.append([end])
+            assignment[i] = len(lanes) - 1
+    return assignment
+
+
+class ChromeTraceWriter:
+    """
+    把每个样本的生命周期写成 Chrome trace-event 格式（JSON 数组），可直接用
+    chrome://tracing 或 https://ui.perfetto.dev 打开。
+
+    每个 worker 一条泳道，样本在其中显示为 sample 事件，内部嵌套排队等待、API 尝试
+    （包括重试与退避）、工具调用、打分、结果提交等阶段；结果写入线程的批量落盘单独一条泳道。
+    事件在样本完成时流式追加到文件，close 时补全线程名等元数据并闭合数组。
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.events = 0
+        self._origin = time.monotonic()
+        self._lock = threading.Lock()
+        self._thread_names: Dict[int, str] = {_WRITER_TID: "result-writer"}
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._file = open(path, "w", encoding="utf-8")
+        self._file.write("[\n")
+
+    def _us(self, t: float) -> float:
+        return round((t - self._origin) * 1e6, 1)
+
+    def _event(self, name: str, cat: str, tid: int, start: float, end: float, args: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        event = {"name": name, "cat": cat, "ph": "X", "pid": 1, "tid": tid, "ts": self._us(start), "dur": round(max(0.0, end - start) * 1e6, 1)}
+        if args:
+            event["args"] = args
+        return event
+
+    def _emit(self, events: List[Dict[str, Any]]) -> None:
+        if not events:
+            return
+        text = "".join(json.dumps(event, ensure_ascii=False, default=str) + ",\n" for event in events)
+        with self._lock:
+            if self._file.closed:
+                return
+            self._file.write(text)
+            self.events += len(events)
+
+    def record_sample(self, worker_id: int, name: str, spans: SampleSpans, enqueued_at: Optional[float] = None, args: Optional[Dict[str, Any]] = None) -> None:
+        """记录一个样本：enqueued_at 为样本放入队列的 time.monotonic()，用于显示排队等待"""
+        base_tid = 1 + worker_id * _LANES_PER_WORKER
+        # 样本事件需覆盖其全部阶段（结果提交发生在计时结束之后）
+        ended = max([spans.ended or time.monotonic()] + [end for _, _, end, _ in spans.spans])
+        events = []
+        if enqueued_at is not None and enqueued_at < spans.started:
+            events.append(self._event("queue_wait", "queue", base_tid, enqueued_at, spans.started))
+        events.append(self._event(name, "sample", base_tid, spans.started, ended, args))
+        lanes = _assign_lanes(spans.spans)
+        for (stage, start, end, attrs), lane in zip(spans.spans, lanes):
+            # 泳道 0 与 sample 事件共用 tid，阶段事件嵌套在 sample 事件之内
+            tid = base_tid + lane
+            if tid not in self._thread_names:
+                self._thread_names[tid] = f"worker {worker_id}" + (f" · parallel {lane}" if lane else "")
+            events.append(self._event(stage, "stage", tid, start, end, attrs))
+        self._thread_names.setdefault(base_tid, f"worker {worker_id}")
+        self._emit(events)
+
+    def record_flush(self, start: float, end: float, count: int) -> None:
+        """结果写入线程批量落盘（可在任意线程调用）"""
+        self._emit([self._event("result_flush", "write", _WRITER_TID, start, end, {"results": count})])
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file.closed:
+                return
+            metadata = [{"name": "process_name", "ph": "M", "pid": 1, "args": {"name": "evaluation"}}]
+            for tid, thread_name in sorted(self._thread_names.items()):
+                metadata.append({"name": "thread_name", "ph": "M", "pid": 1, "tid": tid, "args": {"name": thread_name}})
+                metadata.append({"name": "thread_sort_index", "ph": "M", "pid": 1, "tid": tid, "args": {"sort_index": tid}})
+            self._file.write(",\n".join(json.dumps(event) for event in metadata) + "\n]\n")
+            self._file.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"trace_path": self.path, "events": self.events}
@@ -22,7 +22,7 @@ setup(
     long_description_content_type="text/markdown",
     author="internbootcamp v2.0.0 Team",
     license="Apache-2.0",
-    packages=find_packages(where="."),
+    packages=find_packages(where=".", exclude=["tests", "tests.*"]),
     package_dir={"": "."},
     python_requires=">=3.10",
     install_requires=[
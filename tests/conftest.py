@@ -0,0 +1,43 @@
+"""
+未安装 verl 时注入最小替身模块，使依赖工具加载的 BaseEvaluator 测试始终可以运行。
+
+只提供 internbootcamp 在导入阶段用到的符号：verl.tools.schemas 中的工具 schema
+与 verl.utils.rollout_trace.rollout_trace_op。
+"""
+import sys
+import types
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+def _install_verl_stub():
+    class OpenAIFunctionSchema(BaseModel):
+        name: str
+        description: str = ""
+        parameters: dict = {}
+        strict: bool = False
+
+    class OpenAIFunctionToolSchema(BaseModel):
+        type: str = "function"
+        function: OpenAIFunctionSchema
+
+    class ToolResponse(BaseModel):
+        text: Optional[str] = None
+
+    modules = {name: types.ModuleType(name) for name in ("verl", "verl.tools", "verl.tools.schemas", "verl.utils", "verl.utils.rollout_trace")}
+    modules["verl.tools.schemas"].OpenAIFunctionSchema = OpenAIFunctionSchema
+    modules["verl.tools.schemas"].OpenAIFunctionToolSchema = OpenAIFunctionToolSchema
+    modules["verl.tools.schemas"].ToolResponse = ToolResponse
+    modules["verl.utils.rollout_trace"].rollout_trace_op = lambda fn: fn
+    modules["verl"].tools, modules["verl"].utils = modules["verl.tools"], modules["verl.utils"]
+    modules["verl.tools"].schemas = modules["verl.tools.schemas"]
+    modules["verl.utils"].rollout_trace = modules["verl.utils.rollout_trace"]
+    sys.modules.update(modules)
+
+
+try:
+    import verl.tools.schemas  # noqa: F401
+    import verl.utils.rollout_trace  # noqa: F401
+except ImportError:
+    _install_verl_stub()
@@ -0,0 +1,54 @@
+"""测试共用的假时钟、假工具与假奖励计算器"""
+import asyncio
+
+from internbootcamp.src.base_evaluator import BaseEvaluator
+
+
+class FakeClock:
+    """可手动推进的 time.monotonic 替身"""
+
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeTool:
+    """execute 按参数中的 delay 等待；fail 指定在哪个阶段抛出异常"""
+
+    def __init__(self, fail=None):
+        self.fail = fail
+        self.released = []
+
+    async def create(self, instance_id=None, **kwargs):
+        return "instance"
+
+    async def execute(self, instance_id, args):
+        await asyncio.sleep(args.get("delay", 0))
+        if self.fail == "execute" or args.get("fail"):
+            raise RuntimeError("execute failed")
+        return f"done {args['i']}", args["i"], {"i": args["i"]}
+
+    async def calc_reward(self, instance_id):
+        if self.fail == "calc_reward":
+            raise RuntimeError("calc_reward failed")
+        return 1.0
+
+    async def release(self, instance_id):
+        self.released.append(instance_id)
+
+
+class FakeRewardCalculator:
+    @staticmethod
+    def verify_score(model_output, identity, **kwargs):
+        return 1.0 if identity in model_output else 0.0
+
+    @staticmethod
+    def extract_output(output):
+        return output
+
+
+def make_evaluator(api_url="http://127.0.0.1:1/v1", reward_calculator=None, **kwargs):
+    """指向不可达地址的评测器，测试中替换具体的请求方法"""
+    return BaseEvaluator(api_key="EMPTY", reward_calculator=reward_calculator, api_url=api_url, **kwargs)
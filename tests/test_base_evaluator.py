@@ -0,0 +1,197 @@
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+
+import httpx
+import openai
+from tenacity import wait_none
+
+from internbootcamp.utils.concurrency import AdaptiveConcurrencyLimiter
+from internbootcamp.src.base_evaluator import MAX_API_ATTEMPTS, BaseEvaluator
+from tests.fakes import FakeRewardCalculator, FakeTool, make_evaluator
+
+
+class TestRetryPolicy(unittest.TestCase):
+    def _attempts(self, evaluator, error):
+        calls = []
+
+        async def attempt(payload, early_stop=None):
+            calls.append(payload)
+            raise error
+
+        evaluator._attempt_completion = attempt
+        request = BaseEvaluator._request_completion.retry_with(wait=wait_none())
+        with self.assertRaises(type(error)):
+            asyncio.run(request(evaluator, {"model": "m"}))
+        return len(calls)
+
+    def test_defaults_match_baseline_retries(self):
+        evaluator = make_evaluator()
+        # 默认不开启熔断器与重试预算：和原来一样，任何异常都最多尝试 MAX_API_ATTEMPTS 次
+        self.assertIsNone(evaluator.circuit_breaker)
+        self.assertIsNone(evaluator.retry_budget)
+        request = httpx.Request("POST", "http://127.0.0.1:1/v1/chat/completions")
+        errors = [
+            openai.APIConnectionError(request=request),
+            openai.BadRequestError("bad", response=httpx.Response(400, request=request), body=None),
+            ValueError("bad response"),
+        ]
+        for error in errors:
+            self.assertEqual(self._attempts(evaluator, error), MAX_API_ATTEMPTS)
+
+
+class TestHedgedRequests(unittest.TestCase):
+    def test_hedge_is_rate_limited_and_takes_a_slot(self):
+        evaluator = make_evaluator(
+            api_url="http://127.0.0.1:1/v1,http://127.0.0.1:2/v1",
+            requests_per_minute=6000, hedge_percentile=50, hedge_min_delay=0.01,
+        )
+        for _ in range(20):
+            evaluator.hedge_policy.observe(0.01)
+        in_flight = []
+
+        async def send(endpoint, payload, early_stop=None, hedge=False):
+            in_flight.append(evaluator.concurrency_limiter.in_flight)
+            if not hedge:
+                await asyncio.sleep(5)
+            return {"choices": [], "usage": {"total_tokens": 1}}, {"total_tokens": 1}
+
+        async def scenario():
+            evaluator.concurrency_limiter = AdaptiveConcurrencyLimiter(min_limit=1, max_limit=4, initial_limit=4)
+            evaluator._send_to_endpoint = send
+            await asyncio.wait_for(evaluator._attempt_completion({"model": "m", "messages": []}), timeout=2)
+
+        asyncio.run(scenario())
+        self.assertEqual(in_flight, [1, 2])
+        self.assertEqual(evaluator.rate_limiter.requests, 2)
+        self.assertEqual(evaluator.hedge_policy.stats()["hedge_wins"], 1)
+
+
+class TestConnectionPool(unittest.TestCase):
+    def test_pool_sized_to_concurrency(self):
+        async def scenario(**kwargs):
+            evaluator = make_evaluator(api_url="http://127.0.0.1:1/v1,http://127.0.0.1:2/v1", **kwargs)
+            before = [endpoint.client for endpoint in evaluator.endpoint_pool.endpoints]
+            await evaluator._fit_connection_pool(150)
+            rebuilt = [endpoint.client is not client for endpoint, client in zip(evaluator.endpoint_pool.endpoints, before)]
+            await evaluator.aclose()
+            return rebuilt, evaluator.http_connection_stats.max_connections
+
+        self.assertEqual(asyncio.run(scenario()), ([True, True], 150))
+        self.assertEqual(asyncio.run(scenario(num_samples=2)), ([True, True], 300))
+        # 显式指定时保持不变
+        self.assertEqual(asyncio.run(scenario(http_max_connections=10)), ([False, False], 10))
+
+
+class TestResume(unittest.TestCase):
+    def _evaluate(self, dataset, output_dir, resume_from_result_path=None):
+        evaluator = make_evaluator(api_model="m")
+
+        async def evaluate(input_data):
+            score = input_data["id"] % 3 / 2
+            return {"input": input_data, "success": score > 0, "score": score, "ground_truth": "x", "error": None if score else "wrong"}
+
+        evaluator._evaluate_with_deadline = evaluate
+        return asyncio.run(evaluator._evaluate_dataset(
+            dataset=dataset, output_dir=output_dir, resume_from_result_path=resume_from_result_path,
+        ))
+
+    def test_resumed_run_matches_full_run(self):
+        dataset = [{"id": i, "data_source": f"ds{i % 2}"} for i in range(10)]
+        with tempfile.TemporaryDirectory() as tmp:
+            full_results, full_report = self._evaluate(dataset, os.path.join(tmp, "full"))
+            self._evaluate(dataset[:4], os.path.join(tmp, "partial"))
+            model_dir = os.path.join(tmp, "partial", "m")
+            result_path = os.path.join(model_dir, next(name for name in os.listdir(model_dir) if name.endswith(".jsonl")))
+            results, report = self._evaluate(dataset, None, resume_from_result_path=result_path)
+
+        def strip(results):
+            return [{k: v for k, v in r.items() if k != "timings"} for r in results]
+
+        self.assertEqual(strip(results), strip(full_results))
+        self.assertEqual(report["overall_stats"], full_report["overall_stats"])
+        self.assertEqual(report["data_source_stats"], full_report["data_source_stats"])
+
+
+class TestToolCalls(unittest.TestCase):
+    def _evaluator(self):
+        return make_evaluator()
+
+    def _call(self, call_id, name, **args):
+        return {"id": call_id, "function": {"name": name, "arguments": json.dumps(args)}}
+
+    def test_parallel_results_keep_call_order(self):
+        evaluator = self._evaluator()
+        tools = {"t": {"instance": FakeTool()}}
+        # 先发出的调用最后完成，第二个调用失败
+        calls = [
+            self._call("c0", "t", i=0, delay=0.06),
+            self._call("c1", "t", i=1, delay=0.04, fail=True),
+            self._call("c2", "t", i=2, delay=0.02),
+            self._call("c3", "t", i=3, delay=0),
+        ]
+        _, messages, reward, metrics, _ = asyncio.run(evaluator._execute_tool_calls(calls, {"t": None}, {}, tools))
+        self.assertEqual([m["tool_call_id"] for m in messages], ["c0", "c1", "c2", "c3"])
+        self.assertEqual([m["content"] for m in messages], ["done 0", "Error calling t: execute failed", "done 2", "done 3"])
+        # 奖励与指标取最后一个成功的调用，与顺序执行一致
+        self.assertEqual((reward, metrics), (3, {"i": 3}))
+        self.assertEqual(evaluator.tool_stats.stats()["t"]["create_count"], 1)
+
+
+class TestToolLifecycle(unittest.TestCase):
+    def _run(self, tool):
+        evaluator = make_evaluator(reward_calculator=FakeRewardCalculator)
+        evaluator.tool_schemas = [{"type": "function", "function": {"name": "t", "parameters": {}}}]
+        evaluator.tool_instances = {"t": {"instance": tool}}
+        evaluator.interaction = None
+        replies = [
+            {"role": "assistant", "content": "", "tool_calls": [{"id": "c0", "type": "function", "function": {"name": "t", "arguments": json.dumps({"i": 0})}}]},
+            {"role": "assistant", "content": "42", "tool_calls": None},
+        ]
+
+        async def call_api(payload, early_stop=None):
+            return {"choices": [{"message": replies.pop(0)}]}, {}
+
+        evaluator._call_api = call_api
+        input_data = {
+            "data_source": "d",
+            "prompt": [{"role": "user", "content": "q"}],
+            "reward_model": {"ground_truth": "42"},
+            "extra_info": {"need_tools_kwargs": True, "tools_kwargs": {"t": {}}},
+        }
+        result = asyncio.run(evaluator._evaluate_one(input_data))
+        return result, evaluator.tool_stats.stats()["t"]
+
+    def test_released_when_execute_fails(self):
+        tool = FakeTool(fail="execute")
+        result, stats = self._run(tool)
+        self.assertTrue(result["success"])
+        self.assertEqual(tool.released, ["instance"])
+        self.assertEqual((stats["create_count"], stats["execute_count"], stats["execute_errors"]), (1, 1, 1))
+        self.assertEqual((stats["calc_reward_count"], stats["release_count"], stats["release_errors"]), (0, 1, 0))
+
+    def test_released_when_calc_reward_fails(self):
+        tool = FakeTool(fail="calc_reward")
+        result, stats = self._run(tool)
+        self.assertEqual(result["score"], 1.0)
+        self.assertEqual(tool.released, ["instance"])
+        self.assertEqual((stats["execute_count"], stats["execute_errors"]), (1, 0))
+        self.assertEqual((stats["calc_reward_count"], stats["calc_reward_errors"], stats["release_count"]), (1, 1, 1))
+
+
+class TestMultiModelEvaluation(unittest.TestCase):
+    def test_requires_output_dir_before_evaluating(self):
+        evaluator = make_evaluator()
+
+        async def evaluate(*args, **kwargs):
+            raise AssertionError("不应开始评测")
+
+        evaluator._evaluate_dataset = evaluate
+        with self.assertRaises(ValueError):
+            asyncio.run(evaluator.run_multi_model_evaluation([{"model": "a"}, {"model": "b"}], dataset=[{"id": 0}]))
+
+
+if __name__ == '__main__':
+    unittest.main()
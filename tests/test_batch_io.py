@@ -0,0 +1,42 @@
+import json
+import os
+import tempfile
+import unittest
+
+from internbootcamp.utils.batch_io import BatchRequestWriter, BatchResponseError, BatchResponseIndex, BatchResponseMissing, batch_custom_id
+
+
+class TestBatchIO(unittest.TestCase):
+    def test_render_and_ingest(self):
+        ok = {"model": "m", "messages": [{"role": "user", "content": "a"}]}
+        failed = {"model": "m", "messages": [{"role": "user", "content": "b"}]}
+        with tempfile.TemporaryDirectory() as tmp:
+            request_path = os.path.join(tmp, "requests.jsonl")
+            with BatchRequestWriter(request_path) as writer:
+                self.assertTrue(writer.write(ok))
+                self.assertFalse(writer.write(dict(ok)))
+                self.assertTrue(writer.write(failed))
+            with open(request_path, encoding="utf-8") as f:
+                lines = [json.loads(line) for line in f]
+            self.assertEqual([line["custom_id"] for line in lines], [batch_custom_id(ok), batch_custom_id(failed)])
+            self.assertEqual(lines[0]["url"], "/v1/chat/completions")
+
+            output_path = os.path.join(tmp, "output.jsonl")
+            body = {"choices": [{"index": 0, "message": {"role": "assistant", "content": "x"}}], "usage": {"prompt_tokens": 3}}
+            with open(output_path, "w", encoding="utf-8") as f:
+                f.write(json.dumps({"custom_id": batch_custom_id(ok), "response": {"status_code": 200, "body": body}, "error": None}) + "\n")
+                f.write(json.dumps({"custom_id": batch_custom_id(failed), "response": None, "error": {"message": "boom"}}) + "\n")
+            index = BatchResponseIndex(output_path)
+            try:
+                self.assertEqual(index.lookup(ok), (body, {"prompt_tokens": 3}))
+                with self.assertRaises(BatchResponseError):
+                    index.lookup(failed)
+                with self.assertRaises(BatchResponseMissing):
+                    index.lookup({"model": "m", "messages": []})
+                self.assertEqual(index.stats()["hits"], 1)
+            finally:
+                index.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
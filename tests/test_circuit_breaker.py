@@ -0,0 +1,47 @@
+import asyncio
+import unittest
+
+from internbootcamp.utils.circuit_breaker import CircuitBreaker, CircuitOpenError, RetryBudget
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    def test_opens_probes_and_closes(self):
+        breaker = CircuitBreaker(failure_threshold=3, reset_timeout=0.05)
+
+        async def scenario():
+            for _ in range(3):
+                self.assertFalse(await breaker.acquire())
+                breaker.on_failure()
+            self.assertEqual(breaker.state, "open")
+            # 冷却结束后第一个请求作为探测请求放行
+            self.assertTrue(await breaker.acquire())
+            breaker.on_success()
+
+        asyncio.run(asyncio.wait_for(scenario(), timeout=2))
+        self.assertEqual(breaker.state, "closed")
+        self.assertEqual([t["to"] for t in breaker.transitions], ["open", "half_open", "closed"])
+
+    def test_gives_up_after_max_open_seconds(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.01, max_open_seconds=0.05)
+
+        async def scenario():
+            breaker.on_failure()
+            while True:
+                await breaker.acquire()
+                breaker.on_failure()
+
+        with self.assertRaises(CircuitOpenError):
+            asyncio.run(asyncio.wait_for(scenario(), timeout=2))
+
+    def test_retry_budget(self):
+        budget = RetryBudget(ratio=0.5, min_retries=1)
+        self.assertTrue(budget.try_acquire())
+        self.assertFalse(budget.try_acquire())
+        for _ in range(2):
+            budget.record_success()
+        self.assertTrue(budget.try_acquire())
+        self.assertEqual(budget.stats()["retries_denied"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
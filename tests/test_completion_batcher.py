@@ -0,0 +1,56 @@
+import asyncio
+import unittest
+
+from internbootcamp.utils.completion_batcher import CompletionBatcher, chat_payload_to_completion
+
+
+class TestCompletionBatcher(unittest.TestCase):
+    def test_batches_prompts_and_splits_choices(self):
+        calls = []
+
+        async def send(prompts, params):
+            calls.append(list(prompts))
+            n = params["n"]
+            return {"choices": [{"index": i * n + j, "text": f"{prompt}-{j}"} for i, prompt in enumerate(prompts) for j in range(n)]}
+
+        async def scenario():
+            batcher = CompletionBatcher(send, max_batch_size=3, flush_timeout=0.01)
+            results = await asyncio.gather(*[batcher.submit(f"p{i}", {"model": "m", "n": 2}) for i in range(5)])
+            return batcher, results
+
+        batcher, results = asyncio.run(scenario())
+        self.assertEqual(calls, [["p0", "p1", "p2"], ["p3", "p4"]])
+        self.assertEqual([c["text"] for c in results[4][1]], ["p4-0", "p4-1"])
+        self.assertEqual(batcher.stats()["full_flushes"], 1)
+
+    def test_tool_requests_are_not_converted(self):
+        payload = {"model": "m", "messages": [{"role": "user", "content": "hi"}], "tools": [{"type": "function"}]}
+        self.assertIsNone(chat_payload_to_completion(payload, tokenizer=None))
+
+    def test_chat_payload_conversion(self):
+        class Tokenizer:
+            def apply_chat_template(self, messages, tokenize, add_generation_prompt, **kwargs):
+                self.kwargs = kwargs
+                return "".join(m["content"] for m in messages) + "<assistant>"
+
+        tokenizer = Tokenizer()
+        payload = {
+            "model": "m",
+            "messages": [{"role": "system", "content": "sys "}, {"role": "user", "content": "hi"}],
+            "temperature": 0.6,
+            "max_completion_tokens": 512,
+            "stop": ["</answer>"],
+            "extra_body": {"chat_template_kwargs": {"enable_thinking": False}, "top_k": 20},
+        }
+        prompt, params = chat_payload_to_completion(payload, tokenizer)
+        self.assertEqual(prompt, "sys hi<assistant>")
+        self.assertEqual(tokenizer.kwargs, {"enable_thinking": False})
+        self.assertEqual(params, {"model": "m", "temperature": 0.6, "max_tokens": 512, "stop": ["</answer>"], "extra_body": {"top_k": 20}})
+        self.assertIn("chat_template_kwargs", payload["extra_body"])
+        # completions 接口不支持的参数无法等价转换，仍走 chat 接口
+        self.assertIsNone(chat_payload_to_completion({**payload, "response_format": {"type": "json_object"}}, tokenizer))
+        self.assertIsNone(chat_payload_to_completion({**payload, "logprobs": True}, tokenizer))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import asyncio
+import unittest
+from unittest import mock
+
+from internbootcamp.utils.concurrency import AdaptiveConcurrencyLimiter
+from tests.fakes import FakeClock
+
+
+class TestAdaptiveConcurrency(unittest.TestCase):
+    def test_additive_increase_multiplicative_decrease(self):
+        clock = FakeClock()
+
+        async def scenario():
+            limiter = AdaptiveConcurrencyLimiter(min_limit=1, max_limit=8, latency_tolerance=None)
+            # 慢启动：每次成功 +1
+            for _ in range(3):
+                limiter.on_success(clock(), 0.1)
+            self.assertEqual(limiter.current_limit, 4)
+            clock.now += 1
+            limiter.on_failure(clock() - 0.5)
+            self.assertEqual(limiter.current_limit, 2)
+            # 回退之前发出的请求属于同一拥塞窗口，不再回退；非过载错误不回退
+            limiter.on_failure(clock() - 0.5)
+            limiter.on_failure(clock() + 1, overloaded=False)
+            self.assertEqual(limiter.current_limit, 2)
+            # 拥塞避免：每次成功 +1/limit
+            for expected in (2.5, 2.9, 2.9 + 1 / 2.9):
+                limiter.on_success(clock(), 0.1)
+                self.assertAlmostEqual(limiter.limit, expected)
+            self.assertEqual(limiter.current_limit, 3)
+            for _ in range(3):
+                clock.now += 1
+                limiter.on_failure(clock() - 0.5)
+            self.assertEqual(limiter.current_limit, 1)
+            for _ in range(100):
+                limiter.on_success(clock(), 0.1)
+            self.assertEqual(limiter.current_limit, 8)
+            return limiter.stats()
+
+        with mock.patch("internbootcamp.utils.concurrency.time.monotonic", clock):
+            stats = asyncio.run(scenario())
+        self.assertEqual((stats["decreases"], stats["overload_errors"], stats["peak_limit"]), (4, 5, 8))
+
+    def test_slow_response_decreases(self):
+        clock = FakeClock()
+
+        async def scenario():
+            limiter = AdaptiveConcurrencyLimiter(min_limit=1, max_limit=8, initial_limit=4, latency_tolerance=3.0)
+            limiter.on_success(clock(), 1.0, tokens=10)
+            self.assertEqual(limiter.current_limit, 5)
+            clock.now += 1
+            # 单 token 延迟超过基线 3 倍视为拥塞
+            limiter.on_success(clock() - 0.5, 4.0, tokens=10)
+            self.assertEqual((limiter.current_limit, limiter.slow_responses), (2, 1))
+
+        with mock.patch("internbootcamp.utils.concurrency.time.monotonic", clock):
+            asyncio.run(scenario())
+
+
+if __name__ == '__main__':
+    unittest.main()
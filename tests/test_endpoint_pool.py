@@ -0,0 +1,54 @@
+import asyncio
+import unittest
+from unittest import mock
+
+import httpx
+
+from internbootcamp.utils.endpoint_pool import Endpoint, EndpointPool
+from tests.fakes import FakeClock
+
+
+class TestEndpointPool(unittest.TestCase):
+    def test_ejection_and_readmission(self):
+        clock = FakeClock()
+        a, b = Endpoint("http://a/v1", None), Endpoint("http://b/v1", None)
+        pool = EndpointPool([a, b], eject_after=2, eject_seconds=10)
+
+        async def call(endpoint, error=None):
+            try:
+                async with pool.call(endpoint):
+                    if error is not None:
+                        raise error
+            except Exception:
+                pass
+
+        async def scenario():
+            # 非过载错误不计入连续失败
+            await call(a, ValueError("bad"))
+            await call(a, httpx.ReadTimeout("timeout"))
+            self.assertTrue(a.is_healthy(clock()))
+            await call(a, httpx.ReadTimeout("timeout"))
+            self.assertEqual(a.ejections, 1)
+            self.assertEqual([pool.pick() for _ in range(3)], [b, b, b])
+            # 摘除期满后重新参与路由，成功一次即恢复
+            clock.now += 10
+            self.assertIs(pool.pick(exclude=[b]), a)
+            await call(a)
+            self.assertEqual(a.consecutive_failures, 0)
+            # 再次摘除时长翻倍
+            await call(a, httpx.ReadTimeout("timeout"))
+            await call(a, httpx.ReadTimeout("timeout"))
+            self.assertEqual(a.ejected_until, clock() + 20)
+            # 所有端点都被摘除时选择最早恢复的端点
+            clock.now += 1
+            await call(b, httpx.ReadTimeout("timeout"))
+            await call(b, httpx.ReadTimeout("timeout"))
+            self.assertIs(pool.pick(), b)
+
+        with mock.patch("internbootcamp.utils.endpoint_pool.time.monotonic", clock):
+            asyncio.run(scenario())
+        self.assertEqual((a.failures, a.successes, a.ejections, b.ejections), (4, 1, 2, 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,36 @@
+import unittest
+
+from internbootcamp.utils.evaluation_aggregator import EvaluationAggregator, LatencyReservoir
+from internbootcamp.utils.spans import sample_spans, span
+
+
+class TestLatencyStats(unittest.TestCase):
+    def test_reservoir_percentiles(self):
+        reservoir = LatencyReservoir(capacity=1000)
+        for i in range(101):
+            reservoir.add(float(i))
+        self.assertEqual(reservoir.percentile(50), 50.0)
+        self.assertEqual(reservoir.percentile(99), 99.0)
+        self.assertAlmostEqual(reservoir.summary()["mean"], 50.0)
+
+    def test_spans_aggregated_per_data_source(self):
+        aggregator = EvaluationAggregator()
+        for _ in range(3):
+            with sample_spans() as spans:
+                with span("api_call"):
+                    pass
+                with span("api_call"):
+                    pass
+            self.assertEqual(spans.summary()["stages"]["api_call"]["count"], 2)
+            aggregator.update({"input": {"data_source": "ds"}, "success": True, "timings": spans.summary(),
+                               "token_usage": {"completion_tokens": 10}})
+        with span("outside"):
+            pass
+        latency = aggregator.latency_snapshot()["ds"]
+        self.assertEqual(list(latency["stages"]), ["total", "api_call"])
+        self.assertEqual(latency["stages"]["api_call"]["count"], 3)
+        self.assertEqual(latency["throughput"]["samples"], 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,26 @@
+import asyncio
+import unittest
+
+from internbootcamp.utils.hedging import HedgePolicy
+
+
+class TestHedgePolicy(unittest.TestCase):
+    def test_slow_primary_is_hedged(self):
+        policy = HedgePolicy(percentile=90, min_delay=0.01, max_ratio=1.0, min_samples=5)
+        for _ in range(10):
+            policy.observe(0.01)
+
+        async def slow():
+            await asyncio.sleep(5)
+            return "primary"
+
+        async def fast():
+            return "hedge"
+
+        result = asyncio.run(asyncio.wait_for(policy.run(slow, fast), timeout=2))
+        self.assertEqual(result, "hedge")
+        self.assertEqual(policy.stats()["hedge_wins"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
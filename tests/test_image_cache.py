@@ -0,0 +1,63 @@
+import asyncio
+import os
+import tempfile
+import unittest
+
+from internbootcamp.utils.image_cache import ImageEncodingCache
+
+
+class TestImageEncodingCache(unittest.TestCase):
+    def test_memoized_and_invalidated_on_change(self):
+        calls = []
+
+        def fake_encode(path, target_size=-1, fmt="JPEG"):
+            calls.append(path)
+            with open(path, "rb") as f:
+                return f.read().hex()
+
+        async def run(cache, path):
+            return await asyncio.gather(*[cache.encode(path) for _ in range(5)])
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "board.png")
+            with open(path, "wb") as f:
+                f.write(b"v1")
+            cache = ImageEncodingCache(disk_dir=os.path.join(tmp, "cache"), encode_fn=fake_encode)
+            self.assertEqual(asyncio.run(run(cache, path)), ["7631"] * 5)
+            self.assertEqual(len(calls), 1)
+
+            with open(path, "wb") as f:
+                f.write(b"v2!")
+            self.assertEqual(asyncio.run(run(cache, path))[0], "763221")
+            self.assertEqual(len(calls), 2)
+            cache.close()
+
+            # 新实例从磁盘缓存读取，不重新编码
+            disk_cache = ImageEncodingCache(disk_dir=os.path.join(tmp, "cache"), encode_fn=fake_encode)
+            self.assertEqual(asyncio.run(disk_cache.encode(path)), "763221")
+            self.assertEqual((len(calls), disk_cache.disk_hits), (2, 1))
+            disk_cache.close()
+
+    def test_counters_consistent_under_concurrent_encoding(self):
+        def fake_encode(path, target_size=-1, fmt="JPEG"):
+            return os.path.basename(path)
+
+        async def run(cache, paths):
+            return await asyncio.gather(*[cache.encode(path) for path in paths for _ in range(3)])
+
+        with tempfile.TemporaryDirectory() as tmp:
+            paths = []
+            for i in range(200):
+                paths.append(os.path.join(tmp, f"{i}.png"))
+                with open(paths[-1], "wb") as f:
+                    f.write(b"x")
+            cache = ImageEncodingCache(max_workers=8, encode_fn=fake_encode)
+            self.assertEqual(len(asyncio.run(run(cache, paths))), 600)
+            stats = cache.stats()
+            cache.close()
+        self.assertEqual(stats["encoded"], 200)
+        self.assertEqual(stats["memory_hits"] + stats["inflight_hits"] + stats["encoded"], 600)
+
+
+if __name__ == '__main__':
+    unittest.main()
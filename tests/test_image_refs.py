@@ -0,0 +1,42 @@
+import asyncio
+import json
+import tempfile
+import threading
+import unittest
+
+from internbootcamp.utils.image_refs import ImageBlobStore, ImageExternalizer
+from tests.fakes import make_evaluator
+
+
+class TestImageExternalizer(unittest.TestCase):
+    def test_externalize_and_restore(self):
+        data_url = "data:image/jpeg;base64,aGVsbG8="
+        messages = [
+            {"role": "user", "content": [{"type": "text", "text": "q"}, {"type": "image_url", "image_url": {"url": data_url}}]},
+            {"role": "assistant", "content": "The answer is 3"},
+        ]
+        with tempfile.TemporaryDirectory() as tmp:
+            externalizer = ImageExternalizer(ImageBlobStore(tmp))
+            compact = externalizer.externalize(messages)
+            ref = compact[0]["content"][1]["image_url"]["url"]
+            self.assertTrue(ref.startswith("sha256:"))
+            self.assertNotIn("base64", json.dumps(compact))
+            self.assertEqual(messages[0]["content"][1]["image_url"]["url"], data_url)
+            self.assertEqual(externalizer.restore(compact), messages)
+
+    def test_record_messages_runs_in_image_executor(self):
+        evaluator = make_evaluator(externalize_images=True)
+        threads = []
+        externalize = evaluator.image_externalizer.externalize
+        evaluator.image_externalizer.externalize = lambda messages: threads.append(threading.current_thread().name) or externalize(messages)
+        message = {"role": "user", "content": [{"type": "image_url", "image_url": {"url": "data:image/png;base64,aGVsbG8="}}]}
+
+        recorded = asyncio.run(evaluator._record_messages([message]))
+        self.assertTrue(recorded[0]["content"][0]["image_url"]["url"].startswith("sha256:"))
+        self.assertEqual(len(threads), 1)
+        self.assertTrue(threads[0].startswith("image-encode"))
+        evaluator.image_cache.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+import base64
+import io
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from PIL import Image
+
+from internbootcamp.src.img2base64 import encode_image_file_to_base64, encode_image_to_base64
+
+
+class TestImageEncoding(unittest.TestCase):
+    def _noise(self, size):
+        return Image.frombytes("RGB", size, os.urandom(size[0] * size[1] * 3))
+
+    def test_size_limit_always_met(self):
+        for max_size in (20000, 200000, 2000000):
+            with mock.patch.dict(os.environ, {"MAX_IMAGE_SIZE": str(max_size)}):
+                encoded = encode_image_to_base64(self._noise((1600, 1200)))
+            self.assertLessEqual(len(encoded), max_size)
+
+    def test_tiny_limit_fails_instead_of_looping(self):
+        with mock.patch.dict(os.environ, {"MAX_IMAGE_SIZE": "100"}):
+            with self.assertRaises(ValueError):
+                encode_image_to_base64(self._noise((1600, 1200)))
+
+    def test_pass_through_only_without_exif(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            plain = os.path.join(tmp, "plain.jpg")
+            rotated = os.path.join(tmp, "rotated.jpg")
+            image = self._noise((300, 200))
+            image.save(plain)
+            exif = Image.Exif()
+            exif[0x0112] = 6
+            image.save(rotated, exif=exif)
+
+            with open(plain, "rb") as f:
+                self.assertEqual(encode_image_file_to_base64(plain), base64.b64encode(f.read()).decode("utf-8"))
+            # 带 EXIF 的文件重新编码：与直接编码解码后的图片结果一致，不保留方向标记
+            encoded = encode_image_file_to_base64(rotated)
+            with Image.open(rotated) as img:
+                self.assertEqual(encoded, encode_image_to_base64(img))
+            with Image.open(io.BytesIO(base64.b64decode(encoded))) as img:
+                self.assertNotIn("exif", img.info)
+
+
+if __name__ == '__main__':
+    unittest.main()
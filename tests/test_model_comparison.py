@@ -0,0 +1,38 @@
+import unittest
+
+from internbootcamp.utils.evaluation_aggregator import EvaluationAggregator
+from internbootcamp.utils.model_comparison import comparison_table
+
+
+class TestModelComparison(unittest.TestCase):
+    def _report(self, results):
+        aggregator = EvaluationAggregator()
+        for r in results:
+            aggregator.update(r)
+        data_source_stats, _ = aggregator.snapshot()
+        return {
+            "overall_stats": {
+                "total_samples": aggregator.total,
+                "success_rate": aggregator.success_count / aggregator.total,
+                "overall_avg_score": aggregator.avg_score,
+            },
+            "data_source_stats": data_source_stats,
+            "latency_stats": aggregator.latency_snapshot(),
+        }
+
+    def test_scores_relative_to_baseline(self):
+        def result(data_source, score):
+            return {"input": {"data_source": data_source}, "success": True, "score": score, "token_usage": {"completion_tokens": 10}}
+
+        reports = {
+            "base": self._report([result("a", 0.5), result("b", 0.5)]),
+            "new": self._report([result("a", 1.0)]),
+        }
+        header, rows = comparison_table(reports)
+        self.assertEqual(header[5:7], ["a Avg Score", "b Avg Score"])
+        self.assertEqual(rows[1][4], "+0.5000")
+        self.assertEqual(rows[1][6], "-")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+import asyncio
+import unittest
+from unittest import mock
+
+from internbootcamp.utils.rate_limiter import RateLimiter, TokenBucket
+from tests.fakes import FakeClock
+
+
+class TestRateLimiter(unittest.TestCase):
+    def test_token_bucket_refill(self):
+        clock = FakeClock()
+        with mock.patch("internbootcamp.utils.rate_limiter.time.monotonic", clock):
+            bucket = TokenBucket(per_minute=60)
+            bucket.consume(60)
+            self.assertEqual(bucket.wait_time(1), 1.0)
+            clock.now += 0.5
+            bucket.refill()
+            self.assertAlmostEqual(bucket.level, 0.5)
+            self.assertAlmostEqual(bucket.wait_time(1), 0.5)
+            # 补充不超过容量；超过容量的请求按满桶处理
+            clock.now += 1000
+            bucket.refill()
+            self.assertEqual(bucket.level, 60)
+            self.assertEqual(bucket.wait_time(1000), 0.0)
+
+    def test_acquire_waits_for_refill_and_settles(self):
+        clock = FakeClock()
+
+        async def sleep(seconds):
+            clock.now += seconds
+
+        async def scenario():
+            limiter = RateLimiter(requests_per_minute=60, tokens_per_minute=600)
+            await limiter.acquire(600)
+            started = clock()
+            await limiter.acquire(100)
+            # 100 个 token 按 10 token/s 补充
+            self.assertAlmostEqual(clock() - started, 10.0)
+            # 实际消耗少于预留时退还差额
+            limiter.settle(100, 40)
+            self.assertAlmostEqual(limiter.token_bucket.level, 60)
+            return limiter
+
+        with mock.patch("internbootcamp.utils.rate_limiter.time.monotonic", clock), \
+                mock.patch("internbootcamp.utils.rate_limiter.asyncio.sleep", sleep):
+            limiter = asyncio.run(scenario())
+        self.assertEqual((limiter.requests, limiter.throttled_requests, limiter.actual_tokens), (2, 1, 40))
+
+
+if __name__ == '__main__':
+    unittest.main()
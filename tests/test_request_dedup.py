@@ -0,0 +1,78 @@
+import asyncio
+import unittest
+
+from internbootcamp.utils.request_dedup import RequestDeduplicator, is_deterministic_payload
+
+
+class TestRequestDedup(unittest.TestCase):
+    def test_identical_requests_share_one_call(self):
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return {"choices": [{"message": {"content": "x"}}]}, {"total_tokens": 1}
+
+        async def run():
+            dedup = RequestDeduplicator()
+            results = await asyncio.gather(*[dedup.run("k", fetch) for _ in range(5)])
+            results.append(await dedup.run("k", fetch))
+            return dedup, results
+
+        dedup, results = asyncio.run(run())
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(dedup.saved_calls, 5)
+        results[0][0]["choices"][0]["message"]["content"] = "changed"
+        self.assertEqual(results[1][0]["choices"][0]["message"]["content"], "x")
+        self.assertTrue(is_deterministic_payload({"temperature": 0}))
+        self.assertFalse(is_deterministic_payload({"temperature": 0.7}))
+        self.assertFalse(is_deterministic_payload({}))
+
+    def test_cancelled_owner_does_not_cancel_waiters(self):
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return {"choices": []}, {"total_tokens": 1}
+
+        async def run():
+            dedup = RequestDeduplicator()
+            owner = asyncio.ensure_future(dedup.run("k", fetch))
+            await asyncio.sleep(0)
+            waiters = [asyncio.ensure_future(dedup.run("k", fetch)) for _ in range(2)]
+            await asyncio.sleep(0.01)
+            owner.cancel()
+            results = await asyncio.gather(*waiters)
+            self.assertTrue(owner.cancelled())
+            return results
+
+        results = asyncio.run(run())
+        self.assertEqual(len(calls), 1)
+        self.assertEqual([r[1] for r in results], [{"total_tokens": 1}] * 2)
+
+    def test_request_cancelled_when_all_callers_cancel(self):
+        cancelled = []
+
+        async def fetch():
+            try:
+                await asyncio.sleep(1)
+            except asyncio.CancelledError:
+                cancelled.append(1)
+                raise
+
+        async def run():
+            dedup = RequestDeduplicator()
+            caller = asyncio.ensure_future(dedup.run("k", fetch))
+            await asyncio.sleep(0.01)
+            caller.cancel()
+            await asyncio.sleep(0.01)
+            return dedup
+
+        dedup = asyncio.run(run())
+        self.assertEqual(cancelled, [1])
+        self.assertEqual(dedup._inflight, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
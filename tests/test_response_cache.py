@@ -0,0 +1,68 @@
+import asyncio
+import os
+import tempfile
+import threading
+import unittest
+
+from internbootcamp.utils.response_cache import ResponseCache, payload_hash
+from tests.fakes import make_evaluator
+
+
+class TestResponseCache(unittest.TestCase):
+    def test_payload_hash_is_order_independent(self):
+        a = {"model": "m", "messages": [{"role": "user", "content": "hi"}], "temperature": 0}
+        b = {"temperature": 0, "messages": [{"content": "hi", "role": "user"}], "model": "m"}
+        self.assertEqual(payload_hash(a), payload_hash(b))
+        self.assertNotEqual(payload_hash(a), payload_hash({**a, "temperature": 1}))
+
+    def test_readwrite_replay_and_eviction(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "cache.sqlite")
+            cache = ResponseCache(path, max_bytes=2000)
+            for i in range(20):
+                cache.put(f"k{i}", {"response": {"text": "x" * 200}, "usage": {}})
+            self.assertGreater(cache.evictions, 0)
+            self.assertLessEqual(cache.stats()["size_mb"] * 1024 * 1024, 2000)
+            self.assertIsNone(cache.get("k0"))
+            self.assertIsNotNone(cache.get("k19"))
+            cache.close()
+
+            replay = ResponseCache(path, mode="replay")
+            self.assertIsNotNone(replay.get("k19"))
+            self.assertIsNone(replay.get("missing"))
+            replay.put("new", {"response": {}, "usage": {}})
+            self.assertIsNone(replay.get("new"))
+            self.assertEqual((replay.hits, replay.misses), (1, 2))
+            replay.close()
+
+
+class TestResponseCacheIO(unittest.TestCase):
+    def test_cache_io_runs_off_event_loop(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            evaluator = make_evaluator(response_cache_path=os.path.join(tmp, "cache.sqlite"))
+            cache = evaluator.response_cache
+            threads = []
+            for name in ("get", "put"):
+                original = getattr(cache, name)
+                setattr(cache, name, lambda *args, _original=original: threads.append(threading.get_ident()) or _original(*args))
+
+            async def request(payload, early_stop=None):
+                return {"choices": []}, {"total_tokens": 1}
+
+            async def scenario():
+                evaluator._request_completion = request
+                payload = {"model": "m", "messages": [], "temperature": 0}
+                first = await evaluator._call_api(payload)
+                second = await evaluator._call_api(payload)
+                return threading.get_ident(), first, second
+
+            loop_thread, first, second = asyncio.run(scenario())
+            self.assertEqual(first, second)
+            self.assertEqual(len(threads), 3)  # get（未命中）、put、get（命中）
+            self.assertNotIn(loop_thread, threads)
+            self.assertEqual((cache.hits, cache.writes), (1, 1))
+            cache.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
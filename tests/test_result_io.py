@@ -0,0 +1,38 @@
+import asyncio
+import os
+import tempfile
+import unittest
+
+from internbootcamp.utils.result_io import compact_result, iter_results, make_result_header
+from internbootcamp.utils.result_writer import AsyncResultWriter
+
+
+class TestCompactResults(unittest.TestCase):
+    def test_compact_roundtrip(self):
+        config = {"model": "m", "max_user_turns": 1}
+        prompt = [{"role": "user", "content": "q"}]
+        result = {
+            "input": {"messages": prompt, "reward_model": {"ground_truth": 3}},
+            "messages": prompt + [{"role": "assistant", "content": "The answer is 3"}],
+            "ground_truth": 3, "score": 1.0, "success": True,
+            "full_context": "User:\nq\n", "response_context": "Assistant:\n...",
+            "evaluation_config": config,
+        }
+        header = make_result_header(config)
+        compact = compact_result(result, header)
+        self.assertEqual(set(compact) & {"full_context", "response_context", "evaluation_config", "ground_truth"}, set())
+        self.assertEqual(len(compact["messages"]), 1)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "results.jsonl")
+            writer = AsyncResultWriter(path, transform=lambda r: compact_result(r, header), header=header)
+            asyncio.run(writer.submit(result))
+            writer.close()
+            expanded = list(iter_results(path))
+        self.assertEqual(len(expanded), 1)
+        expected = {k: v for k, v in result.items() if k not in ("full_context", "response_context")}
+        self.assertEqual(expanded[0], expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+
+from internbootcamp.utils.result_io import iter_results
+from internbootcamp.utils.result_writer import AsyncResultWriter
+
+
+class TestAsyncResultWriter(unittest.TestCase):
+    def test_all_results_written_on_close(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "results.jsonl")
+
+            async def run():
+                writer = AsyncResultWriter(path, flush_interval=10, flush_size=4, max_pending=2)
+                for i in range(10):
+                    await writer.submit({"idx": i})
+                await writer.aclose()
+                return writer
+
+            writer = asyncio.run(run())
+            with open(path, encoding="utf-8") as f:
+                rows = [json.loads(line) for line in f]
+            self.assertEqual([r["idx"] for r in rows], list(range(10)))
+            self.assertEqual(writer.written, 10)
+
+    def test_none_results_written_as_null(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "results.jsonl")
+
+            async def run():
+                writer = AsyncResultWriter(path, flush_interval=0.01)
+                await writer.submit({"idx": 0})
+                await writer.submit(None)
+                await asyncio.sleep(0.05)
+                await writer.submit({"idx": 1})
+                await writer.aclose()
+
+            asyncio.run(run())
+            with open(path, encoding="utf-8") as f:
+                rows = [json.loads(line) for line in f]
+            self.assertEqual(rows, [{"idx": 0}, None, {"idx": 1}])
+            self.assertEqual([r["idx"] for r in iter_results(path)], [0, 1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from internbootcamp.utils.result_writer import AsyncResultWriter
+from internbootcamp.utils.resume_index import load_resume_index, resume_index_path, sample_fingerprint, write_index_header
+
+
+class TestResumeIndex(unittest.TestCase):
+    def test_fingerprint_key_field(self):
+        a = {"extra_info": {"index": 3}, "messages": [{"role": "user", "content": "a"}]}
+        b = {"extra_info": {"index": 3}, "messages": [{"role": "user", "content": "b"}]}
+        self.assertEqual(sample_fingerprint(a, "extra_info.index"), sample_fingerprint(b, "extra_info.index"))
+        self.assertNotEqual(sample_fingerprint(a), sample_fingerprint(b))
+        # 缺少字段时回退到整个输入
+        self.assertEqual(sample_fingerprint(a, "data_id"), sample_fingerprint(a))
+
+    def test_index_written_and_rebuilt(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "results.jsonl")
+            inputs = [{"id": i} for i in range(5)]
+
+            async def run():
+                writer = AsyncResultWriter(path, index_path=resume_index_path(path), fingerprint_fn=sample_fingerprint)
+                for item in inputs:
+                    await writer.submit({"input": item, "score": 1})
+                await writer.submit(None)
+                await writer.aclose()
+
+            write_index_header(resume_index_path(path), None)
+            asyncio.run(run())
+            expected = {sample_fingerprint(item) for item in inputs}
+            self.assertEqual(load_resume_index(path), expected)
+
+            os.remove(resume_index_path(path))
+            self.assertEqual(load_resume_index(path), expected)
+            self.assertTrue(os.path.exists(resume_index_path(path)))
+
+
+
+    def test_checkpoint_avoids_scanning_results(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "results.jsonl")
+
+            async def run():
+                writer = AsyncResultWriter(path, index_path=resume_index_path(path), fingerprint_fn=sample_fingerprint)
+                for i in range(3):
+                    await writer.submit({"input": {"id": i}, "score": 1})
+                await writer.aclose()
+
+            write_index_header(resume_index_path(path), None)
+            asyncio.run(run())
+            expected = {sample_fingerprint({"id": i}) for i in range(3)}
+            with mock.patch("internbootcamp.utils.resume_index.iter_result_lines", side_effect=AssertionError("扫描了结果文件")), \
+                    mock.patch("internbootcamp.utils.resume_index._count_lines", side_effect=AssertionError("扫描了结果文件")):
+                self.assertEqual(load_resume_index(path), expected)
+
+            # 结果写入后、索引写入前中断：校验点不一致，重建索引
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(json.dumps({"input": {"id": 3}, "score": 1}) + "\n")
+            expected.add(sample_fingerprint({"id": 3}))
+            self.assertEqual(load_resume_index(path), expected)
+            with mock.patch("internbootcamp.utils.resume_index.iter_result_lines", side_effect=AssertionError("扫描了结果文件")):
+                self.assertEqual(load_resume_index(path), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,25 @@
+import unittest
+
+from internbootcamp.utils.sampling import pass_at_k, summarize_samples
+
+
+class TestSampling(unittest.TestCase):
+    def test_pass_at_k_and_majority_vote(self):
+        self.assertAlmostEqual(pass_at_k(4, 1, 1), 0.25)
+        self.assertAlmostEqual(pass_at_k(4, 1, 2), 0.5)
+        self.assertEqual(pass_at_k(4, 3, 2), 1.0)
+        samples = [
+            {"score": 0.1, "extracted_output": 2, "success": True},
+            {"score": 1.0, "extracted_output": 1, "success": True},
+            {"score": 0.1, "extracted_output": 2, "success": True},
+            {"score": 0, "extracted_output": None, "success": False},
+        ]
+        summary = summarize_samples(samples)
+        self.assertEqual(summary["pass_at_k"], {"1": 0.25, "2": 0.5, "4": 1.0})
+        self.assertEqual(summary["majority_vote"], 2)
+        self.assertFalse(summary["majority_correct"])
+        self.assertAlmostEqual(summary["score_mean"], 0.3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import unittest
+
+from openai.types.chat import ChatCompletionChunk
+
+from internbootcamp.bootcamps.freecell.freecell_reward_manager import FreecellRewardManager
+from internbootcamp.utils.streaming import StreamAccumulator
+
+
+class TestStreaming(unittest.TestCase):
+    def test_freecell_early_stop_predicate(self):
+        stop = FreecellRewardManager.should_stop_early
+        self.assertFalse(stop("<think>The answer is 2, maybe"))
+        self.assertFalse(stop("<think>x</think>\nThe answer is 1"))
+        self.assertTrue(stop("<think>x</think>\nThe answer is 12\n"))
+        self.assertFalse(stop("<think>The answer is 3.</think> hmm"))
+        # 没有 think 标签时无法判断推理是否结束，不提前结束
+        self.assertFalse(stop("The answer is 3 if we move the king first, but"))
+
+    def test_predicate_only_checked_at_boundaries(self):
+        calls = []
+
+        def early_stop(content):
+            calls.append(content)
+            return False
+
+        accumulator = StreamAccumulator(early_stop)
+        text = "abc" * 200 + " step 12 done"
+        for i in range(0, len(text), 3):
+            accumulator.add(ChatCompletionChunk.model_validate({
+                "id": "c", "object": "chat.completion.chunk", "created": 0, "model": "m",
+                "choices": [{"index": 0, "delta": {"content": text[i:i + 3]}, "finish_reason": None}],
+            }))
+        self.assertEqual(accumulator.content, text)
+        self.assertEqual(len(calls), 1)
+        self.assertTrue(calls[0].endswith("12 "))
+
+    def test_accumulator_stops_and_estimates_usage(self):
+        text = "<think>r</think>\nThe answer is 1\nand more text"
+        accumulator = StreamAccumulator(FreecellRewardManager.should_stop_early)
+        for i in range(0, len(text), 4):
+            chunk = ChatCompletionChunk.model_validate({
+                "id": "c", "object": "chat.completion.chunk", "created": 0, "model": "m",
+                "choices": [{"index": 0, "delta": {"content": text[i:i + 4]}, "finish_reason": None}],
+            })
+            if accumulator.add(chunk):
+                break
+        response = accumulator.response({"messages": [{"role": "user", "content": "q"}]})
+        self.assertTrue(response["early_stopped"])
+        self.assertNotIn("more", response["choices"][0]["message"]["content"])
+        self.assertEqual(FreecellRewardManager.extract_output(response["choices"][0]["message"]["content"]), 1)
+        self.assertTrue(response["usage"]["estimated"])
+
+
+    def test_stops_after_reasoning_content(self):
+        def chunk(**delta):
+            return ChatCompletionChunk.model_validate({
+                "id": "c", "object": "chat.completion.chunk", "created": 0, "model": "m",
+                "choices": [{"index": 0, "delta": delta, "finish_reason": None}],
+            })
+
+        accumulator = StreamAccumulator(FreecellRewardManager.should_stop_early)
+        # 思考过程中的 "answer is N" 不触发提前结束
+        for text in ("Maybe the answer is 2,", " no.\n", "Check again.\n"):
+            self.assertFalse(accumulator.add(chunk(reasoning_content=text)))
+        stopped = []
+        for text in ("The answer", " is 3", "\n", "extra"):
+            stopped.append(accumulator.add(chunk(content=text)))
+            if stopped[-1]:
+                break
+        self.assertEqual(stopped, [False, False, True])
+        response = accumulator.response({"messages": [{"role": "user", "content": "q"}]})
+        self.assertTrue(response["early_stopped"])
+        self.assertEqual(response["choices"][0]["message"]["reasoning_content"], "Maybe the answer is 2, no.\nCheck again.\n")
+        self.assertEqual(response["choices"][0]["message"]["content"], "The answer is 3\n")
+
+
+if __name__ == '__main__':
+    unittest.main()
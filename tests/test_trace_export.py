@@ -0,0 +1,34 @@
+import json
+import os
+import tempfile
+import unittest
+
+from internbootcamp.utils.spans import SampleSpans
+from internbootcamp.utils.trace_export import ChromeTraceWriter
+
+
+class TestChromeTrace(unittest.TestCase):
+    def test_overlapping_stages_get_separate_lanes(self):
+        spans = SampleSpans()
+        t = spans.started
+        spans.add("api_call", t, t + 1.0)
+        spans.add("tool_call", t + 1.0, t + 3.0, tool="a")
+        spans.add("tool_call", t + 1.5, t + 3.5, tool="b")
+        spans.finish()
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "run.trace.json")
+            tracer = ChromeTraceWriter(path)
+            tracer.record_sample(0, "sample 0", spans, enqueued_at=t - 0.5)
+            tracer.record_flush(t + 3.0, t + 3.1, 1)
+            tracer.close()
+            with open(path, encoding="utf-8") as f:
+                events = json.load(f)
+        tids = {e["args"].get("tool"): e["tid"] for e in events if e["name"] == "tool_call"}
+        self.assertNotEqual(tids["a"], tids["b"])
+        sample = next(e for e in events if e["name"] == "sample 0")
+        self.assertGreaterEqual(sample["dur"], 3.5 * 1e6)
+        self.assertIn("queue_wait", {e["name"] for e in events})
+
+
+if __name__ == '__main__':
+    unittest.main()